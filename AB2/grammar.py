@@ -0,0 +1,364 @@
+import argparse
+import sys
+from os.path import abspath, dirname, join
+
+sys.path.insert(0, join(dirname(dirname(abspath(__file__))), 'AnalisadorLéxico'))
+
+import cache
+import token_kinds
+from token_kinds import Kind
+
+
+# ------------------------------------------------------
+# ------------------------------------------------------
+# ---------------------- GRAMMAR -----------------------
+# ------------------------------------------------------
+# ------------------------------------------------------
+# The LL(1) grammar of Neon. Quoted terminals are spellings, bare upper
+# case ones token kinds and the rest nonterminals; ε is the empty body.
+# '=' is OPE_ATR, which the lexer gives as OPE_NEG (see parser.terminal).
+GRAMMAR = '''
+Program    -> 'Begin' '{' Stmts '}'
+Stmts      -> Stmt Stmts
+            | ε
+Stmt       -> FunDecl
+            | VarDecl
+            | ID IdStmt
+            | 'If' Expr Block Else
+            | 'While' Expr Block
+            | 'From' Expr 'To' Expr 'Increase' Expr Block
+            | 'Get' '(' ID Index ')' ';'
+            | 'Show' '(' Args ')' ';'
+            | 'Return' Expr ';'
+Block      -> '{' Stmts '}'
+Else       -> 'Else' Block
+            | ε
+
+FunDecl    -> 'Function' FunType ID '(' Params ')' Block
+FunType    -> VarType
+            | 'Empty'
+Params     -> Param ParamsTail
+            | ε
+ParamsTail -> ',' Param ParamsTail
+            | ε
+Param      -> VarType ID Dims
+
+VarDecl    -> VarType ID Dims Names Init ';'
+VarType    -> BaseType
+            | 'Array' ElemType
+ElemType   -> BaseType
+            | ε
+BaseType   -> 'Int'
+            | 'Float'
+            | 'Bool'
+            | 'Char'
+            | 'String'
+Dims       -> '[' Size ']'
+            | ε
+Size       -> IDEN_INT
+            | ε
+Names      -> ',' ID Dims Names
+            | ε
+Init       -> '=' Expr
+            | ε
+
+IdStmt     -> '(' Args ')' ';'
+            | Index '=' Expr ';'
+Index      -> '[' Expr ']'
+            | ε
+Args       -> Expr ArgsTail
+            | ε
+ArgsTail   -> ',' Expr ArgsTail
+            | ε
+
+Expr       -> AndExpr OrTail
+OrTail     -> 'Or' AndExpr OrTail
+            | ε
+AndExpr    -> RelExpr AndTail
+AndTail    -> 'And' RelExpr AndTail
+            | ε
+RelExpr    -> AddExpr RelTail
+RelTail    -> RelOp AddExpr RelTail
+            | ε
+RelOp      -> OPE_REL
+            | '<'
+            | '>'
+            | OPE_LE
+            | OPE_GE
+AddExpr    -> MulExpr AddTail
+AddTail    -> '+' MulExpr AddTail
+            | '-' MulExpr AddTail
+            | ε
+MulExpr    -> Unary MulTail
+MulTail    -> '*' Unary MulTail
+            | '/' Unary MulTail
+            | ε
+Unary      -> '-' Unary
+            | '!' Unary
+            | Primary
+Primary    -> '(' Expr ')'
+            | ID IdTail
+            | IDEN_INT
+            | IDEN_FLOAT
+            | IDEN_CHAR
+            | IDEN_STRING
+            | 'True'
+            | 'False'
+IdTail     -> '(' Args ')'
+            | '[' Expr ']'
+            | ε
+'''
+
+EMPTY = 'ε'
+EOF = Kind.OTHER_EOF
+
+# The table parser.py loads; regenerated by running this module
+TABLE_MODULE = join(dirname(abspath(__file__)), 'parse_table.py')
+
+# Nonterminals are numbered after the token kinds, so that a symbol is a
+# terminal if and only if it is below NONTERMINAL
+NONTERMINAL = token_kinds.KIND_COUNT
+
+
+class GrammarError(Exception):
+    pass
+
+
+def terminal_kind(symbol):
+    if symbol[0] == "'":
+        spelling = symbol[1:-1]
+        for group in (token_kinds.TOKEN_DICT.RESERVED_WORDS, token_kinds.TOKEN_DICT.OPERATORS,
+                      token_kinds.TOKEN_DICT.DELIMITERS):
+            if spelling in group:
+                return group[spelling][1]
+        raise GrammarError(f'Unknown terminal: {symbol}')
+    return Kind[symbol].value
+
+
+def read_grammar(text):
+    # (head, body) of every production, as written
+    productions = []
+    head = None
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith('|'):
+            body = line[1:].split()
+        else:
+            head, body = line.split('->')
+            head = head.strip()
+            body = body.split()
+        productions.append((head, [] if body == [EMPTY] else body))
+    return productions
+
+
+# ------------------------------------------------------
+# ------------------------------------------------------
+# ----------------------- SYMBOLS ----------------------
+# ------------------------------------------------------
+# ------------------------------------------------------
+def number_symbols(productions):
+    # Nonterminal names in order of definition, and the productions with
+    # their symbols numbered
+    names = list(dict.fromkeys(head for head, _ in productions))
+    ids = {name: NONTERMINAL + index for index, name in enumerate(names)}
+    numbered = []
+    for head, body in productions:
+        symbols = []
+        for symbol in body:
+            if symbol in ids:
+                symbols.append(ids[symbol])
+            elif symbol[0] == "'" or symbol.isupper():
+                symbols.append(terminal_kind(symbol))
+            else:
+                raise GrammarError(f'Undefined nonterminal: {symbol}')
+        numbered.append((ids[head], tuple(symbols)))
+    return names, numbered
+
+
+def symbol_names(nonterminals):
+    # Name of every symbol by number: the spelling of the terminals that
+    # have one, the kind name of the others, then the nonterminals
+    names = ['']
+    for kind in range(1, NONTERMINAL):
+        spelling = SPELLINGS.get(kind)
+        names.append(f"'{spelling}'" if spelling is not None else Kind(kind).name)
+    return names + list(nonterminals)
+
+
+def production_text(symbols, head, body):
+    return f'{symbols[head]} -> {" ".join(symbols[symbol] for symbol in body) or EMPTY}'
+
+
+# ------------------------------------------------------
+# ------------------------------------------------------
+# -------------------- FIRST / FOLLOW ------------------
+# ------------------------------------------------------
+# ------------------------------------------------------
+def first_of(symbols, first, nullable):
+    # FIRST of a sequence of symbols, and whether it can derive ε
+    result = set()
+    for symbol in symbols:
+        if symbol < NONTERMINAL:
+            result.add(symbol)
+            return result, False
+        result |= first[symbol]
+        if symbol not in nullable:
+            return result, False
+    return result, True
+
+
+def first_sets(productions):
+    # Iterated to a fixed point: FIRST of every nonterminal, and the set
+    # of nonterminals that derive ε
+    first = {head: set() for head, _ in productions}
+    nullable = set()
+    changed = True
+    while changed:
+        changed = False
+        for head, body in productions:
+            symbols, empty = first_of(body, first, nullable)
+            if not symbols <= first[head]:
+                first[head] |= symbols
+                changed = True
+            if empty and head not in nullable:
+                nullable.add(head)
+                changed = True
+    return first, nullable
+
+
+def follow_sets(productions, first, nullable, start):
+    follow = {head: set() for head, _ in productions}
+    follow[start].add(EOF)
+    changed = True
+    while changed:
+        changed = False
+        for head, body in productions:
+            for index, symbol in enumerate(body):
+                if symbol < NONTERMINAL:
+                    continue
+                symbols, empty = first_of(body[index + 1:], first, nullable)
+                if empty:
+                    symbols = symbols | follow[head]
+                if not symbols <= follow[symbol]:
+                    follow[symbol] |= symbols
+                    changed = True
+    return follow
+
+
+# ------------------------------------------------------
+# ------------------------------------------------------
+# --------------------- PARSE TABLE --------------------
+# ------------------------------------------------------
+# ------------------------------------------------------
+def build_table(productions, first, nullable, follow):
+    # Per nonterminal, the production to expand for every token kind (-1
+    # for a syntax error), and every cell claimed by two productions
+    table = [[-1] * NONTERMINAL for _ in range(len(first))]
+    conflicts = []
+    for production, (head, body) in enumerate(productions):
+        symbols, empty = first_of(body, first, nullable)
+        if empty:
+            symbols = symbols | follow[head]
+        row = table[head - NONTERMINAL]
+        for kind in sorted(symbols):
+            if row[kind] not in (-1, production):
+                conflicts.append((head, kind, row[kind], production))
+            row[kind] = production
+    return table, conflicts
+
+
+def build():
+    # Symbol names, productions and parse table of GRAMMAR. A grammar that
+    # is not LL(1) is rejected with all its conflicts.
+    nonterminals, productions = number_symbols(read_grammar(GRAMMAR))
+    symbols = symbol_names(nonterminals)
+    first, nullable = first_sets(productions)
+    follow = follow_sets(productions, first, nullable, NONTERMINAL)
+    table, conflicts = build_table(productions, first, nullable, follow)
+
+    if conflicts:
+        raise GrammarError(f'Grammar is not LL(1), {len(conflicts)} conflicts:\n' + '\n'.join(
+            f'  {symbols[head]} on {symbols[kind]}:\n'
+            f'      {production_text(symbols, *productions[old])}\n'
+            f'      {production_text(symbols, *productions[new])}'
+            for head, kind, old, new in conflicts
+        ))
+    return symbols, productions, table
+
+
+# ------------------------------------------------------
+# ------------------------------------------------------
+# --------------------- GENERATION ---------------------
+# ------------------------------------------------------
+# ------------------------------------------------------
+HEADER = '''# Generated by grammar.py from its GRAMMAR, do not edit. Run
+#     python3 grammar.py
+# after changing the grammar or the token kinds.
+
+VERSION = {version!r}
+NONTERMINAL = {nonterminal}
+START = {start}
+EOF = {eof}
+'''
+
+
+def generate():
+    # Source of the parse table module: plain tuples of ints, which
+    # Python loads from the module's .pyc without computing anything
+    symbols, productions, table = build()
+    lines = [HEADER.format(version=VERSION, nonterminal=NONTERMINAL, start=NONTERMINAL, eof=int(EOF))]
+
+    lines.append('# Name of every symbol: token kinds, then nonterminals')
+    lines.append('SYMBOLS = (')
+    lines += [f'    {name!r},' for name in symbols]
+    lines += [')', '', '# (head, body) of every production', 'PRODUCTIONS = (']
+    lines += [f'    ({head}, {tuple(body)!r}),' for head, body in productions]
+    lines += [')', '', '# Bodies reversed, as the parser pushes them on its stack', 'EXPANSIONS = (']
+    lines += [f'    {tuple(reversed(body))!r},' for _, body in productions]
+    lines += [')', '', '# Production to expand per nonterminal and token kind, -1 for none', 'TABLE = (']
+    for index, row in enumerate(table):
+        lines.append(f'    # {symbols[NONTERMINAL + index]}')
+        lines.append(f'    ({", ".join(map(str, row))}),')
+    lines += [')', '']
+    return '\n'.join(lines)
+
+
+# Spelling of the terminals that have a single one, for messages
+SPELLINGS = {Kind.OPE_LE: '<=', Kind.OPE_GE: '>='}
+for group in (token_kinds.TOKEN_DICT.RESERVED_WORDS, token_kinds.TOKEN_DICT.OPERATORS,
+              token_kinds.TOKEN_DICT.DELIMITERS):
+    for spelling, tkn_cat in group.items():
+        if not spelling.isupper():
+            SPELLINGS[tkn_cat[1]] = spelling
+
+# The table is built from this module and the token kinds: editing either
+# makes a generated table out of date
+VERSION = cache.source_version(sys.modules[__name__], token_kinds)[:16]
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description='Generate the Neon parse table')
+    arg_parser.add_argument('--output', metavar='FILE', type=str, default=TABLE_MODULE, help='Write the module to FILE instead of parse_table.py')
+    arg_parser.add_argument('--check', action='store_true', help='Only check that the grammar is LL(1) and the table is up to date')
+
+    args = arg_parser.parse_args()
+    try:
+        source = generate()
+    except GrammarError as error:
+        print(error, file=sys.stderr)
+        exit(1)
+
+    if args.check:
+        try:
+            with open(args.output) as file_reader:
+                current = file_reader.read()
+        except OSError:
+            current = None
+        if current != source:
+            print(f'{args.output} is out of date, run python3 grammar.py', file=sys.stderr)
+            exit(1)
+    else:
+        with open(args.output, 'w') as file_writer:
+            file_writer.write(source)
@@ -0,0 +1,700 @@
+from array import array
+
+import parser
+from semantic import SymbolError, VariableTable
+
+
+# ------------------------------------------------------
+# ------------------------------------------------------
+# ---------------------- OPCODES -----------------------
+# ------------------------------------------------------
+# ------------------------------------------------------
+# Three-address instructions, op dest left right, where an operand is a
+# value slot (a variable or a temporary, >= 0), a constant (< NONE) or
+# NONE. Jumps and branches take block ids; CALL takes a function index.
+#   MOVE   dest = left                  NEG, NOT   dest = op left
+#   ADD .. GE   dest = left op right
+#   LOAD   dest = left[right]           STORE  dest[left] = right
+#   ARRAY  dest = left elements (NONE if unsized), each right
+#   PARAM  left                         CALL   dest = left(right params)
+#   SHOW   right params                 GET    dest = input
+#   JUMP   dest                         BRANCH if left: dest else right
+#   RETURN left (NONE for none)
+(NOP, MOVE, NEG, NOT, ADD, SUB, MUL, DIV, EQ, NE, LT, GT, LE, GE,
+ LOAD, STORE, ARRAY, PARAM, CALL, SHOW, GET, JUMP, BRANCH, RETURN) = range(24)
+
+OPCODE_NAMES = ('nop', 'move', 'neg', 'not', 'add', 'sub', 'mul', 'div', 'eq', 'ne', 'lt', 'gt', 'le', 'ge',
+                'load', 'store', 'array', 'param', 'call', 'show', 'get', 'jump', 'branch', 'return')
+
+NONE = -1
+
+# Operands each opcode reads, as a mask of these
+READS_DEST = 1
+READS_LEFT = 2
+READS_RIGHT = 4
+
+READS = array('B', [0] * len(OPCODE_NAMES))
+for op in (MOVE, NEG, NOT, PARAM, BRANCH, RETURN):
+    READS[op] = READS_LEFT
+for op in (ADD, SUB, MUL, DIV, EQ, NE, LT, GT, LE, GE, LOAD, ARRAY):
+    READS[op] = READS_LEFT | READS_RIGHT
+READS[STORE] = READS_DEST | READS_LEFT | READS_RIGHT
+
+# Opcodes that assign dest (CALL only when dest is not NONE), those that
+# must stay even if it is never read, and those that end a block
+DEFINES = frozenset((MOVE, NEG, NOT, ADD, SUB, MUL, DIV, EQ, NE, LT, GT, LE, GE, LOAD, ARRAY, CALL, GET))
+EFFECTS = frozenset((STORE, PARAM, CALL, SHOW, GET, JUMP, BRANCH, RETURN))
+TERMINATORS = frozenset((JUMP, BRANCH, RETURN))
+
+BINARY_SYMBOLS = {ADD: '+', SUB: '-', MUL: '*', DIV: '/', EQ: '==', NE: '!=', LT: '<', GT: '>', LE: '<=', GE: '>='}
+
+
+def is_constant(operand):
+    return operand < NONE
+
+
+# ------------------------------------------------------
+# ------------------------------------------------------
+# ---------------------- FUNCTIONS ---------------------
+# ------------------------------------------------------
+# ------------------------------------------------------
+class Function:
+    # Code of one function in parallel arrays, one entry per instruction.
+    # The instructions of a block are contiguous, from block_start to
+    # block_end (by block id), and the last one is its only terminator;
+    # layout lists the blocks in code order, the entry first. Falling
+    # into the next block is an explicit JUMP, so every edge of the CFG
+    # is in a terminator.
+    def __init__(self, name, index):
+        self.name = name
+        self.index = index
+        self.params = []
+        self.ops = array('B')
+        self.dest = array('i')
+        self.left = array('i')
+        self.right = array('i')
+        self.block_start = array('i')
+        self.block_end = array('i')
+        self.layout = []
+        self.current = NONE
+        self.start(self.block())
+
+    def __len__(self):
+        return len(self.ops)
+
+    def block(self):
+        self.block_start.append(NONE)
+        self.block_end.append(NONE)
+        return len(self.block_start) - 1
+
+    def start(self, block):
+        # Emits from here on into block, which has to be new
+        if self.current != NONE:
+            self.emit(JUMP, block)
+        self.block_start[block] = len(self.ops)
+        self.layout.append(block)
+        self.current = block
+
+    def emit(self, op, dest=NONE, left=NONE, right=NONE):
+        # Code after a terminator has a block of its own, with no way in
+        if self.current == NONE:
+            self.start(self.block())
+        self.ops.append(op)
+        self.dest.append(dest)
+        self.left.append(left)
+        self.right.append(right)
+        if op in TERMINATORS:
+            self.block_end[self.current] = len(self.ops)
+            self.current = NONE
+        return len(self.ops) - 1
+
+    def finish(self):
+        # Falling off the end of a function returns nothing
+        if self.current != NONE:
+            self.emit(RETURN)
+
+    def instructions(self, block):
+        return range(self.block_start[block], self.block_end[block])
+
+    def successors(self, block):
+        last = self.block_end[block] - 1
+        op = self.ops[last]
+        if op == JUMP:
+            return (self.dest[last],)
+        if op == BRANCH:
+            return (self.dest[last], self.right[last])
+        return ()
+
+    def predecessors(self):
+        # Per block id, the blocks with an edge into it, in layout order
+        edges = [[] for _ in self.block_start]
+        for block in self.layout:
+            for successor in self.successors(block):
+                edges[successor].append(block)
+        return edges
+
+
+class Module:
+    # The functions of a program, the main one first, and what their
+    # operands refer to: per slot its name (None for a temporary) and the
+    # function it belongs to, and the constants, interned. captured holds
+    # the variables also used by functions nested in their owner, the only
+    # ones a call can read or assign.
+    def __init__(self):
+        self.functions = []
+        self.names = []
+        self.owners = array('i')
+        self.captured = set()
+        self.constants = []
+        self.constant_ids = {}
+        self.spellings = {}
+
+    def function(self, name):
+        function = Function(name, len(self.functions))
+        self.functions.append(function)
+        return function
+
+    def slot(self, name, function):
+        self.names.append(name)
+        self.owners.append(function.index)
+        return len(self.names) - 1
+
+    def variable(self, name, function):
+        # Variables that share a name are told apart by a suffix
+        count = self.spellings.get(name, 0)
+        self.spellings[name] = count + 1
+        return self.slot(name if not count else f'{name}.{count}', function)
+
+    def temporary(self, function):
+        return self.slot(None, function)
+
+    def constant(self, value):
+        key = (type(value), value)
+        index = self.constant_ids.get(key)
+        if index is None:
+            index = self.constant_ids[key] = len(self.constants)
+            self.constants.append(value)
+        return NONE - 1 - index
+
+    def value(self, operand):
+        return self.constants[NONE - 1 - operand]
+
+    def operand_text(self, operand):
+        if operand == NONE:
+            return '_'
+        if is_constant(operand):
+            value = self.value(operand)
+            return f'"{value}"' if isinstance(value, str) else str(value)
+        name = self.names[operand]
+        return f't{operand}' if name is None else name
+
+    def instruction_text(self, function, index):
+        op = function.ops[index]
+        dest, left, right = function.dest[index], function.left[index], function.right[index]
+        text = self.operand_text
+        if op in BINARY_SYMBOLS:
+            return f'{text(dest)} = {text(left)} {BINARY_SYMBOLS[op]} {text(right)}'
+        if op == MOVE:
+            return f'{text(dest)} = {text(left)}'
+        if op == NEG:
+            return f'{text(dest)} = -{text(left)}'
+        if op == NOT:
+            return f'{text(dest)} = !{text(left)}'
+        if op == LOAD:
+            return f'{text(dest)} = {text(left)}[{text(right)}]'
+        if op == STORE:
+            return f'{text(dest)}[{text(left)}] = {text(right)}'
+        if op == ARRAY:
+            return f'{text(dest)} = array {text(left)} of {text(right)}'
+        if op == CALL:
+            call = f'call {self.functions[left].name} {right}'
+            return call if dest == NONE else f'{text(dest)} = {call}'
+        if op == SHOW:
+            return f'show {right}'
+        if op == GET:
+            return f'get {text(dest)}'
+        if op == JUMP:
+            return f'jump B{dest}'
+        if op == BRANCH:
+            return f'branch {text(left)} B{dest} B{right}'
+        if op == RETURN and left == NONE:
+            return 'return'
+        if op == NOP:
+            return 'nop'
+        return f'{OPCODE_NAMES[op]} {text(left)}'
+
+    def lines(self):
+        # Every function as its blocks in layout order, each headed by its
+        # id and the blocks it can be entered from
+        for function in self.functions:
+            params = ', '.join(self.operand_text(param) for param in function.params)
+            yield f'Function {function.name}({params})'
+            predecessors = function.predecessors()
+            for block in function.layout:
+                entries = ', '.join(f'B{entry}' for entry in predecessors[block])
+                yield f'B{block}:' if not entries else f'B{block}:    <- {entries}'
+                for index in function.instructions(block):
+                    yield f'    {self.instruction_text(function, index)}'
+
+
+# ------------------------------------------------------
+# ------------------------------------------------------
+# ---------------------- LOWERING ----------------------
+# ------------------------------------------------------
+# ------------------------------------------------------
+Kind = parser.Kind
+symbol = parser.symbol
+
+STMTS = symbol('Stmts')
+BLOCK = symbol('Block')
+FUN_DECL = symbol('FunDecl')
+VAR_DECL = symbol('VarDecl')
+EXPR = symbol('Expr')
+AND_EXPR = symbol('AndExpr')
+UNARY = symbol('Unary')
+PRIMARY = symbol('Primary')
+REL_OP = symbol('RelOp')
+
+# Levels of the expression grammar, Head -> Operand Tail with the tail
+# repeating operator and operand; the first two are And and Or chains
+HEADS = frozenset(symbol(name) for name in ('Expr', 'AndExpr', 'RelExpr', 'AddExpr', 'MulExpr'))
+LOGICAL = frozenset((EXPR, AND_EXPR))
+
+OPERATORS = {Kind.OPE_ADD: ADD, Kind.OPE_SUB: SUB, Kind.OPE_MUL: MUL, Kind.OPE_DIV: DIV,
+             Kind.OPE_LT: LT, Kind.OPE_GT: GT, Kind.OPE_LE: LE, Kind.OPE_GE: GE}
+RELATIONS = {'==': EQ, '!=': NE}
+
+# Value of a variable of each type before anything is assigned to it
+DEFAULTS = {Kind.RW_INT: 0, Kind.RW_FLOAT: 0.0, Kind.RW_CHAR: '', Kind.RW_STRING: '', Kind.RW_BOOL: False}
+
+LITERALS = {Kind.IDEN_INT: int, Kind.IDEN_FLOAT: float,
+            Kind.IDEN_CHAR: lambda lexem: lexem[1:-1], Kind.IDEN_STRING: lambda lexem: lexem[1:-1],
+            Kind.RW_TRUE: lambda lexem: True, Kind.RW_FALSE: lambda lexem: False}
+
+
+class Lowering:
+    # Lowers a tree that passed the semantic checks, in one walk driven by
+    # an explicit stack of tasks, (handler, *arguments), so that no
+    # nesting reaches Python's recursion limit. Operands computed by one
+    # task for a later one go through values.
+    def __init__(self, tree):
+        self.tree = tree
+        self.module = Module()
+        self.table = VariableTable()
+        self.function = None
+        self.tasks = []
+        self.values = []
+
+    def lower(self):
+        self.function = self.module.function('Begin')
+        program = self.children(0)
+        self.then((self.table.enter_scope,), (self.statements, program[2]),
+                  (self.table.exit_scope,), (self.leave, None))
+        tasks = self.tasks
+        while tasks:
+            task = tasks.pop()
+            task[0](*task[1:])
+        return self.module
+
+    def then(self, *tasks):
+        # Runs tasks in order, ahead of those already pending
+        self.tasks.extend(reversed(tasks))
+
+    def children(self, node):
+        return list(self.tree.children(node))
+
+    def token(self, node):
+        return self.tree.tokens[self.tree.token_index[node]]
+
+    def emit(self, op, dest=NONE, left=NONE, right=NONE):
+        self.function.emit(op, dest, left, right)
+
+    def start(self, block):
+        self.function.start(block)
+
+    def jump(self, block):
+        # Not after a terminator, where it could never run
+        if self.function.current != NONE:
+            self.function.emit(JUMP, block)
+
+    def push(self, operand):
+        self.values.append(operand)
+
+    def temporary(self):
+        return self.module.temporary(self.function)
+
+    # Names
+    def declare(self, node):
+        token = self.token(node)
+        slot = self.module.variable(token.lexem, self.function)
+        self.table.add_variable(token.lexem, slot, token.position)
+        return slot
+
+    def variable(self, node):
+        token = self.token(node)
+        slot = self.table.get_variable_value(token.lexem, token.position)
+        if isinstance(slot, Function):
+            raise SymbolError(f"'{token.lexem}' is a function", token.lexem, token.position)
+        if self.module.owners[slot] != self.function.index:
+            self.module.captured.add(slot)
+        return slot
+
+    def callee(self, node):
+        token = self.token(node)
+        function = self.table.get_variable_value(token.lexem, token.position)
+        if not isinstance(function, Function):
+            raise SymbolError(f"'{token.lexem}' is not a function", token.lexem, token.position)
+        return function
+
+    def lone_variable(self, node):
+        # The ID node if expression node is nothing but an identifier
+        kinds = self.tree.kinds
+        while kinds[node] in HEADS:
+            operand, tail = self.children(node)
+            if self.tree.first_child[tail] >= 0:
+                return NONE
+            node = operand
+        children = self.children(self.children(node)[0])
+        if len(children) == 2 and kinds[children[0]] == Kind.ID and self.tree.first_child[children[1]] < 0:
+            return children[0]
+        return NONE
+
+    def chain(self, node, first, step):
+        # Nodes at position first of node, then at step of each next node
+        # of a right-recursive list (Stmts, Names, ArgsTail, ...)
+        items = []
+        children = self.children(node)
+        index = first
+        while children:
+            items.append(children[index])
+            node = children[-1]
+            children = self.children(node)
+            index = step
+        return items
+
+    # Functions
+    def enter(self, function):
+        self.function = function
+
+    def leave(self, outer):
+        self.function.finish()
+        self.function = outer
+
+    def parameters(self, node):
+        for param in self.chain(node, 0, 1):
+            self.function.params.append(self.declare(self.children(param)[1]))
+
+    def function_declaration(self, node):
+        children = self.children(node)
+        token = self.token(children[2])
+        function = self.module.function(token.lexem)
+        self.table.add_variable(token.lexem, function, token.position)
+        self.then((self.table.enter_scope,), (self.enter, function), (self.parameters, children[4]),
+                  (self.block, children[6]), (self.leave, self.function), (self.table.exit_scope,))
+
+    # Statements
+    def statements(self, node):
+        self.then(*((self.statement, statement) for statement in self.chain(node, 0, 0)))
+
+    def block(self, node):
+        self.then((self.table.enter_scope,), (self.statements, self.children(node)[1]), (self.table.exit_scope,))
+
+    def statement(self, node):
+        kinds = self.tree.kinds
+        children = self.children(node)
+        kind = kinds[children[0]]
+        if kind == FUN_DECL:
+            self.function_declaration(children[0])
+        elif kind == VAR_DECL:
+            self.variable_declaration(children[0])
+        elif kind == Kind.ID:
+            self.identifier_statement(children[0], children[1])
+        elif kind == Kind.RW_IF:
+            self.if_statement(children[1], children[2], self.children(children[3]))
+        elif kind == Kind.RW_WHILE:
+            head, body, exit = self.function.block(), self.function.block(), self.function.block()
+            self.then((self.start, head), (self.condition, children[1], body, exit),
+                      (self.start, body), (self.block, children[2]), (self.jump, head), (self.start, exit))
+        elif kind == Kind.RW_FROM:
+            self.from_statement(children[1], children[3], children[5], children[6])
+        elif kind == Kind.RW_GET:
+            self.get_statement(children[2], children[3])
+        elif kind == Kind.RW_SHOW:
+            arguments = self.chain(children[2], 0, 1)
+            self.then(*((self.value, argument) for argument in arguments), (self.show, len(arguments)))
+        else:
+            self.then((self.value, children[1]), (self.return_value,))
+
+    def variable_declaration(self, node):
+        var_type, name, dims, names, init, _ = self.children(node)
+        type_children = self.children(var_type)
+        is_array = self.tree.kinds[type_children[0]] == Kind.RW_ARRAY
+        base_type = type_children[-1]
+        if is_array:
+            base_type = self.children(base_type)
+            base_type = base_type[0] if base_type else NONE
+        default = NONE
+        if base_type != NONE:
+            default = self.module.constant(DEFAULTS[self.tree.kinds[self.children(base_type)[0]]])
+
+        declarators = [(name, dims)]
+        for names in self.chain_nodes(names):
+            children = self.children(names)
+            declarators.append((children[1], children[2]))
+        init = self.children(init)
+        for index, (name, dims) in enumerate(declarators):
+            slot = self.declare(name)
+            # As in C, the initializer is the last name's
+            if init and index == len(declarators) - 1:
+                self.then((self.value, init[1]), (self.assign, slot))
+            elif is_array or self.tree.first_child[dims] >= 0:
+                size = self.children(dims)[1:2]
+                size = self.children(size[0]) if size else ()
+                size = self.module.constant(int(self.token(size[0]).lexem)) if size else NONE
+                self.emit(ARRAY, slot, size, default)
+            else:
+                self.emit(MOVE, slot, default)
+
+    def chain_nodes(self, node):
+        # The non-empty nodes of a right-recursive list
+        nodes = []
+        while self.tree.first_child[node] >= 0:
+            nodes.append(node)
+            node = self.children(node)[-1]
+        return nodes
+
+    def identifier_statement(self, name, node):
+        children = self.children(node)
+        if self.tree.kinds[children[0]] == Kind.DELI_OPAREN:
+            arguments = self.chain(children[1], 0, 1)
+            self.then(*((self.value, argument) for argument in arguments),
+                      (self.call, self.callee(name), len(arguments), False))
+            return
+        slot = self.variable(name)
+        index = self.children(children[0])
+        if index:
+            self.then((self.value, index[1]), (self.value, children[2]), (self.store, slot))
+        else:
+            self.then((self.value, children[2]), (self.assign, slot))
+
+    def if_statement(self, condition, block, otherwise):
+        then_block, join = self.function.block(), self.function.block()
+        if not otherwise:
+            self.then((self.condition, condition, then_block, join),
+                      (self.start, then_block), (self.block, block), (self.start, join))
+            return
+        else_block = self.function.block()
+        self.then((self.condition, condition, then_block, else_block),
+                  (self.start, then_block), (self.block, block), (self.jump, join),
+                  (self.start, else_block), (self.block, otherwise[1]), (self.start, join))
+
+    def from_statement(self, counter, end, step, block):
+        # The counter holds its first value already and goes up by step
+        # while it is at most end; end and step are computed once, before
+        # the loop
+        name = self.lone_variable(counter)
+        if name != NONE:
+            tasks = [(self.push, self.variable(name))]
+        else:
+            tasks = [(self.value, counter), (self.copy, True)]
+        head, body, exit = self.function.block(), self.function.block(), self.function.block()
+        self.then(*tasks, (self.value, end), (self.copy,), (self.value, step), (self.copy,),
+                  (self.loop_test, head, body, exit), (self.block, block), (self.loop_step, head), (self.start, exit))
+
+    def get_statement(self, name, index):
+        slot = self.variable(name)
+        index = self.children(index)
+        if index:
+            self.then((self.value, index[1]), (self.get_element, slot))
+        else:
+            self.emit(GET, slot)
+
+    # Emitters, taking their operands off values
+    def assign(self, slot):
+        self.emit(MOVE, slot, self.values.pop())
+
+    def store(self, slot):
+        value = self.values.pop()
+        self.emit(STORE, slot, self.values.pop(), value)
+
+    def get_element(self, slot):
+        temporary = self.temporary()
+        self.emit(GET, temporary)
+        self.emit(STORE, slot, self.values.pop(), temporary)
+
+    def return_value(self):
+        self.emit(RETURN, NONE, self.values.pop())
+
+    def parameters_out(self, count):
+        values = self.values
+        arguments = values[len(values) - count:]
+        del values[len(values) - count:]
+        for argument in arguments:
+            self.emit(PARAM, NONE, argument)
+
+    def call(self, function, count, result=True):
+        # Arguments are all computed before the first PARAM, so calls in
+        # them do not interleave with this one's
+        self.parameters_out(count)
+        dest = self.temporary() if result else NONE
+        self.emit(CALL, dest, function.index, count)
+        if result:
+            self.values.append(dest)
+
+    def show(self, count):
+        self.parameters_out(count)
+        self.emit(SHOW, NONE, NONE, count)
+
+    def copy(self, always=False):
+        # A variable's value as of now, in a temporary of its own
+        operand = self.values[-1]
+        if always or not is_constant(operand) and self.module.names[operand] is not None:
+            temporary = self.temporary()
+            self.emit(MOVE, temporary, operand)
+            self.values[-1] = temporary
+
+    def loop_test(self, head, body, exit):
+        counter, end, step = self.values[-3:]
+        del self.values[-2:]
+        self.values.append(step)
+        self.start(head)
+        test = self.temporary()
+        self.emit(LE, test, counter, end)
+        self.emit(BRANCH, body, test, exit)
+        self.start(body)
+
+    def loop_step(self, head):
+        step = self.values.pop()
+        counter = self.values.pop()
+        self.emit(ADD, counter, counter, step)
+        self.jump(head)
+
+    def unary(self, op):
+        temporary = self.temporary()
+        self.emit(op, temporary, self.values.pop())
+        self.values.append(temporary)
+
+    def binary(self, operator):
+        node = self.children(operator)[0] if self.tree.kinds[operator] == REL_OP else operator
+        kind = self.tree.kinds[node]
+        op = RELATIONS[self.token(node).lexem] if kind == Kind.OPE_REL else OPERATORS[kind]
+        right = self.values.pop()
+        left = self.values.pop()
+        temporary = self.temporary()
+        self.emit(op, temporary, left, right)
+        self.values.append(temporary)
+
+    def load(self, slot):
+        temporary = self.temporary()
+        self.emit(LOAD, temporary, slot, self.values.pop())
+        self.values.append(temporary)
+
+    def branch(self, true, false):
+        self.emit(BRANCH, true, self.values.pop(), false)
+
+    # Expressions
+    def value(self, node):
+        # Pushes the operand holding the value of expression node. Levels
+        # with nothing in their tail, and parentheses, are walked through
+        # here rather than as tasks of their own.
+        tree = self.tree
+        kinds = tree.kinds
+        first_child = tree.first_child
+        next_sibling = tree.next_sibling
+        while True:
+            kind = kinds[node]
+            first = first_child[node]
+            if kind in HEADS:
+                tail = next_sibling[first]
+                if first_child[tail] < 0:
+                    node = first
+                    continue
+                if kind not in LOGICAL:
+                    self.then((self.value, first), (self.tail, tail))
+                    return
+                # And and Or short-circuit, so their value comes of a branch
+                result = self.temporary()
+                true, false, join = self.function.block(), self.function.block(), self.function.block()
+                self.then((self.condition, node, true, false),
+                          (self.start, true), (self.emit, MOVE, result, self.module.constant(True)),
+                          (self.jump, join),
+                          (self.start, false), (self.emit, MOVE, result, self.module.constant(False)),
+                          (self.start, join), (self.push, result))
+                return
+            if kind == UNARY:
+                operand = next_sibling[first]
+                if operand < 0:
+                    node = first
+                    continue
+                self.then((self.value, operand), (self.unary, NEG if kinds[first] == Kind.OPE_SUB else NOT))
+                return
+            break
+
+        first_kind = kinds[first]
+        if first_kind == Kind.DELI_OPAREN:
+            self.then((self.value, next_sibling[first]))
+        elif first_kind == Kind.ID:
+            tail = self.children(next_sibling[first])
+            if not tail:
+                self.values.append(self.variable(first))
+            elif kinds[tail[0]] == Kind.DELI_OPAREN:
+                arguments = self.chain(tail[1], 0, 1)
+                self.then(*((self.value, argument) for argument in arguments),
+                          (self.call, self.callee(first), len(arguments)))
+            else:
+                self.then((self.value, tail[1]), (self.load, self.variable(first)))
+        else:
+            self.values.append(self.module.constant(LITERALS[first_kind](self.token(first).lexem)))
+
+    def tail(self, node):
+        # Left to right: the next operand, then the operator on the two
+        children = self.children(node)
+        if children:
+            operator, operand, rest = children
+            self.then((self.value, operand), (self.binary, operator), (self.tail, rest))
+
+    def condition(self, node, true, false):
+        # Jumps to block true if expression node holds, else to false;
+        # And, Or and ! become control flow instead of values
+        kinds = self.tree.kinds
+        while True:
+            kind = kinds[node]
+            children = self.children(node)
+            if kind in HEADS:
+                operand, tail = children
+                if self.tree.first_child[tail] < 0:
+                    node = operand
+                    continue
+                if kind not in LOGICAL:
+                    break
+                operands = [operand] + self.chain(tail, 1, 1)
+                tasks = []
+                for item in operands[:-1]:
+                    next_block = self.function.block()
+                    if kind == EXPR:
+                        tasks.append((self.condition, item, true, next_block))
+                    else:
+                        tasks.append((self.condition, item, next_block, false))
+                    tasks.append((self.start, next_block))
+                tasks.append((self.condition, operands[-1], true, false))
+                self.then(*tasks)
+                return
+            if kind == UNARY:
+                if len(children) == 1:
+                    node = children[0]
+                    continue
+                if kinds[children[0]] == Kind.OPE_NEG:
+                    node = children[1]
+                    true, false = false, true
+                    continue
+                break
+            if kind == PRIMARY and kinds[children[0]] == Kind.DELI_OPAREN:
+                node = children[1]
+                continue
+            break
+        self.then((self.value, node), (self.branch, true, false))
+
+
+def lower(tree):
+    # The Module of a checked ParseTree
+    return Lowering(tree).lower()
@@ -1,3 +1,123 @@
 import argparse
+import sys
 from os.path import isfile, splitext
-import sint
\ No newline at end of file
+
+import parser
+import cache
+import diagnostics
+import grammar
+import ir
+import lexer
+import optimizer
+import semantic
+import stream
+
+
+# Parses are cached by the source, the lexer and the grammar as well as by
+# the code of the parser itself
+PARSER_VERSION = cache.source_version(parser, stream)[:16]
+
+
+def parse_cached(path, engine, tree, threaded, errors, store=None):
+    # The tree of a file (with tree, or None) once its lexical and syntax
+    # errors went to errors; a file parsed before by the same code and
+    # engine is read back from store instead.
+    if store is None:
+        return parse_into(path, engine, tree, threaded, errors)
+    with open(path, 'rb') as file_reader:
+        key = store.key('parse', file_reader.read(), cache.LEXER_VERSION, grammar.VERSION, PARSER_VERSION,
+                        engine, tree)
+    data = store.get(key)
+    if data is not None:
+        try:
+            parse_tree, items = parser.load_result(data)
+        except (EOFError, ValueError, TypeError):
+            data = None
+        else:
+            errors.items.extend(items)
+            return parse_tree
+    parse_tree = parse_into(path, engine, tree, threaded, errors, store)
+    store.put(key, parser.dump_result(parse_tree, errors))
+    return parse_tree
+
+
+def parse_into(path, engine, tree, threaded, errors, store=None):
+    if tree:
+        return parser.parse_tree(path, engine, threaded, errors, store)
+    parser.parse(path, engine, threaded=threaded, diagnostics=errors, store=store)
+    return None
+
+
+def parse_file(path, engine, quiet=False, tree=False, threaded=False, check=False, lower=False, level=0,
+               stats=False, store=None):
+    # Prints the derivation, the parse tree or, with lower, the IR as
+    # optimized at level (unless quiet) and returns the diagnostics of the
+    # file: every lexical, syntax and, with check or lower, semantic error,
+    # by position. The tree and the IR are only produced when there are
+    # none; stats prints what each optimization pass did, even if quiet.
+    # Source lines are not echoed when the lexer runs in its own thread, as
+    # they would come out of order. With a store, the parse is cached
+    # (see parse_cached), unless the derivation is printed as it goes.
+    errors = diagnostics.Diagnostics()
+    if tree or check or lower:
+        parse_tree = parse_cached(path, engine, True, threaded, errors, store)
+        if check or lower:
+            semantic.check_declarations(parse_tree, errors)
+        if tree and not quiet and not errors:
+            for line in parse_tree.lines():
+                print(line)
+        if lower and not errors:
+            module = ir.lower(parse_tree)
+            statistics = optimizer.optimize(module, level)
+            if not quiet:
+                for line in module.lines():
+                    print(line)
+            if stats:
+                for line in statistics.lines():
+                    print(line)
+    elif quiet:
+        parse_cached(path, engine, False, threaded, errors, store)
+    else:
+        line_trace = None if threaded else lexer.print_line
+        parser.parse(path, engine, parser.print_step, line_trace, threaded, errors, store)
+    return errors.sorted()
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description='Syntax analysis for files written in Neon language')
+    arg_parser.add_argument('Path', metavar='path', type=str, nargs='+', help='.nbl file')
+    arg_parser.add_argument('--engine', choices=lexer.ENGINES, default='mapped', help='Lexer implementation')
+    arg_parser.add_argument('--quiet', '-q', action='store_true', help='Only report errors')
+    arg_parser.add_argument('--tree', action='store_true', help='Print the parse tree once parsed instead of the derivation as it goes')
+    arg_parser.add_argument('--threaded', action='store_true', help='Scan in a thread of its own while parsing')
+    arg_parser.add_argument('--check', action='store_true', help='Also check that every identifier is declared once and used in scope')
+    arg_parser.add_argument('--ir', action='store_true', help='Check the file and print its three-address code, by function and basic block')
+    arg_parser.add_argument('-O', dest='level', type=int, choices=sorted(optimizer.LEVELS), default=0, help='Optimization level of the three-address code')
+    arg_parser.add_argument('--stats', action='store_true', help='Print what each optimization pass changed')
+    arg_parser.add_argument('--no-cache', action='store_true', help=f'Always reparse, do not use the cache in {cache.CACHE_DIR}')
+
+    args = arg_parser.parse_args()
+    store = None if args.no_cache else cache.Cache()
+    failed = False
+    for path in args.Path:
+        prefix = '' if len(args.Path) == 1 else f'{path}: '
+        if not isfile(path):
+            print(f'{prefix}Invalid file path.')
+            failed = True
+            continue
+        if splitext(path)[1] != '.nbl':
+            print(f'{prefix}Invalid file extension.')
+            failed = True
+            continue
+
+        errors = parse_file(path, args.engine, args.quiet, args.tree, args.threaded, args.check,
+                            args.ir or args.stats, args.level, args.stats, store)
+        for error in errors:
+            print(f'{prefix}{error}', file=sys.stderr)
+        if errors:
+            failed = True
+
+    if store is not None:
+        store.evict()
+    if failed:
+        exit(1)
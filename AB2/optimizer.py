@@ -0,0 +1,502 @@
+import math
+from array import array
+
+from ir import (NOP, MOVE, NEG, NOT, ADD, SUB, MUL, DIV, EQ, NE, LT, GT, LE, GE, LOAD, STORE, ARRAY, CALL,
+                JUMP, BRANCH, NONE, READS, READS_DEST, READS_LEFT, READS_RIGHT, DEFINES, EFFECTS,
+                is_constant)
+
+
+# ------------------------------------------------------
+# ------------------------------------------------------
+# ---------------------- FOLDING -----------------------
+# ------------------------------------------------------
+# ------------------------------------------------------
+# Int and Float are 64 bits; an Int result out of range is left to run
+INT_MIN = -2 ** 63
+INT_MAX = 2 ** 63 - 1
+
+UNKNOWN = object()
+
+COMPARISONS = {LT: lambda left, right: left < right, GT: lambda left, right: left > right,
+               LE: lambda left, right: left <= right, GE: lambda left, right: left >= right}
+
+
+def is_number(value):
+    # bool is an int to Python, not to Neon
+    return type(value) in (int, float)
+
+
+def checked(value):
+    if type(value) is int:
+        return value if INT_MIN <= value <= INT_MAX else UNKNOWN
+    return value if math.isfinite(value) else UNKNOWN
+
+
+def fold(op, left, right=None):
+    # Value of op on constants, UNKNOWN if it is not one to compute here
+    if op == NEG:
+        return checked(-left) if is_number(left) else UNKNOWN
+    if op == NOT:
+        return (not left) if type(left) is bool else UNKNOWN
+    if op in (EQ, NE):
+        if type(left) is not type(right) and not (is_number(left) and is_number(right)):
+            return UNKNOWN
+        return (left == right) == (op == EQ)
+    if op in COMPARISONS:
+        if is_number(left) and is_number(right) or type(left) is str and type(right) is str:
+            return COMPARISONS[op](left, right)
+        return UNKNOWN
+    if not (is_number(left) and is_number(right)):
+        return UNKNOWN
+    if op == ADD:
+        return checked(left + right)
+    if op == SUB:
+        return checked(left - right)
+    if op == MUL:
+        return checked(left * right)
+    if right == 0:
+        return UNKNOWN
+    if type(left) is int and type(right) is int:
+        # Int division truncates, as in C
+        quotient = abs(left) // abs(right)
+        return checked(-quotient if (left < 0) != (right < 0) else quotient)
+    return checked(left / right)
+
+
+FOLDABLE = frozenset((NEG, NOT, ADD, SUB, MUL, DIV, EQ, NE, LT, GT, LE, GE))
+
+
+# ------------------------------------------------------
+# ------------------------------------------------------
+# ----------------------- PASSES -----------------------
+# ------------------------------------------------------
+# ------------------------------------------------------
+# Each pass rewrites one function in place and returns how many changes
+# it made. Removed instructions become NOPs, which compact drops, along
+# with the blocks no longer in the layout.
+def fold_constants(module, function):
+    ops, dest, left, right = function.ops, function.dest, function.left, function.right
+    folded = 0
+    for index in range(len(ops)):
+        op = ops[index]
+        if op not in FOLDABLE or not is_constant(left[index]):
+            continue
+        if op in (NEG, NOT):
+            value = fold(op, module.value(left[index]))
+        elif is_constant(right[index]):
+            value = fold(op, module.value(left[index]), module.value(right[index]))
+        else:
+            continue
+        if value is not UNKNOWN:
+            ops[index] = MOVE
+            left[index] = module.constant(value)
+            right[index] = NONE
+            folded += 1
+    return folded
+
+
+def eliminate_branches(module, function):
+    # A branch on a constant, or to one block either way, is a jump
+    ops, dest, left, right = function.ops, function.dest, function.left, function.right
+    resolved = 0
+    for block in function.layout:
+        last = function.block_end[block] - 1
+        if ops[last] != BRANCH:
+            continue
+        condition = left[last]
+        if dest[last] == right[last]:
+            target = dest[last]
+        elif is_constant(condition) and type(module.value(condition)) is bool:
+            target = dest[last] if module.value(condition) else right[last]
+        else:
+            continue
+        ops[last] = JUMP
+        dest[last] = target
+        left[last] = right[last] = NONE
+        resolved += 1
+    return resolved
+
+
+def remove_unreachable_blocks(module, function):
+    reached = {function.layout[0]}
+    stack = [function.layout[0]]
+    while stack:
+        for successor in function.successors(stack.pop()):
+            if successor not in reached:
+                reached.add(successor)
+                stack.append(successor)
+    removed = len(function.layout) - len(reached)
+    if removed:
+        function.layout = [block for block in function.layout if block in reached]
+    return removed
+
+
+def array_slots(function):
+    # Slots used as arrays, whose copies are not interchangeable with them
+    slots = set()
+    ops = function.ops
+    for index in range(len(ops)):
+        op = ops[index]
+        if op == STORE or op == ARRAY:
+            slots.add(function.dest[index])
+        elif op == LOAD:
+            slots.add(function.left[index])
+    return slots
+
+
+MISSING = object()
+
+# Undo log entries of CopyTable
+SOURCE = 0
+COPIES_OF = 1
+APPENDED = 2
+VOLATILE = 3
+
+
+class CopyTable:
+    # Copies in effect at a point of a function: per slot, the operand it
+    # holds a copy of, and per operand the slots copied from it, which may
+    # list stale ones. Every change is logged, so that leaving a block
+    # undoes what it did, as leaving a scope does in VariableTable.
+    # volatile lists the copies a call can change, those of captured
+    # variables.
+    def __init__(self, captured):
+        self.captured = captured
+        self.sources = {}
+        self.copies_of = {}
+        self.volatile = []
+        self.undo_log = []
+
+    def mark(self):
+        return len(self.undo_log)
+
+    def undo(self, mark):
+        undo_log = self.undo_log
+        while len(undo_log) > mark:
+            entry = undo_log.pop()
+            kind = entry[0]
+            if kind == SOURCE:
+                if entry[2] is MISSING:
+                    del self.sources[entry[1]]
+                else:
+                    self.sources[entry[1]] = entry[2]
+            elif kind == COPIES_OF:
+                if entry[2] is MISSING:
+                    del self.copies_of[entry[1]]
+                else:
+                    self.copies_of[entry[1]] = entry[2]
+            elif kind == APPENDED:
+                entry[1].pop()
+            else:
+                self.volatile = entry[1]
+
+    def append(self, items, item):
+        items.append(item)
+        self.undo_log.append((APPENDED, items))
+
+    def add(self, copy, source):
+        self.undo_log.append((SOURCE, copy, self.sources.get(copy, MISSING)))
+        self.sources[copy] = source
+        if not is_constant(source):
+            copies = self.copies_of.get(source)
+            if copies is None:
+                self.copies_of[source] = copies = []
+                self.undo_log.append((COPIES_OF, source, MISSING))
+            self.append(copies, copy)
+            if source in self.captured:
+                self.append(self.volatile, source)
+        if copy in self.captured:
+            self.append(self.volatile, copy)
+
+    def forget(self, slot):
+        # Slot is assigned: it is no copy of anything, nor anything of it
+        sources = self.sources
+        source = sources.pop(slot, MISSING)
+        if source is not MISSING:
+            self.undo_log.append((SOURCE, slot, source))
+        copies = self.copies_of.pop(slot, None)
+        if copies is not None:
+            self.undo_log.append((COPIES_OF, slot, copies))
+            for copy in copies:
+                if sources.get(copy) == slot:
+                    del sources[copy]
+                    self.undo_log.append((SOURCE, copy, slot))
+
+    def forget_volatile(self):
+        if self.volatile:
+            volatile = self.volatile
+            self.undo_log.append((VOLATILE, volatile))
+            self.volatile = []
+            for slot in volatile:
+                self.forget(slot)
+
+
+def propagate_copies(module, function):
+    # Reads of the dest of a MOVE read its source instead, until either
+    # is assigned again. A block starts with the copies its predecessor
+    # ends with when it has only that one and it comes earlier in the
+    # layout; blocks are visited depth first along those edges, so each
+    # one sees its predecessor's table as it was. Any other block starts
+    # with none. A call can assign captured variables, so their copies
+    # are dropped at every call.
+    ops, dest, left, right = function.ops, function.dest, function.left, function.right
+    arrays = array_slots(function)
+    predecessors = function.predecessors()
+    position = {block: order for order, block in enumerate(function.layout)}
+    followers = {}
+    roots = []
+    for block in function.layout:
+        entries = predecessors[block]
+        if len(entries) == 1 and position[entries[0]] < position[block]:
+            followers.setdefault(entries[0], []).append(block)
+        else:
+            roots.append(block)
+
+    table = CopyTable(module.captured)
+    sources = table.sources
+    replaced = 0
+    stack = [(block, NONE) for block in reversed(roots)]
+    while stack:
+        block, mark = stack.pop()
+        if block == NONE:
+            table.undo(mark)
+            continue
+
+        stack.append((NONE, table.mark()))
+        for index in function.instructions(block):
+            op = ops[index]
+            reads = READS[op]
+            if reads & READS_LEFT and op != LOAD:
+                source = sources.get(left[index])
+                if source is not None:
+                    left[index] = source
+                    replaced += 1
+            if reads & READS_RIGHT:
+                source = sources.get(right[index])
+                if source is not None:
+                    right[index] = source
+                    replaced += 1
+
+            if op == CALL:
+                table.forget_volatile()
+            # A store changes the array in dest, and so its copies too
+            target = dest[index]
+            if op != STORE and (op not in DEFINES or target == NONE):
+                continue
+            table.forget(target)
+            if op != MOVE:
+                continue
+            source = left[index]
+            if source == target:
+                ops[index] = NOP
+                replaced += 1
+            elif target not in arrays and source not in arrays:
+                table.add(target, source)
+        stack.extend((follower, NONE) for follower in reversed(followers.get(block, ())))
+    return replaced
+
+
+def propagate_constants(module, function):
+    # A temporary assigned once, a constant, is that constant wherever it
+    # is read: the lowering only reads temporaries where their assignment
+    # has run
+    ops, dest, left, right = function.ops, function.dest, function.left, function.right
+    names = module.names
+    assignments = {}
+    for index in range(len(ops)):
+        if ops[index] in DEFINES and dest[index] != NONE:
+            assignments[dest[index]] = assignments.get(dest[index], 0) + 1
+    constants = {}
+    for index in range(len(ops)):
+        target = dest[index]
+        if ops[index] == MOVE and is_constant(left[index]) and names[target] is None and assignments[target] == 1:
+            constants[target] = left[index]
+    if not constants:
+        return 0
+
+    replaced = 0
+    for index in range(len(ops)):
+        reads = READS[ops[index]]
+        if reads & READS_LEFT and ops[index] != LOAD and left[index] in constants:
+            left[index] = constants[left[index]]
+            replaced += 1
+        if reads & READS_RIGHT and right[index] in constants:
+            right[index] = constants[right[index]]
+            replaced += 1
+    return replaced
+
+
+def read_slots(function, index):
+    op = function.ops[index]
+    reads = READS[op]
+    operands = []
+    if reads & READS_DEST:
+        operands.append(function.dest[index])
+    if reads & READS_LEFT:
+        operands.append(function.left[index])
+    if reads & READS_RIGHT:
+        operands.append(function.right[index])
+    return [operand for operand in operands if operand >= 0]
+
+
+def remove_dead_temporaries(module, function):
+    # Instructions with no effect but a temporary that is never read
+    ops, dest = function.ops, function.dest
+    names = module.names
+    uses = {}
+    for index in range(len(ops)):
+        for slot in read_slots(function, index):
+            uses[slot] = uses.get(slot, 0) + 1
+
+    removed = 0
+    changed = True
+    while changed:
+        changed = False
+        for index in range(len(ops) - 1, -1, -1):
+            op = ops[index]
+            target = dest[index]
+            if op not in DEFINES or target == NONE or names[target] is not None or uses.get(target):
+                continue
+            if op == CALL:
+                dest[index] = NONE
+                continue
+            if op in EFFECTS:
+                continue
+            for slot in read_slots(function, index):
+                uses[slot] -= 1
+            ops[index] = NOP
+            removed += 1
+            changed = True
+    return removed
+
+
+def remove_dead_stores(module, function):
+    # Assignments, to temporaries or variables, of values that are never
+    # read, from liveness over the CFG. Calls count as reading every
+    # captured variable, and returns as reading those of outer functions,
+    # which code run later may read.
+    ops, dest = function.ops, function.dest
+    captured = module.captured
+    outer = {slot for slot in captured if module.owners[slot] != function.index}
+
+    def transfer(index, live):
+        op = ops[index]
+        if op in DEFINES and dest[index] != NONE:
+            live.discard(dest[index])
+        if op == CALL:
+            live.update(captured)
+        live.update(read_slots(function, index))
+
+    live_in = {block: set() for block in function.layout}
+    changed = True
+    while changed:
+        changed = False
+        for block in reversed(function.layout):
+            live = live_out(function, block, live_in, outer)
+            for index in reversed(function.instructions(block)):
+                transfer(index, live)
+            if live != live_in[block]:
+                live_in[block] = live
+                changed = True
+
+    removed = 0
+    for block in function.layout:
+        live = live_out(function, block, live_in, outer)
+        for index in reversed(function.instructions(block)):
+            op = ops[index]
+            target = dest[index]
+            if op in DEFINES and target != NONE and target not in live:
+                if op == CALL:
+                    dest[index] = NONE
+                elif op not in EFFECTS:
+                    ops[index] = NOP
+                    removed += 1
+                    continue
+            transfer(index, live)
+    return removed
+
+
+def live_out(function, block, live_in, outer):
+    successors = function.successors(block)
+    if not successors:
+        return set(outer)
+    live = set()
+    for successor in successors:
+        live.update(live_in[successor])
+    return live
+
+
+def compact(function):
+    # Drops NOPs and the blocks out of the layout from the arrays
+    ops, dest, left, right = array('B'), array('i'), array('i'), array('i')
+    block_start = array('i', [NONE] * len(function.block_start))
+    block_end = array('i', [NONE] * len(function.block_end))
+    for block in function.layout:
+        block_start[block] = len(ops)
+        for index in function.instructions(block):
+            if function.ops[index] != NOP:
+                ops.append(function.ops[index])
+                dest.append(function.dest[index])
+                left.append(function.left[index])
+                right.append(function.right[index])
+        block_end[block] = len(ops)
+    function.ops, function.dest, function.left, function.right = ops, dest, left, right
+    function.block_start, function.block_end = block_start, block_end
+
+
+# ------------------------------------------------------
+# ------------------------------------------------------
+# ---------------------- PIPELINE ----------------------
+# ------------------------------------------------------
+# ------------------------------------------------------
+# Passes by name, with what they count
+PASSES = {
+    'fold-constants': (fold_constants, 'instructions folded'),
+    'eliminate-branches': (eliminate_branches, 'branches resolved'),
+    'remove-unreachable': (remove_unreachable_blocks, 'blocks removed'),
+    'propagate-copies': (propagate_copies, 'operands replaced'),
+    'propagate-constants': (propagate_constants, 'operands replaced'),
+    'remove-dead-temporaries': (remove_dead_temporaries, 'instructions removed'),
+    'remove-dead-stores': (remove_dead_stores, 'instructions removed'),
+}
+
+# The passes of each level, in order. At 2 they run again until a round
+# changes nothing, as each opens up work for the others.
+LEVELS = {
+    0: (),
+    1: ('fold-constants', 'propagate-copies', 'eliminate-branches', 'remove-unreachable',
+        'remove-dead-temporaries'),
+    2: ('propagate-copies', 'propagate-constants', 'fold-constants', 'eliminate-branches',
+        'remove-unreachable', 'remove-dead-stores'),
+}
+
+
+class Statistics:
+    def __init__(self, passes):
+        self.changes = dict.fromkeys(passes, 0)
+        self.before = 0
+        self.after = 0
+
+    def lines(self):
+        for name, count in self.changes.items():
+            yield f'{name:<26}{count:>10} {PASSES[name][1]}'
+        yield f'{"instructions":<26}{self.before:>10} -> {self.after}'
+
+
+def optimize(module, level=1):
+    # Optimizes every function of module in place; returns the Statistics
+    passes = LEVELS[level]
+    statistics = Statistics(passes)
+    for function in module.functions:
+        statistics.before += len(function)
+        while passes:
+            changed = 0
+            for name in passes:
+                count = PASSES[name][0](module, function)
+                statistics.changes[name] += count
+                changed += count
+            compact(function)
+            if level < 2 or not changed:
+                break
+        statistics.after += len(function)
+    return statistics
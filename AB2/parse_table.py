@@ -0,0 +1,361 @@
+# Generated by grammar.py from its GRAMMAR, do not edit. Run
+#     python3 grammar.py
+# after changing the grammar or the token kinds.
+
+VERSION = '8b53cb0845663e29'
+NONTERMINAL = 59
+START = 59
+EOF = 57
+
+# Name of every symbol: token kinds, then nonterminals
+SYMBOLS = (
+    '',
+    "'Int'",
+    "'Float'",
+    "'Char'",
+    "'String'",
+    "'Bool'",
+    "'Begin'",
+    "'End'",
+    "'If'",
+    "'Else'",
+    "'While'",
+    "'From'",
+    "'To'",
+    "'Increase'",
+    "'Get'",
+    "'Show'",
+    "'Return'",
+    "'Function'",
+    "'True'",
+    "'False'",
+    "'Array'",
+    "'Empty'",
+    "'And'",
+    "'Or'",
+    "'+'",
+    "'-'",
+    "'*'",
+    "'/'",
+    "'='",
+    "'<'",
+    "'>'",
+    "'<='",
+    "'>='",
+    'OPE_REL',
+    "'!'",
+    'ID',
+    'IDEN_INT',
+    'IDEN_FLOAT',
+    'IDEN_BOOL',
+    'IDEN_CHAR',
+    'IDEN_STRING',
+    'IDEN_ARRAY',
+    "'Begin'",
+    "'End'",
+    "'('",
+    "')'",
+    "'['",
+    "']'",
+    "'{'",
+    "'}'",
+    "','",
+    "';'",
+    'ERR_UNKNOWN',
+    'ERR_IDENTIFIER',
+    'ERR_NUMERIC',
+    'ERR_RW',
+    'ERR_CHARACTER',
+    'OTHER_EOF',
+    'OTHER_COMMENT',
+    'Program',
+    'Stmts',
+    'Stmt',
+    'Block',
+    'Else',
+    'FunDecl',
+    'FunType',
+    'Params',
+    'ParamsTail',
+    'Param',
+    'VarDecl',
+    'VarType',
+    'ElemType',
+    'BaseType',
+    'Dims',
+    'Size',
+    'Names',
+    'Init',
+    'IdStmt',
+    'Index',
+    'Args',
+    'ArgsTail',
+    'Expr',
+    'OrTail',
+    'AndExpr',
+    'AndTail',
+    'RelExpr',
+    'RelTail',
+    'RelOp',
+    'AddExpr',
+    'AddTail',
+    'MulExpr',
+    'MulTail',
+    'Unary',
+    'Primary',
+    'IdTail',
+)
+
+# (head, body) of every production
+PRODUCTIONS = (
+    (59, (6, 48, 60, 49)),
+    (60, (61, 60)),
+    (60, ()),
+    (61, (64,)),
+    (61, (69,)),
+    (61, (35, 77)),
+    (61, (8, 81, 62, 63)),
+    (61, (10, 81, 62)),
+    (61, (11, 81, 12, 81, 13, 81, 62)),
+    (61, (14, 44, 35, 78, 45, 51)),
+    (61, (15, 44, 79, 45, 51)),
+    (61, (16, 81, 51)),
+    (62, (48, 60, 49)),
+    (63, (9, 62)),
+    (63, ()),
+    (64, (17, 65, 35, 44, 66, 45, 62)),
+    (65, (70,)),
+    (65, (21,)),
+    (66, (68, 67)),
+    (66, ()),
+    (67, (50, 68, 67)),
+    (67, ()),
+    (68, (70, 35, 73)),
+    (69, (70, 35, 73, 75, 76, 51)),
+    (70, (72,)),
+    (70, (20, 71)),
+    (71, (72,)),
+    (71, ()),
+    (72, (1,)),
+    (72, (2,)),
+    (72, (5,)),
+    (72, (3,)),
+    (72, (4,)),
+    (73, (46, 74, 47)),
+    (73, ()),
+    (74, (36,)),
+    (74, ()),
+    (75, (50, 35, 73, 75)),
+    (75, ()),
+    (76, (28, 81)),
+    (76, ()),
+    (77, (44, 79, 45, 51)),
+    (77, (78, 28, 81, 51)),
+    (78, (46, 81, 47)),
+    (78, ()),
+    (79, (81, 80)),
+    (79, ()),
+    (80, (50, 81, 80)),
+    (80, ()),
+    (81, (83, 82)),
+    (82, (23, 83, 82)),
+    (82, ()),
+    (83, (85, 84)),
+    (84, (22, 85, 84)),
+    (84, ()),
+    (85, (88, 86)),
+    (86, (87, 88, 86)),
+    (86, ()),
+    (87, (33,)),
+    (87, (29,)),
+    (87, (30,)),
+    (87, (31,)),
+    (87, (32,)),
+    (88, (90, 89)),
+    (89, (24, 90, 89)),
+    (89, (25, 90, 89)),
+    (89, ()),
+    (90, (92, 91)),
+    (91, (26, 92, 91)),
+    (91, (27, 92, 91)),
+    (91, ()),
+    (92, (25, 92)),
+    (92, (34, 92)),
+    (92, (93,)),
+    (93, (44, 81, 45)),
+    (93, (35, 94)),
+    (93, (36,)),
+    (93, (37,)),
+    (93, (39,)),
+    (93, (40,)),
+    (93, (18,)),
+    (93, (19,)),
+    (94, (44, 79, 45)),
+    (94, (46, 81, 47)),
+    (94, ()),
+)
+
+# Bodies reversed, as the parser pushes them on its stack
+EXPANSIONS = (
+    (49, 60, 48, 6),
+    (60, 61),
+    (),
+    (64,),
+    (69,),
+    (77, 35),
+    (63, 62, 81, 8),
+    (62, 81, 10),
+    (62, 81, 13, 81, 12, 81, 11),
+    (51, 45, 78, 35, 44, 14),
+    (51, 45, 79, 44, 15),
+    (51, 81, 16),
+    (49, 60, 48),
+    (62, 9),
+    (),
+    (62, 45, 66, 44, 35, 65, 17),
+    (70,),
+    (21,),
+    (67, 68),
+    (),
+    (67, 68, 50),
+    (),
+    (73, 35, 70),
+    (51, 76, 75, 73, 35, 70),
+    (72,),
+    (71, 20),
+    (72,),
+    (),
+    (1,),
+    (2,),
+    (5,),
+    (3,),
+    (4,),
+    (47, 74, 46),
+    (),
+    (36,),
+    (),
+    (75, 73, 35, 50),
+    (),
+    (81, 28),
+    (),
+    (51, 45, 79, 44),
+    (51, 81, 28, 78),
+    (47, 81, 46),
+    (),
+    (80, 81),
+    (),
+    (80, 81, 50),
+    (),
+    (82, 83),
+    (82, 83, 23),
+    (),
+    (84, 85),
+    (84, 85, 22),
+    (),
+    (86, 88),
+    (86, 88, 87),
+    (),
+    (33,),
+    (29,),
+    (30,),
+    (31,),
+    (32,),
+    (89, 90),
+    (89, 90, 24),
+    (89, 90, 25),
+    (),
+    (91, 92),
+    (91, 92, 26),
+    (91, 92, 27),
+    (),
+    (92, 25),
+    (92, 34),
+    (93,),
+    (45, 81, 44),
+    (94, 35),
+    (36,),
+    (37,),
+    (39,),
+    (40,),
+    (18,),
+    (19,),
+    (45, 79, 44),
+    (47, 81, 46),
+    (),
+)
+
+# Production to expand per nonterminal and token kind, -1 for none
+TABLE = (
+    # Program
+    (-1, -1, -1, -1, -1, -1, 0, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1),
+    # Stmts
+    (-1, 1, 1, 1, 1, 1, -1, -1, 1, -1, 1, 1, -1, -1, 1, 1, 1, 1, -1, -1, 1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, 1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, 2, -1, -1, -1, -1, -1, -1, -1, -1, -1),
+    # Stmt
+    (-1, 4, 4, 4, 4, 4, -1, -1, 6, -1, 7, 8, -1, -1, 9, 10, 11, 3, -1, -1, 4, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, 5, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1),
+    # Block
+    (-1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, 12, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1),
+    # Else
+    (-1, 14, 14, 14, 14, 14, -1, -1, 14, 13, 14, 14, -1, -1, 14, 14, 14, 14, -1, -1, 14, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, 14, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, 14, -1, -1, -1, -1, -1, -1, -1, -1, -1),
+    # FunDecl
+    (-1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, 15, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1),
+    # FunType
+    (-1, 16, 16, 16, 16, 16, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, 16, 17, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1),
+    # Params
+    (-1, 18, 18, 18, 18, 18, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, 18, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, 19, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1),
+    # ParamsTail
+    (-1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, 21, -1, -1, -1, -1, 20, -1, -1, -1, -1, -1, -1, -1, -1),
+    # Param
+    (-1, 22, 22, 22, 22, 22, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, 22, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1),
+    # VarDecl
+    (-1, 23, 23, 23, 23, 23, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, 23, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1),
+    # VarType
+    (-1, 24, 24, 24, 24, 24, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, 25, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1),
+    # ElemType
+    (-1, 26, 26, 26, 26, 26, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, 27, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1),
+    # BaseType
+    (-1, 28, 29, 31, 32, 30, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1),
+    # Dims
+    (-1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, 34, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, 34, 33, -1, -1, -1, 34, 34, -1, -1, -1, -1, -1, -1, -1),
+    # Size
+    (-1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, 35, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, 36, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1),
+    # Names
+    (-1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, 38, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, 37, 38, -1, -1, -1, -1, -1, -1, -1),
+    # Init
+    (-1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, 39, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, 40, -1, -1, -1, -1, -1, -1, -1),
+    # IdStmt
+    (-1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, 42, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, 41, -1, 42, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1),
+    # Index
+    (-1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, 44, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, 44, 43, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1),
+    # Args
+    (-1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, 45, 45, -1, -1, -1, -1, -1, 45, -1, -1, -1, -1, -1, -1, -1, -1, 45, 45, 45, 45, -1, 45, 45, -1, -1, -1, 45, 46, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1),
+    # ArgsTail
+    (-1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, 48, -1, -1, -1, -1, 47, -1, -1, -1, -1, -1, -1, -1, -1),
+    # Expr
+    (-1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, 49, 49, -1, -1, -1, -1, -1, 49, -1, -1, -1, -1, -1, -1, -1, -1, 49, 49, 49, 49, -1, 49, 49, -1, -1, -1, 49, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1),
+    # OrTail
+    (-1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, 51, 51, -1, -1, -1, -1, -1, -1, -1, -1, -1, 50, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, 51, -1, 51, 51, -1, 51, 51, -1, -1, -1, -1, -1, -1, -1),
+    # AndExpr
+    (-1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, 52, 52, -1, -1, -1, -1, -1, 52, -1, -1, -1, -1, -1, -1, -1, -1, 52, 52, 52, 52, -1, 52, 52, -1, -1, -1, 52, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1),
+    # AndTail
+    (-1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, 54, 54, -1, -1, -1, -1, -1, -1, -1, -1, 53, 54, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, 54, -1, 54, 54, -1, 54, 54, -1, -1, -1, -1, -1, -1, -1),
+    # RelExpr
+    (-1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, 55, 55, -1, -1, -1, -1, -1, 55, -1, -1, -1, -1, -1, -1, -1, -1, 55, 55, 55, 55, -1, 55, 55, -1, -1, -1, 55, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1),
+    # RelTail
+    (-1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, 57, 57, -1, -1, -1, -1, -1, -1, -1, -1, 57, 57, -1, -1, -1, -1, -1, 56, 56, 56, 56, 56, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, 57, -1, 57, 57, -1, 57, 57, -1, -1, -1, -1, -1, -1, -1),
+    # RelOp
+    (-1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, 59, 60, 61, 62, 58, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1),
+    # AddExpr
+    (-1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, 63, 63, -1, -1, -1, -1, -1, 63, -1, -1, -1, -1, -1, -1, -1, -1, 63, 63, 63, 63, -1, 63, 63, -1, -1, -1, 63, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1),
+    # AddTail
+    (-1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, 66, 66, -1, -1, -1, -1, -1, -1, -1, -1, 66, 66, 64, 65, -1, -1, -1, 66, 66, 66, 66, 66, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, 66, -1, 66, 66, -1, 66, 66, -1, -1, -1, -1, -1, -1, -1),
+    # MulExpr
+    (-1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, 67, 67, -1, -1, -1, -1, -1, 67, -1, -1, -1, -1, -1, -1, -1, -1, 67, 67, 67, 67, -1, 67, 67, -1, -1, -1, 67, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1),
+    # MulTail
+    (-1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, 70, 70, -1, -1, -1, -1, -1, -1, -1, -1, 70, 70, 70, 70, 68, 69, -1, 70, 70, 70, 70, 70, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, 70, -1, 70, 70, -1, 70, 70, -1, -1, -1, -1, -1, -1, -1),
+    # Unary
+    (-1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, 73, 73, -1, -1, -1, -1, -1, 71, -1, -1, -1, -1, -1, -1, -1, -1, 72, 73, 73, 73, -1, 73, 73, -1, -1, -1, 73, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1),
+    # Primary
+    (-1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, 80, 81, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, 75, 76, 77, -1, 78, 79, -1, -1, -1, 74, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1),
+    # IdTail
+    (-1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, 84, 84, -1, -1, -1, -1, -1, -1, -1, -1, 84, 84, 84, 84, 84, 84, -1, 84, 84, 84, 84, 84, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, 82, 84, 83, 84, 84, -1, 84, 84, -1, -1, -1, -1, -1, -1, -1),
+)
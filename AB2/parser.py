@@ -1,197 +1,577 @@
-import traceback
-from abc import ABC, abstractmethod
-
-class Token:
-    def __init__(self, tkn_cat, lexem, position):
-        self.tkn_cat = tkn_cat
-        self.lexem = lexem
-        self.position = position
-
-class Parser(ABC):
-    def __init__(self, file_path):
-        self.lexem = ''
-        self.row = self.col = self.pos = 1
-        self.state = self.pos = 0
-        self.current_line = ' '
-        self.content = list(self.current_line)
-
-        try:
-            self.file_reader = open(file_path, 'rb')
-        except IOError as e:
-            print(f'Error: {e}')
-            traceback.print_exc()
-    
-    def next_line(self):
-        aux = ''
-
-        try:
-            aux = self.file_reader.readline().decode('utf-8')
-        except IOError as e:
-            print(f'Error: {e}')
-            traceback.print_exc()
-        
-        if aux != '':
-            self.current_line = aux
-            self.print_info()
-            self.current_line += ' '
-            self.row += 1
-            self.pos = self.col = 0
-
-            return True
-
-        return False
-    
-    def next_char(self):
-        self.pos += 1
-        return self.content[self.pos - 1]
-
-    def back(self):
-        self.pos -= 1
-    
-    def print_info(self):
-        print(f'{self.row} - {self.current_line}')
-
-    def is_EOF(self):
-        return self.pos == len(self.content)
-    
-    def next_token(self):
-        self.state = 1
-        self.lexem = ''
+import marshal
+import sys
+import types
+from array import array
+from os.path import abspath, dirname, join
+
+sys.path.insert(0, join(dirname(dirname(abspath(__file__))), 'AnalisadorLéxico'))
+
+import diagnostics
+import grammar
+import lexer
+import stream
+import token_kinds
+from token_kinds import Kind
+
+
+# ------------------------------------------------------
+# ------------------------------------------------------
+# -------------------- PARSE TABLE ---------------------
+# ------------------------------------------------------
+# ------------------------------------------------------
+def load_table():
+    # The parse table generated by grammar.py. If the grammar or the token
+    # kinds changed since, it is rebuilt in memory instead, which is what
+    # every start would cost without it
+    try:
+        import parse_table
+    except ImportError:
+        parse_table = None
+    if parse_table is not None and parse_table.VERSION == grammar.VERSION:
+        return parse_table
+
+    print('Parse table is out of date, run python3 grammar.py', file=sys.stderr)
+    module = types.ModuleType('parse_table')
+    exec(grammar.generate(), module.__dict__)
+    return module
+
+
+def expected(symbol):
+    # Kinds the parse table has an entry for in the row of symbol
+    row = PARSE_TABLE.TABLE[symbol - PARSE_TABLE.NONTERMINAL]
+    return [kind for kind, production in enumerate(row) if production >= 0]
+
+
+def symbol(name):
+    return PARSE_TABLE.SYMBOLS.index(name)
+
+
+PARSE_TABLE = load_table()
+STMTS = symbol('Stmts')
+
+
+# ------------------------------------------------------
+# ------------------------------------------------------
+# -------------------- EXPRESSIONS ---------------------
+# ------------------------------------------------------
+# ------------------------------------------------------
+# Binary operators by precedence, loosest first, as spelled in the shared
+# token dictionary; each level binds with its position, from 1
+PRECEDENCE = (
+    ('Or',),
+    ('And',),
+    ('OPE_REL', '<', '>', 'OPE_LE', 'OPE_GE'),
+    ('+', '-'),
+    ('*', '/'),
+)
+
+
+def binding_powers(precedence):
+    groups = (token_kinds.TOKEN_DICT.RESERVED_WORDS, token_kinds.TOKEN_DICT.OPERATORS)
+    powers = {}
+    for power, spellings in enumerate(precedence, 1):
+        for spelling in spellings:
+            group = next(group for group in groups if spelling in group)
+            powers[group[spelling][1]] = power
+    return powers
+
+
+def expression_levels(binding_power):
+    # The grammar has two nonterminals per level: from Expr on, the head of
+    # a level expands to the head of the next one and the level's tail,
+    # which goes on with an operator of the level. Returns the expansion of
+    # every head, loosest first, once checked against the binding powers.
+    table = PARSE_TABLE.TABLE
+    nonterminal = PARSE_TABLE.NONTERMINAL
+    heads = []
+    head = EXPR
+    while head != UNARY:
+        production = table[head - nonterminal][Kind.ID]
+        operand, tail = PARSE_TABLE.PRODUCTIONS[production][1]
+        power = len(heads) + 1
+        operators = {kind for kind in expected(tail) if PARSE_TABLE.PRODUCTIONS[table[tail - nonterminal][kind]][1]}
+        if operators != {kind for kind in binding_power if binding_power[kind] == power}:
+            raise grammar.GrammarError(f'Operators of {PARSE_TABLE.SYMBOLS[tail]} do not match PRECEDENCE')
+        heads.append(PARSE_TABLE.EXPANSIONS[production])
+        head = operand
+    if len(heads) != len(PRECEDENCE):
+        raise grammar.GrammarError('Expression levels do not match PRECEDENCE')
+    return tuple(heads)
+
+
+EXPR = symbol('Expr')
+UNARY = symbol('Unary')
+PRIMARY = symbol('Primary')
+ID_TAIL = symbol('IdTail')
+ARGS = symbol('Args')
+ARGS_TAIL = symbol('ArgsTail')
+BINDING_POWER = binding_powers(PRECEDENCE)
+HEAD_EXPANSIONS = expression_levels(BINDING_POWER)
+LEVELS = len(HEAD_EXPANSIONS)
+
+# What may come at the start of an operand (of the first argument of a
+# call, which may also close it), and right after an operand: after a lone
+# identifier also what calls or indexes it
+OPERAND = frozenset(expected(UNARY))
+ARGUMENTS = frozenset(expected(ARGS))
+AFTER_OPERAND = frozenset(expected(symbol('MulTail')))
+AFTER_ID = frozenset(expected(ID_TAIL))
+PREFIX = frozenset((Kind.OPE_SUB, Kind.OPE_NEG))
+
+# Frames an expression opens, by the kind that closes them; a call's
+# arguments are closed by ')' too
+CALL = -1
+
+
+# ------------------------------------------------------
+# ------------------------------------------------------
+# --------------------- PARSE TREE ---------------------
+# ------------------------------------------------------
+# ------------------------------------------------------
+class ParseTree:
+    # Arena of parallel arrays, one entry per node: its symbol (a token
+    # kind or a nonterminal), first child and next sibling (-1 for none)
+    # and, for tokens, the index of the Token in tokens. Node 0 is the root;
+    # the children of a node are allocated together, in order.
+    def __init__(self):
+        self.kinds = array('H', [PARSE_TABLE.START])
+        self.first_child = array('i', [-1])
+        self.next_sibling = array('i', [-1])
+        self.token_index = array('i', [-1])
+        self.tokens = []
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def expand(self, node, body):
+        # Children of node for a production body given reversed, as in
+        # EXPANSIONS; returns them reversed too, ready to be pushed
+        first = len(self.kinds)
+        count = len(body)
+        if not count:
+            return ()
+        self.kinds.extend(body[::-1])
+        self.first_child.extend([-1] * count)
+        self.next_sibling.extend(range(first + 1, first + count))
+        self.next_sibling.append(-1)
+        self.token_index.extend([-1] * count)
+        self.first_child[node] = first
+        return range(first + count - 1, first - 1, -1)
+
+    def attach(self, node, token):
+        self.token_index[node] = len(self.tokens)
+        self.tokens.append(token)
+
+    def children(self, node):
+        child = self.first_child[node]
+        while child >= 0:
+            yield child
+            child = self.next_sibling[child]
+
+    def lines(self):
+        # The tree in preorder, one line per node: productions indented by
+        # 10 spaces, tokens as the lexer prints them (14). Produced one at a
+        # time from an explicit stack, so any size or depth streams out.
+        symbols = PARSE_TABLE.SYMBOLS
+        nonterminal = PARSE_TABLE.NONTERMINAL
+        kinds = self.kinds
+        productions = {}
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            kind = kinds[node]
+            if kind < nonterminal:
+                index = self.token_index[node]
+                if index >= 0:
+                    yield repr(self.tokens[index])
+                continue
+
+            children = list(self.children(node))
+            production = (kind,) + tuple(kinds[child] for child in children)
+            line = productions.get(production)
+            if line is None:
+                line = f'          {grammar.production_text(symbols, kind, production[1:])}'
+                productions[production] = line
+            yield line
+            stack.extend(reversed(children))
+
+
+# ------------------------------------------------------
+# ------------------------------------------------------
+# ---------------------- PARSER ------------------------
+# ------------------------------------------------------
+# ------------------------------------------------------
+class ParseError(Exception):
+    def __init__(self, token, expected):
+        self.token = token
+        self.expected = expected
+        names = ', '.join(sorted(PARSE_TABLE.SYMBOLS[kind] for kind in expected))
+        self.detail = f"expected {names}, found {token.tkn_cat[0]} '{token.lexem}'"
+        row, col = token.position
+        super().__init__(f'Syntax error at [{row}, {col}]: {self.detail}')
+
+
+# Error tokens the lexer passes on (unknown capitalized words, and
+# non-ASCII characters for the bytes engine)
+ERROR_KINDS = {tkn_cat[1] for tkn_cat in token_kinds.TOKEN_DICT.ERRORS.values()}
+
+# Panic mode skips to one of these: the end of a statement or of a block
+SYNC_KINDS = {Kind.DELI_SEMICOL, Kind.DELI_CCURLY, Kind.OTHER_EOF}
+
+
+def terminal(token):
+    # The lexer gives '=' the category of '!' (OPE_NEG); the grammar needs
+    # the assignment apart
+    kind = token.tkn_cat[1]
+    if kind == Kind.OPE_NEG and token.lexem == '=':
+        return Kind.OPE_ATR
+    return kind
+
+
+class Parser:
+    # Table-driven LL(1) parser: an explicit stack of grammar symbols is
+    # expanded with the parse table, one step per production or token, so
+    # the nesting of the program never reaches Python's recursion limit.
+    # Tokens are pulled through a stream.TokenStream as they are needed;
+    # being LL(1), the parser never peeks past the current one. Without
+    # diagnostics it stops at the first syntax error; with them it reports
+    # every error there and recovers (see recover).
+    def __init__(self, tokens, trace=None, tree=False, diagnostics=None):
+        self.tokens = stream.TokenStream(tokens)
+        self.trace = trace
+        self.tree = ParseTree() if tree else None
+        self.diagnostics = diagnostics
+
+    def parse(self):
+        # Consumes every token up to EOF and returns how many matched;
+        # raises ParseError at the first token the grammar does not allow,
+        # unless there are diagnostics. With a tree, nodes holds the node of
+        # every symbol on the stack. Expressions go to expression, unless
+        # every step is traced.
+        table = PARSE_TABLE.TABLE
+        expansions = PARSE_TABLE.EXPANSIONS
+        nonterminal = PARSE_TABLE.NONTERMINAL
+        eof = PARSE_TABLE.EOF
+        trace = self.trace
+        next_token = self.tokens.__next__
+        tree = self.tree
+
+        stack = [eof, PARSE_TABLE.START]
+        nodes = [-1, 0]
+        token = next_token()
+        kind = terminal(token)
+        count = 0
+        while True:
+            top = stack.pop()
+            if top >= nonterminal:
+                if top == EXPR and trace is None:
+                    try:
+                        token, kind, matched = self.expression(token, kind, nodes.pop() if tree is not None else -1)
+                    except ParseError as error:
+                        count += error.matched
+                        token, kind = self.recover(error, stack, nodes)
+                        continue
+                    count += matched
+                    continue
+                production = table[top - nonterminal][kind]
+                if production < 0:
+                    stack.append(top)
+                    token, kind = self.recover(ParseError(token, expected(top)), stack, nodes)
+                    continue
+                if trace is not None:
+                    trace(production)
+                stack.extend(expansions[production])
+                if tree is not None:
+                    nodes.extend(tree.expand(nodes.pop(), expansions[production]))
+            elif top == kind:
+                if trace is not None:
+                    trace(token)
+                count += 1
+                if kind == eof:
+                    return count
+                if tree is not None:
+                    tree.attach(nodes.pop(), token)
+                token = next_token()
+                kind = terminal(token)
+            else:
+                stack.append(top)
+                token, kind = self.recover(ParseError(token, [top]), stack, nodes)
+
+    def recover(self, error, stack, nodes):
+        # Panic mode: the error is reported, the tokens up to the next ';',
+        # '}' or EOF skipped and the stack unwound to the innermost list of
+        # statements, which goes on after a ';' and ends at a '}'. An error
+        # token of the lexer is only reported and skipped. Returns the token
+        # to go on with, and its kind.
+        if self.diagnostics is None:
+            raise error
+        next_token = self.tokens.__next__
+        token = error.token
+        kind = terminal(token)
+        if kind in ERROR_KINDS:
+            self.diagnostics.lexical(token)
+            token = next_token()
+            return token, terminal(token)
+
+        self.diagnostics.report(diagnostics.SYNTAX, token.position, error.detail)
+        # A block opened among the skipped tokens is skipped whole: its ';'
+        # and '}' are not on the stack, and the '}' ends the statement in
+        # error as a ';' would
+        depth = 0
+        closed = False
+        while kind not in SYNC_KINDS or depth and kind != PARSE_TABLE.EOF:
+            if kind == Kind.DELI_OCURLY:
+                depth += 1
+            elif kind == Kind.DELI_CCURLY:
+                depth -= 1
+                if not depth:
+                    closed = True
+                    break
+            token = next_token()
+            kind = terminal(token)
+            if kind in ERROR_KINDS:
+                self.diagnostics.lexical(token)
+
+        # The EOF at the bottom of the stack stays
+        stmts = STMTS if kind != PARSE_TABLE.EOF else None
+        while len(stack) > 1 and stack[-1] != stmts:
+            stack.pop()
+            if self.tree is not None:
+                nodes.pop()
+        if len(stack) == 1:
+            while kind != PARSE_TABLE.EOF:
+                token = next_token()
+                kind = terminal(token)
+        elif kind == Kind.DELI_SEMICOL or closed:
+            token = next_token()
+            kind = terminal(token)
+        return token, kind
+
+    def expression(self, token, kind, node):
+        # Precedence climbing over the expression at token, in place of the
+        # chain of nonterminals the grammar has per level: returns the token
+        # after it, its kind and how many tokens it took. Each turn of the
+        # loop is one operand and what follows it; parentheses, calls and
+        # indexes open a frame on an explicit stack. With a tree, node is
+        # the Expr, tails holds the open tail of every level and an operator
+        # extends the one of its binding power, so that the same nodes are
+        # expanded in the same order as with the table. Errors expect what
+        # the table would have expected.
+        tokens = self.tokens
+        # Nothing is peeked during an expression: tokens can come straight
+        # from the lexer if none was before
+        next_token = tokens.__next__ if tokens.count else tokens.source.__next__
+        tree = self.tree
+        table = PARSE_TABLE.TABLE
+        expansions = PARSE_TABLE.EXPANSIONS
+        nonterminal = PARSE_TABLE.NONTERMINAL
+        binding_power = BINDING_POWER
+        open_paren = Kind.DELI_OPAREN
+        close_paren = Kind.DELI_CPAREN
+        open_bracket = Kind.DELI_OBRAC
+        comma = Kind.DELI_COMMA
+        identifier = Kind.ID
+        negation = Kind.OPE_NEG
+
+        # [closing kind or CALL, node of the closing token, tails outside,
+        # ArgsTail node of a call]
+        frames = []
+        tails = [-1] * LEVELS
+        level = 0
+        count = 0
         while True:
-            if self.is_EOF():
-                if self.next_line():
-                    self.content = list(self.current_line)
-                else:
-                    return Token(
-                        LEX_DICT.OTHER['EOF'],
-                        'EOF',
-                        (self.row, self.col)
-                    )
-
-            current_char = self.next_char()
-            process_state = None
-
-            current_state = STATES[self.state](self)
-
-            process_state = current_state.process_state(current_char)
-            if process_state:
-                return process_state
-
-
-class NodePair:
-    def __init__(self, rightNode: Token, leftNode: Token):
-        self.rightNode = rightNode
-        self.leftNode = leftNode
-    # Reescrever o método def __repr__(self) que imprima a produção da árvore com identação de 10 espaços e os tokens com identação de 14 espaços:
-
-class PARSER_DICT:
-        RESERVED_WORDS = {
-        'Int':      ('RW_INT',      1 ),
-        'float':    ('RW_FLOAT',    2 ),
-        'Char':     ('RW_CHAR',     3 ),
-        'String':   ('RW_STRING',   4 ),
-        'Bool':     ('RW_BOOL',     5 ),
-        'Begin':    ('RW_BEGIN',    6 ),
-        'End':      ('RW_END',      7 ),
-        'If':       ('RW_IF',       8 ),
-        'Else':     ('RW_ELSE',     9 ),
-        'While':    ('RW_WHILE',    10),
-        'From':     ('RW_FROM',     11),
-        'To':       ('RW_TO',       12),
-        'Increase': ('RW_INCREASE', 13),
-        'Get':      ('RW_GET',      14),
-        'Show':     ('RW_SHOW',     15),
-        'Return':   ('RW_RETURN',   16),
-        'Function': ('RW_FUNCTION', 17),
-        'True':     ('RW_TRUE',     18),
-        'False':    ('RW_FALSE',    19),
-        'Array':    ('RW_ARRAY',    20),
-        'Empty':    ('RW_EMPTY',    21),
-        'And':      ('OPE_CONJ',    22),
-        'Or':       ('OPE_DISJ',    23)
-    }
-
-        OPERATORS = {
-            '+':       ('OPE_ADD',  24),
-            '-':       ('OPE_SUB',  25),
-            '*':       ('OPE_MUL',  26),
-            '/':       ('OPE_DIV',  27),
-            '=':       ('OPE_ATR',  28),
-            '<':       ('OPE_LT',   29),
-            '>':       ('OPE_GT',   30),
-            'OPE_LE':  ('OPE_LE',   31),
-            'OPE_GE':  ('OPE_GE',   32),
-            'OPE_REL': ('OPE_REL',  33),
-            '!':       ('OPE_NEG',  34)
-        }
-
-        IDENTIFIERS = {
-            'ID':          ('ID',          35),
-            'IDEN_INT':    ('IDEN_INT',    36),
-            'IDEN_FLOAT':  ('IDEN_FLOAT',  37),
-            'IDEN_BOOL':   ('IDEN_BOOL',   38),
-            'IDEN_CHAR':   ('IDEN_CHAR',   39),
-            'IDEN_STRING': ('IDEN_STRING', 40),
-            'IDEN_ARRAY':  ('IDEN_ARRAY',  41)
-        }
-
-        DELIMITERS = {
-            'Begin': ('DELI_BEGIN',   42),
-            'End':   ('DELI_END',     43),
-            '(':     ('DELI_OPAREN',  44),
-            ')':     ('DELI_CPAREN',  45),
-            '[':     ('DELI_OBRAC',   46),
-            ']':     ('DELI_CBRAC',   47),
-            '{':     ('DELI_OCURLY',  48),
-            '}':     ('DELI_CCURLY',  49),
-            ',':     ('DELI_COMMA',   50),
-            ';':     ('DELI_SEMICOL', 51)
-        }
-
-        ERRORS = {
-            'ERR_UNKNOWN':    ('ERR_UNKNOWN',    52),
-            'ERR_IDENTIFIER': ('ERR_IDENTIFIER', 53),
-            'ERR_NUMERIC':    ('ERR_NUMERIC',    54),
-            'ERR_RW':         ('ERR_RW',         55),
-            'ERR_CHARACTER':  ('ERR_CHARACTER',  56),
-        }
-
-        OTHER = {
-            'EOF':     ('OTHER_EOF',     57),
-            'COMMENT': ('OTHER_COMMENT', 58)
-        }
-
-        OPERATORS_LIST = ['+', '-', '*', '/', '!']
-        DELIMITERS_LIST = ['(', ')', '[', ']', '{', '}', ',', ';']
-
-class VariableTable:
-    # Classe para a tabela de variáveis
-
-    varTable = {}
-    
-    #Adiciona uma variável na tabela
-    def add_variable(varTable, var, value):
-        if var not in varTable:
-            varTable[var] = value
-            return True
-        else:
-            print('ERRO: Variável já instanciada')
-            return False
-    
-    #Muda o valor da variável na tabela
-    def change_variable_value(varTable, var, value):
-        if var not in varTable:
-            print('ERRO: Variável não encontrada')
-            return False
-        else:
-            varTable[var] = value
-            return True
-    
-    #Retorna o valor de uma variável na tabela
-    def get_variable_value(varTable, var):
-        if var not in varTable:
-            print('ERRO: Variável não encontrada')
-            return False
-        else:
-            return varTable.get(var)
+            # '=' comes as OPE_NEG (see terminal), and never fits here
+            if kind not in OPERAND or kind == negation and token.lexem == '=':
+                token, kind = self.expression_error(token, kind, OPERAND, count)
+                continue
+            if tree is not None:
+                for index in range(level, LEVELS):
+                    tails[index], node = tree.expand(node, HEAD_EXPANSIONS[index])
+            level = LEVELS
+            if kind in PREFIX:
+                if tree is not None:
+                    node, prefix = tree.expand(node, expansions[table[UNARY - nonterminal][kind]])
+                    tree.attach(prefix, token)
+                count += 1
+                token = next_token()
+                kind = token.tkn_cat[1]
+                continue
+
+            if tree is not None:
+                (node,) = tree.expand(node, expansions[table[UNARY - nonterminal][kind]])
+                children = tree.expand(node, expansions[table[PRIMARY - nonterminal][kind]])
+                tree.attach(children[-1], token)
+            count += 1
+            token = next_token()
+            if kind == open_paren:
+                frames.append([close_paren, children[0] if tree is not None else -1, tails, -1])
+                if tree is not None:
+                    node = children[1]
+                tails = [-1] * LEVELS
+                level = 0
+                kind = token.tkn_cat[1]
+                continue
+            allowed = AFTER_ID if kind == identifier else AFTER_OPERAND
+            kind = token.tkn_cat[1]
+            # Error tokens right after an identifier are skipped before its
+            # tail: a '[' or '(' after them still indexes or calls it
+            while allowed is AFTER_ID and kind in ERROR_KINDS:
+                token, kind = self.expression_error(token, kind, allowed, count)
+            if allowed is AFTER_ID and (kind == open_paren or kind == open_bracket):
+                closing = -1
+                if tree is not None:
+                    children = tree.expand(children[0], expansions[table[ID_TAIL - nonterminal][kind]])
+                    tree.attach(children[-1], token)
+                    closing, node = children[0], children[1]
+                count += 1
+                token = next_token()
+                if kind == open_bracket:
+                    frames.append([Kind.DELI_CBRAC, closing, tails, -1])
+                    tails = [-1] * LEVELS
+                    level = 0
+                    kind = token.tkn_cat[1]
+                    continue
+                kind = token.tkn_cat[1]
+                while kind not in ARGUMENTS or kind == negation and token.lexem == '=':
+                    token, kind = self.expression_error(token, kind, ARGUMENTS, count)
+                if kind != close_paren:
+                    frame = [CALL, closing, tails, -1]
+                    if tree is not None:
+                        frame[3], node = tree.expand(node, expansions[table[ARGS - nonterminal][kind]])
+                    frames.append(frame)
+                    tails = [-1] * LEVELS
+                    level = 0
+                    continue
+                # A call without arguments
+                if tree is not None:
+                    tree.attach(closing, token)
+                count += 1
+                token = next_token()
+                kind = token.tkn_cat[1]
+                allowed = AFTER_OPERAND
+
+            # After an operand: the operators that go on with the expression,
+            # or the tokens that close frames, until the one after it
+            while True:
+                power = binding_power.get(kind)
+                if power is not None:
+                    if tree is not None:
+                        tail = tails[power - 1]
+                        tails[power - 1], node, operator = tree.expand(
+                            tail, expansions[table[tree.kinds[tail] - nonterminal][kind]])
+                        while tree.kinds[operator] >= nonterminal:
+                            (operator,) = tree.expand(operator, expansions[table[tree.kinds[operator] - nonterminal][kind]])
+                        tree.attach(operator, token)
+                    level = power
+                    break
+                if kind not in allowed:
+                    token, kind = self.expression_error(token, kind, allowed, count)
+                    continue
+                if not frames:
+                    return token, kind, count
+                frame = frames[-1]
+                if frame[0] == CALL and kind == comma:
+                    if tree is not None:
+                        frame[3], node, separator = tree.expand(frame[3], expansions[table[ARGS_TAIL - nonterminal][kind]])
+                        tree.attach(separator, token)
+                    tails = [-1] * LEVELS
+                    level = 0
+                    break
+                if kind != frame[0] and (frame[0] != CALL or kind != close_paren):
+                    closing = expected(ARGS_TAIL) if frame[0] == CALL else [frame[0]]
+                    token, kind = self.expression_error(token, kind, closing, count)
+                    continue
+                if tree is not None:
+                    tree.attach(frame[1], token)
+                frames.pop()
+                tails = frame[2]
+                allowed = AFTER_OPERAND
+                count += 1
+                token = next_token()
+                kind = token.tkn_cat[1]
+            count += 1
+            token = next_token()
+            kind = token.tkn_cat[1]
+
+    def expression_error(self, token, kind, allowed, count):
+        # An error token of the lexer is reported and skipped, to go on
+        # where it was; anything else is a ParseError, which keeps the count
+        # of tokens the expression took
+        if kind not in ERROR_KINDS or self.diagnostics is None:
+            error = ParseError(token, sorted(allowed))
+            error.matched = count
+            raise error
+        self.diagnostics.lexical(token)
+        token = self.tokens.__next__()
+        return token, token.tkn_cat[1]
+
+
+def token_source(file_path, engine='mapped', line_trace=None, threaded=False, diagnostics=None, store=None):
+    # The lexer's tokens, produced as the parser pulls them, or scanned
+    # ahead in a thread of its own (see stream.ThreadedTokens). Either way
+    # only a bounded number of tokens is held at a time. store is the
+    # lexer's cache (see lexer.tokenize).
+    tokens = lexer.tokenize(file_path, engine, line_trace, diagnostics=diagnostics, store=store)
+    return stream.ThreadedTokens(tokens) if threaded else tokens
+
+
+def parse(file_path, engine='mapped', trace=None, line_trace=None, threaded=False, diagnostics=None, store=None):
+    # Parses a file straight from the lexer's tokens; trace gets every
+    # production expanded and token matched (see print_step), line_trace
+    # every source line (see lexer.print_line). With diagnostics, the
+    # lexer's and the parser's errors all go there.
+    tokens = token_source(file_path, engine, line_trace, threaded, diagnostics, store)
+    try:
+        return Parser(tokens, trace, diagnostics=diagnostics).parse()
+    finally:
+        tokens.close()
+
+
+def parse_tree(file_path, engine='mapped', threaded=False, diagnostics=None, store=None):
+    tokens = token_source(file_path, engine, threaded=threaded, diagnostics=diagnostics, store=store)
+    try:
+        parser = Parser(tokens, tree=True, diagnostics=diagnostics)
+        parser.parse()
+    finally:
+        tokens.close()
+    return parser.tree
+
+
+def dump_result(tree, errors):
+    # A parse as the cache keeps it: the arrays of the tree (or None) as
+    # bytes, its tokens and the diagnostics as tuples, all marshalled
+    arrays = None
+    if tree is not None:
+        arrays = (tree.kinds.tobytes(), tree.first_child.tobytes(), tree.next_sibling.tobytes(),
+                  tree.token_index.tobytes(), [(token.tkn_cat, token.lexem, token.position) for token in tree.tokens])
+    return marshal.dumps((arrays, [(error.kind, error.position, error.message) for error in errors]))
+
+
+def load_result(data):
+    # The tree (or None) and the diagnostics of dump_result
+    arrays, errors = marshal.loads(data)
+    tree = None
+    if arrays is not None:
+        tree = ParseTree()
+        for name, code, values in zip(('kinds', 'first_child', 'next_sibling', 'token_index'), 'Hiii', arrays):
+            column = array(code)
+            column.frombytes(values)
+            setattr(tree, name, column)
+        tree.tokens = [lexer.Token(*fields) for fields in arrays[4]]
+    return tree, [diagnostics.Diagnostic(*fields) for fields in errors]
+
+
+def print_step(step):
+    # Trace hook that prints the derivation: productions indented by 10
+    # spaces, tokens as the lexer prints them (14)
+    if isinstance(step, int):
+        head, body = PARSE_TABLE.PRODUCTIONS[step]
+        print(f'          {grammar.production_text(PARSE_TABLE.SYMBOLS, head, body)}')
+    else:
+        print(step)
+
 
+# Shared with the lexer (AnalisadorLéxico/token_kinds.py)
+PARSER_DICT = token_kinds.TOKEN_DICT
+OPERATORS_LIST = token_kinds.OPERATORS_LIST
+DELIMITERS_LIST = token_kinds.DELIMITERS_LIST
@@ -0,0 +1,161 @@
+import diagnostics
+import parser
+
+
+# ------------------------------------------------------
+# ------------------------------------------------------
+# -------------------- SYMBOL TABLE --------------------
+# ------------------------------------------------------
+# ------------------------------------------------------
+class SymbolError(Exception):
+    def __init__(self, message, name, position=None):
+        self.name = name
+        self.position = position
+        self.detail = message
+        if position is not None:
+            message = f'Semantic error at [{position[0]}, {position[1]}]: {message}'
+        super().__init__(message)
+
+
+class VariableTable:
+    # Scoped table of names. Names are interned to ids; bindings holds, per
+    # id, the stack of its bindings as (scope depth, value), innermost
+    # last, so a lookup is one dict access. Every binding made is logged,
+    # and leaving a scope pops the ones it made and nothing else.
+    def __init__(self):
+        self.ids = {}
+        self.names = []
+        self.bindings = {}
+        self.undo_log = []
+        self.scopes = []
+
+    def intern(self, name):
+        name_id = self.ids.get(name)
+        if name_id is None:
+            name_id = self.ids[name] = len(self.names)
+            self.names.append(name)
+        return name_id
+
+    @property
+    def depth(self):
+        return len(self.scopes)
+
+    def enter_scope(self):
+        self.scopes.append(len(self.undo_log))
+
+    def exit_scope(self):
+        mark = self.scopes.pop()
+        while len(self.undo_log) > mark:
+            name_id = self.undo_log.pop()
+            stack = self.bindings[name_id]
+            stack.pop()
+            if not stack:
+                del self.bindings[name_id]
+
+    def add_variable(self, name, value, position=None):
+        # Binds name in the current scope, shadowing outer ones
+        name_id = self.intern(name)
+        stack = self.bindings.setdefault(name_id, [])
+        if stack and stack[-1][0] == self.depth:
+            raise SymbolError(f"'{name}' already declared in this scope", name, position)
+        stack.append((self.depth, value))
+        self.undo_log.append(name_id)
+        return name_id
+
+    def lookup(self, name):
+        # (depth, value) of the innermost binding of name, None if unbound
+        stack = self.bindings.get(self.ids.get(name))
+        return stack[-1] if stack else None
+
+    def change_variable_value(self, name, value, position=None):
+        stack = self.bindings.get(self.ids.get(name))
+        if not stack:
+            raise SymbolError(f"'{name}' not declared", name, position)
+        stack[-1] = (stack[-1][0], value)
+
+    def get_variable_value(self, name, position=None):
+        binding = self.lookup(name)
+        if binding is None:
+            raise SymbolError(f"'{name}' not declared", name, position)
+        return binding[1]
+
+
+# ------------------------------------------------------
+# ------------------------------------------------------
+# -------------------- DECLARATIONS --------------------
+# ------------------------------------------------------
+# ------------------------------------------------------
+def nonterminal(name):
+    return parser.PARSE_TABLE.SYMBOLS.index(name)
+
+
+# Identifiers declared by their parent node; every other one is a use
+DECLARING = {nonterminal(name) for name in ('FunDecl', 'Param', 'VarDecl', 'Names')}
+FUNCTION = nonterminal('FunDecl')
+BLOCK = nonterminal('Block')
+ID = parser.Kind.ID
+SEMANTIC = diagnostics.SEMANTIC
+
+# Scope marks on the walk's stack, in place of a node
+ENTER = -1
+EXIT = -2
+
+
+def is_call(tree, node):
+    # Whether the identifier at node is called: the IdStmt or IdTail after
+    # it starts with '('
+    tail = tree.next_sibling[node]
+    first = tree.first_child[tail] if tail >= 0 else -1
+    return first >= 0 and tree.kinds[first] == parser.Kind.DELI_OPAREN
+
+
+def check_declarations(tree, diagnostics=None):
+    # Every identifier used where none is visible, declared twice in one
+    # scope, or called without being a function (and the other way round),
+    # as SymbolErrors, also reported to diagnostics if given. The tree is
+    # walked once, in preorder from an explicit stack, so the cost is
+    # linear whatever the nesting.
+    table = VariableTable()
+    errors = []
+    kinds = tree.kinds
+    stack = [(0, -1)]
+    while stack:
+        node, parent = stack.pop()
+        if node == ENTER:
+            table.enter_scope()
+            continue
+        if node == EXIT:
+            table.exit_scope()
+            continue
+
+        kind = kinds[node]
+        if kind == ID:
+            index = tree.token_index[node]
+            if index < 0:
+                continue
+            token = tree.tokens[index]
+            try:
+                if kinds[parent] in DECLARING:
+                    table.add_variable(token.lexem, kinds[parent] == FUNCTION, token.position)
+                elif table.get_variable_value(token.lexem, token.position) != is_call(tree, node):
+                    adjective = 'not ' if is_call(tree, node) else ''
+                    raise SymbolError(f"'{token.lexem}' is {adjective}a function", token.lexem, token.position)
+            except SymbolError as error:
+                errors.append(error)
+                if diagnostics is not None:
+                    diagnostics.report(SEMANTIC, error.position, error.detail)
+            continue
+
+        children = list(tree.children(node))
+        if kind == BLOCK:
+            table.enter_scope()
+            stack.append((EXIT, node))
+        elif kind == FUNCTION:
+            # The function's name is bound outside its scope, which holds
+            # the parameters and opens right after the name
+            stack.append((EXIT, node))
+            stack.extend((child, node) for child in reversed(children[3:]))
+            stack.append((ENTER, node))
+            children = children[:3]
+        stack.extend((child, node) for child in reversed(children))
+    return errors
@@ -0,0 +1,122 @@
+import queue
+import threading
+
+
+# Tokens a TokenStream can look ahead
+LOOKAHEAD = 8
+
+# Tokens handed from the producer thread at a time, and chunks in flight:
+# the threaded mode holds at most CHUNK_SIZE * (QUEUE_CHUNKS + 2) tokens
+CHUNK_SIZE = 1024
+QUEUE_CHUNKS = 4
+
+
+# ------------------------------------------------------
+# ------------------------------------------------------
+# -------------------- TOKEN STREAM --------------------
+# ------------------------------------------------------
+# ------------------------------------------------------
+class TokenStream:
+    # Tokens pulled from a lexer one at a time, through a ring of size
+    # slots that holds the ones peeked at but not consumed yet; past the
+    # last token, peek gives None. With nothing peeked, a token goes
+    # straight from the lexer to the caller.
+    def __init__(self, tokens, size=LOOKAHEAD):
+        self.source = iter(tokens)
+        self.ring = [None] * size
+        self.head = 0
+        self.count = 0
+
+    def peek(self, k=1):
+        # The k-th token from the current position, 1 being the next one
+        size = len(self.ring)
+        if not 0 < k <= size:
+            raise IndexError(f'Can only peek 1 to {size} tokens ahead')
+        while self.count < k:
+            self.ring[(self.head + self.count) % size] = next(self.source, None)
+            self.count += 1
+        return self.ring[(self.head + k - 1) % size]
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if not self.count:
+            return next(self.source)
+        token = self.ring[self.head]
+        if token is None:
+            raise StopIteration
+        self.ring[self.head] = None
+        self.head = (self.head + 1) % len(self.ring)
+        self.count -= 1
+        return token
+
+
+# ------------------------------------------------------
+# ------------------------------------------------------
+# ------------------ THREADED PRODUCER -----------------
+# ------------------------------------------------------
+# ------------------------------------------------------
+class ThreadedTokens:
+    # Runs the lexer in a thread of its own, which hands its tokens over in
+    # chunks through a bounded queue: scanning goes on while the tokens are
+    # consumed, and stops when the queue is full. An error in the lexer is
+    # raised where the tokens are consumed, in order.
+    def __init__(self, tokens, chunk_size=CHUNK_SIZE, chunks=QUEUE_CHUNKS):
+        self.queue = queue.Queue(chunks)
+        self.chunk_size = chunk_size
+        self.chunk = iter(())
+        self.ended = False
+        self.closed = False
+        self.thread = threading.Thread(target=self.produce, args=(tokens,), daemon=True)
+        self.thread.start()
+
+    def produce(self, tokens):
+        iterator = iter(tokens)
+        chunk = []
+        try:
+            for token in iterator:
+                chunk.append(token)
+                if len(chunk) == self.chunk_size:
+                    self.queue.put(chunk)
+                    if self.closed:
+                        return
+                    chunk = []
+            self.queue.put(chunk)
+            self.queue.put(None)
+        except Exception as error:
+            self.queue.put(chunk)
+            self.queue.put(error)
+        finally:
+            close = getattr(iterator, 'close', None)
+            if close is not None:
+                close()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        for token in self.chunk:
+            return token
+        while True:
+            if self.ended:
+                raise StopIteration
+            chunk = self.queue.get()
+            if chunk is None or isinstance(chunk, Exception):
+                self.ended = True
+                if chunk is None:
+                    raise StopIteration
+                raise chunk
+            if chunk:
+                break
+        self.chunk = iter(chunk)
+        return next(self.chunk)
+
+    def close(self):
+        # Stops the producer, which may be waiting for room in the queue
+        self.closed = True
+        try:
+            while True:
+                self.queue.get_nowait()
+        except queue.Empty:
+            pass
@@ -0,0 +1,91 @@
+import sys
+from os.path import abspath, dirname
+
+sys.path.insert(0, dirname(abspath(__file__)))
+
+import pytest
+
+import parser
+import diagnostics
+import lexer
+
+
+def report(path, fast, tree):
+    # The diagnostics of a file with the Pratt fast path for expressions, or
+    # with the table for all of it (any trace turns the fast path off)
+    errors = diagnostics.Diagnostics()
+    tokens = lexer.tokenize(str(path), 'mapped', diagnostics=errors)
+    parser.Parser(tokens, None if fast else (lambda step: None), tree, errors).parse()
+    return [str(error) for error in errors]
+
+
+# ------------------------------------------------------
+# ------------------------------------------------------
+# ------------------ FAST PATH ERRORS ------------------
+# ------------------------------------------------------
+# ------------------------------------------------------
+ERROR_TOKENS = [
+    'Begin{From x T[',
+    'Begin{Show(a Foo(1));}',
+    'Begin { x = a $[1]; }',
+    'Begin { x = a $ $(1, Foo); }',
+    'Begin { x = a Foo [1] + f $ (2) * -b $; }',
+    'Begin { If a $ Foo $ [b $] { Show(f(Foo $)); } }',
+    'Begin { Int q = -(a + $ b) / f(1, g $ (), h[2] Or !x); }',
+]
+
+
+@pytest.mark.parametrize('source', ERROR_TOKENS)
+@pytest.mark.parametrize('tree', [False, True])
+def test_fast_path_reports_as_table(tmp_path, source, tree):
+    path = tmp_path / 'source.nbl'
+    path.write_text(source)
+    assert report(path, True, tree) == report(path, False, tree)
+
+
+def test_error_token_before_index(tmp_path):
+    path = tmp_path / 'source.nbl'
+    path.write_text('Begin{From x T[')
+    errors = report(path, True, False)
+    assert len(errors) == 2
+    assert errors[1].endswith("found OTHER_EOF 'EOF'")
+
+
+# ------------------------------------------------------
+# ------------------------------------------------------
+# --------------------- RECOVERY -----------------------
+# ------------------------------------------------------
+# ------------------------------------------------------
+@pytest.mark.parametrize('source', [
+    'Begin {\n From 1 T[2] Increase 3 { }\n}',
+    'Begin {\n From 1 T[2] Increase 3 { x = 1; { } }\n y = 2;\n}',
+])
+@pytest.mark.parametrize('fast', [False, True])
+def test_skipped_block_ends_statement(tmp_path, source, fast):
+    path = tmp_path / 'source.nbl'
+    path.write_text(source)
+    errors = report(path, fast, True)
+    assert len(errors) == 2
+    assert errors[0].startswith('Lexical error')
+    assert "found DELI_OBRAC '['" in errors[1]
+
+
+# ------------------------------------------------------
+# ------------------------------------------------------
+# ---------------------- CACHE -------------------------
+# ------------------------------------------------------
+# ------------------------------------------------------
+@pytest.mark.parametrize('source', [
+    'Begin { Int x = 1; If x > 0 { Show("x", f(x)[2]); } }',
+    ERROR_TOKENS[1],
+])
+def test_cached_result_loads_as_parsed(tmp_path, source):
+    path = tmp_path / 'source.nbl'
+    path.write_text(source)
+    errors = diagnostics.Diagnostics()
+    tree = parser.parse_tree(str(path), diagnostics=errors)
+    loaded, items = parser.load_result(parser.dump_result(tree, errors))
+    assert list(loaded.lines()) == list(tree.lines())
+    assert loaded.kinds == tree.kinds and loaded.next_sibling == tree.next_sibling
+    assert list(map(repr, items)) == list(map(repr, errors))
+    assert parser.load_result(parser.dump_result(None, errors))[0] is None
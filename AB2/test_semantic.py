@@ -0,0 +1,31 @@
+import sys
+from os.path import abspath, dirname
+
+sys.path.insert(0, dirname(abspath(__file__)))
+
+import pytest
+
+import main
+
+
+def errors(tmp_path, source):
+    # The diagnostics of --ir --no-cache on source
+    path = tmp_path / 'source.nbl'
+    path.write_text(source)
+    return [str(error) for error in main.parse_file(str(path), 'mapped', quiet=True, lower=True)]
+
+
+@pytest.mark.parametrize('source, message', [
+    ('Begin { Function Int f() { Return 1; } Int x = f; }', "'f' is a function"),
+    ('Begin { Function Int f() { Return 1; } f = 2; }', "'f' is a function"),
+    ('Begin { Function Int f() { Return 1; } Get(f); }', "'f' is a function"),
+    ('Begin { Array Int a[2]; Show("a", a(1)); }', "'a' is not a function"),
+    ('Begin { Int x = 1; x(2); }', "'x' is not a function"),
+])
+def test_misused_name_is_reported(tmp_path, source, message):
+    reported = errors(tmp_path, source)
+    assert len(reported) == 1 and reported[0].endswith(message)
+
+
+def test_parameter_shadows_function(tmp_path):
+    assert errors(tmp_path, 'Begin { Function Int f(Int f) { Return f; } Show("a", f(1)); }') == []
@@ -0,0 +1,50 @@
+import sys
+from os.path import abspath, dirname
+
+sys.path.insert(0, dirname(abspath(__file__)))
+
+import pytest
+
+import stream
+
+
+def test_peek_does_not_consume():
+    tokens = stream.TokenStream(range(5), size=3)
+    assert tokens.peek() == 0
+    assert tokens.peek(3) == 2
+    assert tokens.peek(2) == 1
+    assert next(tokens) == 0
+    assert tokens.peek(3) == 3
+    assert list(tokens) == [1, 2, 3, 4]
+
+
+def test_peek_is_bounded_by_the_ring():
+    tokens = stream.TokenStream(range(10), size=3)
+    with pytest.raises(IndexError):
+        tokens.peek(4)
+    with pytest.raises(IndexError):
+        tokens.peek(0)
+
+
+def test_peek_past_the_end_gives_none():
+    tokens = stream.TokenStream('ab', size=4)
+    assert tokens.peek(4) is None
+    assert list(tokens) == ['a', 'b']
+    assert tokens.peek() is None
+
+
+def test_only_peeked_tokens_are_pulled():
+    pulled = []
+
+    def source():
+        for token in range(100):
+            pulled.append(token)
+            yield token
+
+    tokens = stream.TokenStream(source(), size=2)
+    tokens.peek(2)
+    assert pulled == [0, 1]
+    next(tokens)
+    next(tokens)
+    next(tokens)
+    assert pulled == [0, 1, 2]
@@ -0,0 +1,236 @@
+import io
+import os
+import time
+import traceback
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import Pipe, Process
+from multiprocessing.connection import wait
+from glob import glob, has_magic
+from os.path import isdir, isfile, join, splitext
+
+import lexer
+import output
+
+
+# ------------------------------------------------------
+# ------------------------------------------------------
+# ----------------------- PATHS ------------------------
+# ------------------------------------------------------
+# ------------------------------------------------------
+def expand_paths(arguments):
+    # Files named by the command line arguments, in a deterministic order:
+    # arguments as given, directories and globs sorted. Returns the files
+    # and the arguments that were rejected, with the reason.
+    paths = []
+    rejected = []
+    for argument in arguments:
+        if isdir(argument):
+            matches = glob(join(argument, '**', '*.nbl'), recursive=True)
+        elif has_magic(argument):
+            matches = [path for path in glob(argument, recursive=True) if splitext(path)[1] == '.nbl']
+        elif not isfile(argument):
+            rejected.append((argument, 'Invalid file path.'))
+            continue
+        elif splitext(argument)[1] != '.nbl':
+            rejected.append((argument, 'Invalid file extension.'))
+            continue
+        else:
+            matches = [argument]
+
+        if not matches:
+            rejected.append((argument, 'No .nbl files found.'))
+        paths.extend(sorted(path for path in matches if isfile(path)))
+
+    return list(dict.fromkeys(paths)), rejected
+
+
+# ------------------------------------------------------
+# ------------------------------------------------------
+# ----------------------- BATCH ------------------------
+# ------------------------------------------------------
+# ------------------------------------------------------
+def lex_file(path, engine, fmt, store=None):
+    # Runs in a worker: the formatted tokens of one file, or the error.
+    # With a cache store, a file lexed before is not scanned again.
+    try:
+        key = store.tokens_key(path, fmt, engine) if store is not None else None
+        data = store.get(key) if key is not None else None
+        if data is not None:
+            return path, data, None
+
+        buffer = io.BytesIO()
+        writer = output.TokenWriter(buffer, fmt, header=False)
+        writer.write_file(path, engine, store=store)
+        writer.flush()
+    except Exception as e:
+        return path, None, f'{type(e).__name__}: {e}'
+
+    if key is not None:
+        store.put(key, buffer.getvalue())
+    return path, buffer.getvalue(), None
+
+
+def lex_files(paths, engine='mapped', fmt='table', jobs=None, timeout=None, store=None):
+    # (path, data, error) for every path, in the order of paths. Files are
+    # lexed in a process pool; a file that fails is reported as an error
+    # and the batch goes on. With a timeout, see lex_files_timed.
+    if timeout is not None:
+        yield from lex_files_timed(paths, engine, fmt, jobs, timeout, store)
+        return
+    if jobs == 1:
+        for path in paths:
+            yield lex_file(path, engine, fmt, store)
+        return
+
+    executor = ProcessPoolExecutor(max_workers=jobs)
+    try:
+        futures = [executor.submit(lex_file, path, engine, fmt, store) for path in paths]
+        for path, future in zip(paths, futures):
+            try:
+                yield future.result()
+            except BrokenProcessPool as e:
+                yield path, None, f'Worker failed: {e}'
+            except Exception as e:
+                traceback.print_exc()
+                yield path, None, f'{type(e).__name__}: {e}'
+    finally:
+        # Only reached early if the caller stops reading, which should not
+        # wait for the files still queued
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def send_file(connection, path, engine, fmt, store):
+    # Runs in a process of its own, see lex_files_timed
+    connection.send(lex_file(path, engine, fmt, store))
+    connection.close()
+
+
+def lex_files_timed(paths, engine, fmt, jobs, timeout, store):
+    # As lex_files, with every file lexed in a process of its own, at most
+    # jobs at a time, and killed once it has run for timeout seconds. The
+    # deadline counts from the start of that process, so a file waiting
+    # for a free slot is not charged for the ones ahead of it.
+    jobs = jobs or os.cpu_count() or 1
+    queued = deque(enumerate(paths))
+    running = {}
+    results = {}
+    next_index = 0
+    try:
+        while queued or running:
+            while queued and len(running) < jobs:
+                index, path = queued.popleft()
+                receiver, sender = Pipe(duplex=False)
+                process = Process(target=send_file, args=(sender, path, engine, fmt, store), daemon=True)
+                process.start()
+                sender.close()
+                running[receiver] = (index, path, process, time.monotonic() + timeout)
+
+            next_deadline = min(deadline for _, _, _, deadline in running.values())
+            for receiver in wait(list(running), max(next_deadline - time.monotonic(), 0)):
+                index, path, process, _ = running.pop(receiver)
+                try:
+                    results[index] = receiver.recv()
+                except EOFError:
+                    process.join()
+                    results[index] = (path, None, f'Worker failed: exit code {process.exitcode}')
+                receiver.close()
+                process.join()
+
+            now = time.monotonic()
+            for receiver, (index, path, process, deadline) in list(running.items()):
+                if deadline <= now:
+                    del running[receiver]
+                    stop(process, receiver)
+                    results[index] = (path, None, f'Timed out after {timeout}s')
+
+            while next_index in results:
+                yield results.pop(next_index)
+                next_index += 1
+    finally:
+        for receiver, (_, _, process, _) in running.items():
+            stop(process, receiver)
+
+
+def stop(process, receiver):
+    process.kill()
+    process.join()
+    receiver.close()
+
+
+# ------------------------------------------------------
+# ------------------------------------------------------
+# ----------------------- SHARDS -----------------------
+# ------------------------------------------------------
+# ------------------------------------------------------
+# Shards smaller than this cost more to ship to a worker than to lex
+MIN_SHARD_SIZE = 1 << 16
+
+
+def split_lines(source, shards):
+    # Offsets cutting source into at most `shards` pieces, each starting at
+    # the beginning of a line (text, or bytes for the bytes engine)
+    newline = b'\n' if isinstance(source, bytes) else '\n'
+    bounds = [0]
+    size = max(len(source) // shards, MIN_SHARD_SIZE)
+    while len(bounds) < shards:
+        cut = source.find(newline, bounds[-1] + size) + 1
+        if cut == 0 or cut >= len(source):
+            break
+        bounds.append(cut)
+    bounds.append(len(source))
+    return bounds
+
+
+def lex_shard(source, row, fmt, last, engine='mapped', store=None):
+    # Runs in a worker: the formatted tokens of the lines in source, lexed
+    # as if the lexer had reached them with row `row`. clean tells whether
+    # the last line left the automaton in its initial state, which is what
+    # makes the next shard independent of this one.
+    buffer = io.BytesIO()
+    writer = output.TokenWriter(buffer, fmt, header=False)
+    shard_lexer = lexer.Lexer(None, engine, writer.trace(), source, store=store)
+    shard_lexer.row = row
+    try:
+        writer.write_lexer(shard_lexer, eof=last)
+        writer.flush()
+    except Exception:
+        return None, False
+    return buffer.getvalue(), shard_lexer.state == 1
+
+
+def lex_sharded(path, fmt='table', shards=None, jobs=None, engine='mapped', store=None):
+    # The formatted tokens of one file, lexed in line-aligned shards on a
+    # process pool by one of the engines that lex from memory
+    # (lexer.MAPPED_ENGINES). Tokens never continue past a line unless a
+    # string is left open; if a shard ends like that, or fails, the file is
+    # lexed sequentially instead, so the result is always the sequential one.
+    if engine not in lexer.MAPPED_ENGINES:
+        raise ValueError(f'Shards need a mapped engine, not {engine}')
+    source = lexer.Lexer(path, engine, store=store).source
+    bounds = split_lines(source, shards or 1)
+
+    if len(bounds) > 2:
+        newline = b'\n' if engine == 'bytes' else '\n'
+        rows = [1]
+        for start, end in zip(bounds, bounds[1:-1]):
+            rows.append(rows[-1] + source.count(newline, start, end))
+
+        last = len(bounds) - 2
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = [
+                executor.submit(lex_shard, source[start:end], row, fmt, index == last, engine, store)
+                for index, (start, end, row) in enumerate(zip(bounds, bounds[1:], rows))
+            ]
+            results = [future.result() for future in futures]
+
+        if all(clean or index == last for index, (_, clean) in enumerate(results)) \
+                and all(data is not None for data, _ in results):
+            return b''.join(data for data, _ in results)
+
+    buffer = io.BytesIO()
+    writer = output.TokenWriter(buffer, fmt, header=False)
+    writer.write_lexer(lexer.Lexer(None, engine, writer.trace(), source, store=store))
+    writer.flush()
+    return buffer.getvalue()
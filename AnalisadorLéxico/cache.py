@@ -0,0 +1,120 @@
+import hashlib
+import os
+import tempfile
+from os.path import expanduser, join
+
+import lexer
+import output
+import token_kinds
+
+
+CACHE_DIR = os.environ.get('NEON_CACHE_DIR') or join(
+    os.environ.get('XDG_CACHE_HOME') or expanduser(join('~', '.cache')), 'neon')
+
+# Least recently used entries are evicted past this many bytes
+MAX_SIZE = 256 << 20
+
+
+# ------------------------------------------------------
+# ------------------------------------------------------
+# ---------------------- VERSION -----------------------
+# ------------------------------------------------------
+# ------------------------------------------------------
+def source_version(*modules):
+    # Hash of the code that produces a cached result; editing any of the
+    # modules makes every entry made with the old code unreachable
+    digest = hashlib.sha256()
+    for module in modules:
+        with open(module.__file__, 'rb') as file_reader:
+            digest.update(file_reader.read())
+    return digest.hexdigest()
+
+
+LEXER_VERSION = source_version(lexer, output, token_kinds)
+
+
+# ------------------------------------------------------
+# ------------------------------------------------------
+# ----------------------- CACHE ------------------------
+# ------------------------------------------------------
+# ------------------------------------------------------
+class Cache:
+    # Content-addressed store: an entry is a file named after the hash of
+    # the source it was made from, the version of the code that made it
+    # and whatever else it depends on. Entries are never updated, only
+    # written whole and evicted; a hit refreshes the entry's mtime, which
+    # is the recency evict() goes by.
+    def __init__(self, directory=CACHE_DIR, max_size=MAX_SIZE):
+        self.directory = directory
+        self.max_size = max_size
+
+    def key(self, namespace, content, version=LEXER_VERSION, *parts):
+        digest = hashlib.sha256()
+        for part in (namespace, version) + parts:
+            digest.update(str(part).encode('utf-8') + b'\0')
+        digest.update(content)
+        return digest.hexdigest()
+
+    def path(self, key):
+        return join(self.directory, key[:2], key[2:])
+
+    def get(self, key):
+        path = self.path(key)
+        try:
+            with open(path, 'rb') as file_reader:
+                data = file_reader.read()
+            os.utime(path)
+        except OSError:
+            return None
+        return data
+
+    def put(self, key, data):
+        # Written aside and renamed into place, so that concurrent readers
+        # and writers only ever see whole entries
+        path = self.path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            descriptor, temp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(descriptor, 'wb') as file_writer:
+                file_writer.write(data)
+            os.replace(temp_path, path)
+        except OSError:
+            # A cache that cannot be written only costs a rescan
+            pass
+
+    def entries(self):
+        # (mtime, size, path) of every entry
+        try:
+            folders = os.scandir(self.directory)
+        except OSError:
+            return []
+        entries = []
+        with folders:
+            for folder in folders:
+                if not folder.is_dir():
+                    continue
+                for entry in os.scandir(folder.path):
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def evict(self):
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+    def tokens_key(self, path, fmt, engine='mapped'):
+        # Every engine has entries of its own: what one of them made is
+        # never served for another
+        with open(path, 'rb') as file_reader:
+            return self.key('tokens', file_reader.read(), LEXER_VERSION, fmt, engine)
@@ -0,0 +1,449 @@
+import argparse
+import hashlib
+import marshal
+import sys
+import types
+
+import cache
+import lexer
+from lexer import (
+    ADD, SKIP, EMIT, EMIT_BACK, SHIFT, DROP, ADD_COL, COMMENT, REPORT,
+    CHAR_CLASSES, PAD_CLASS, RUN_PATTERNS, TRANSITIONS, S8_LT, S8_GT, S8_NEG, S9_PEEK
+)
+
+
+# States in the order the generated code tests them: the most frequent first
+STATE_ORDER = (1, 2, 12, 4, 5, 11, 14, 9, S9_PEEK, 10, S8_LT, S8_GT, S8_NEG)
+
+HEADER = '''\
+# Generated by codegen.py from the transition table of lexer.py, spec
+# {spec}. Do not edit; it is rebuilt whenever the table changes.
+import re
+
+from lexer import CATEGORIES, CHAR_CLASSES, FIXED_LEXEMS, STATES, Token, char_class, keyword
+
+'''
+
+# What the generated functions keep in locals: Lexer attributes, loaded
+# from and stored back to the lexer around anything that may use them
+SYNCED = ('pos', 'line_end', 'padded', 'row', 'col')
+
+
+# ------------------------------------------------------
+# ------------------------------------------------------
+# ----------------------- SPEC -------------------------
+# ------------------------------------------------------
+# ------------------------------------------------------
+def spec():
+    # Everything the generated code is compiled from
+    return repr((TRANSITIONS, RUN_PATTERNS, PAD_CLASS)).encode('utf-8')
+
+
+GENERATOR_VERSION = cache.source_version(sys.modules[__name__])
+
+
+def spec_hash():
+    digest = hashlib.sha256(spec())
+    digest.update(GENERATOR_VERSION.encode('ascii'))
+    return digest.hexdigest()
+
+
+# ------------------------------------------------------
+# ------------------------------------------------------
+# ----------------------- CELLS ------------------------
+# ------------------------------------------------------
+# ------------------------------------------------------
+def category(tkn_cat):
+    return 'None' if tkn_cat is None else f'CAT_{tkn_cat[1]}'
+
+
+def store_lines():
+    return [f'self.{name} = {name}' for name in SYNCED]
+
+
+def load_lines(names=SYNCED):
+    return [f'{name} = self.{name}' for name in names]
+
+
+def indented(lines, indent):
+    return [indent + line for line in lines]
+
+
+def run(state):
+    if RUN_PATTERNS[state] is None:
+        return []
+    return [f'pos = RUN_{state}(source, pos, line_end).end()']
+
+
+def char_code(state, cell, delegated):
+    # The code of one cell of Lexer.scan_mapped, with its action and next
+    # state fixed; the category is either fixed too or, for cells that
+    # only differ by it, looked up by class in CATS_<state>
+    action, next_state, tkn_cat = cell
+    moved = [] if next_state == state else [f'state = {next_state}']
+    if action == ADD:
+        return ['pos += 1'] + moved + run(next_state)
+    elif action == SKIP:
+        return ['pos += 1'] + moved + run(next_state) + ['start = pos']
+    elif action == COMMENT:
+        return ['pos = start = line_end', f'state = {next_state}', 'pieces = None']
+    elif action == EMIT_BACK:
+        return [f'tkn_cat = {tkn_cat}', 'break']
+    elif action == EMIT:
+        return ['pos += 1', f'tkn_cat = {tkn_cat}', 'break']
+    elif action == SHIFT:
+        return [f'state = {next_state}']
+    elif action == DROP:
+        return [
+            'if pieces is None:',
+            '    pieces = [start]',
+            'pieces.append(source[start:pos])',
+            'pos += 1',
+            'start = pos',
+            'col += 1',
+            'if self.diagnostics is not None:',
+            f'    self.report(Token({tkn_cat}, self.join_pieces(pieces, pos, pos), (row, col)))',
+        ]
+    elif action == REPORT:
+        return [
+            'if self.diagnostics is not None:',
+            f'    self.report(Token({tkn_cat}, current_char, (row, col)))',
+            'pos += 1',
+            'start = pos',
+        ]
+    elif action == ADD_COL:
+        return ['pos += 1', 'col += 1'] + moved
+    return ['origin = start if pieces is None else pieces[0]'] + store_lines() + [
+        'self.pos = pos + 1',
+        f'self.state = {state}',
+        'self.lexem = self.join_pieces(pieces, start, pos + 1)',
+        f'token = STATES[{state}](self).process_state(current_char)',
+    ] + load_lines() + ['if token:'] + indented(delegated, '    ') + [
+        'start = pos',
+        'pieces = [origin, self.lexem]',
+        'state = self.state',
+    ]
+
+
+def pad_code(state, cell):
+    # The ' ' that ends every line, as Lexer.scan_mapped takes it
+    action, next_state, tkn_cat = cell
+    if action == EMIT_BACK:
+        return ['padded = False', f'tkn_cat = {category(tkn_cat)}', 'break']
+    elif action == SHIFT:
+        return ['padded = False', f'state = {next_state}', 'continue']
+    elif action == ADD:
+        return [
+            'if pieces is None:',
+            '    pieces = [start]',
+            'pieces.append(source[start:pos])',
+            "pieces.append(' ')",
+            'start = pos',
+            f'state = {next_state}',
+            'continue',
+        ]
+    elif action == COMMENT:
+        return ['start = pos', f'state = {next_state}', 'continue']
+    # The State class only gets to raise here: the scan goes on from the
+    # same offset and state
+    return ['padded = False'] + store_lines() + [
+        f'self.state = {state}',
+        'self.lexem = self.join_pieces(pieces, start, pos)',
+        f"STATES[{state}](self).process_state(' ')",
+    ] + load_lines(SYNCED[1:]) + ['continue']
+
+
+def branches(cases, subject, indent):
+    # An if/elif chain over (values, lines) cases, the last one as else
+    if len(cases) == 1:
+        return indented(cases[0][1], indent)
+    lines = []
+    for index, (values, body) in enumerate(cases):
+        if index == len(cases) - 1:
+            lines.append(indent + 'else:')
+        else:
+            statement = 'if' if index == 0 else 'elif'
+            test = f'== {values[0]}' if len(values) == 1 else f'in {{{", ".join(map(str, values))}}}'
+            lines.append(f'{indent}{statement} {subject} {test}:')
+        lines.extend(indented(body, indent + '    '))
+    return lines
+
+
+def states():
+    present = [state for state, row in enumerate(TRANSITIONS) if row is not None]
+    return [state for state in STATE_ORDER if state in present] + \
+        [state for state in present if state not in STATE_ORDER]
+
+
+def char_groups(state):
+    # Classes grouped by action and next state; the groups covering more
+    # ASCII characters, which are likelier, come first
+    groups = {}
+    for cls, cell in enumerate(TRANSITIONS[state]):
+        groups.setdefault(cell[:2], []).append(cls)
+    weights = {}
+    for char, cls in CHAR_CLASSES.items():
+        if len(char) == 1 and char < '\x80':
+            group = TRANSITIONS[state][cls][:2]
+            weights[group] = weights.get(group, 0) + 1
+    order = sorted(groups, key=lambda group: -weights.get(group, 0))
+    return [(group, groups[group]) for group in order]
+
+
+def shared_category(state, classes):
+    # Whether all the classes of a group emit the same category
+    return len({TRANSITIONS[state][cls][2] for cls in classes}) == 1
+
+
+def char_cases(state, delegated):
+    cases = []
+    for (action, next_state), classes in char_groups(state):
+        if shared_category(state, classes):
+            tkn_cat = category(TRANSITIONS[state][classes[0]][2])
+        else:
+            tkn_cat = f'CATS_{state}[char_cls]'
+        cases.append((classes, char_code(state, (action, next_state, tkn_cat), delegated)))
+    return cases
+
+
+def category_table(state):
+    # CATS_<state>: the category of every class, for the groups that need it
+    if all(shared_category(state, classes) for _, classes in char_groups(state)):
+        return []
+    names = ', '.join(category(cell[2]) for cell in TRANSITIONS[state])
+    return [f'CATS_{state} = ({names})']
+
+
+# ------------------------------------------------------
+# ------------------------------------------------------
+# --------------------- FUNCTIONS ----------------------
+# ------------------------------------------------------
+# ------------------------------------------------------
+def token_loop(eof, delegated):
+    # The loop that scans one token from pos, state, start and pieces, as
+    # Lexer.scan_mapped does. It breaks out with tkn_cat when a token ends;
+    # eof and delegated are the code for the end of the file and for a
+    # token a State class returned.
+    pad_cases = [([1], ['continue'])]
+    pad_cases += [([state], pad_code(state, TRANSITIONS[state][PAD_CLASS])) for state in states()[1:]]
+    char_state_cases = [([state], branches(char_cases(state, delegated), 'char_cls', '')) for state in states()]
+
+    lines = [
+        'while True:',
+        '    if pos == line_end:',
+        '        if not padded:',
+        '            padded = True',
+    ]
+    lines += branches(pad_cases, 'state', ' ' * 12)
+    lines += [
+        '',
+        f'        if state == {S9_PEEK}:',
+        '            # State_Nine reads past the end of the line here',
+        "            raise IndexError('list index out of range')",
+        '',
+        '        # Lexer.next_line_mapped',
+        '        if pos == size:',
+    ]
+    lines += indented(eof, ' ' * 12)
+    lines += [
+        "        line_end = source.find('\\n', pos) + 1 or size",
+        '        padded = False',
+        '        if trace is not None:',
+        '            self.row = row',
+        '            self.current_line = source[pos:line_end]',
+        '            self.print_info()',
+        "            self.current_line += ' '",
+        '        row += 1',
+        '        col = 0',
+        '        if state == 1:',
+        '            start = pos',
+        '        continue',
+        '',
+        '    current_char = source[pos]',
+        '    char_cls = classes.get(current_char)',
+        '    if char_cls is None:',
+        '        char_cls = char_class(current_char)',
+        '',
+    ]
+    lines += branches(char_state_cases, 'state', ' ' * 4)
+    return lines
+
+
+def prologue():
+    return [
+        'source = self.source',
+        'size = len(source)',
+        'trace = self.trace',
+        'classes = CHAR_CLASSES',
+    ] + load_lines()
+
+
+def scan_function():
+    # Lexer.scan_mapped: the next token
+    eof = store_lines() + [
+        'self.state = state',
+        'self.start = pos',
+        "self.lexem = 'EOF'",
+        f"return {category(lexer.LEX_DICT.OTHER['EOF'])}",
+    ]
+    delegated = store_lines() + [
+        'self.start = origin',
+        'self.lexem = token.lexem',
+        'return token.tkn_cat',
+    ]
+    body = prologue() + [
+        'state = 1',
+        'start = pos',
+        'pieces = None',
+        '',
+    ] + token_loop(eof, delegated) + [
+        '',
+        'col += 1',
+    ] + store_lines() + [
+        'if pieces is None:',
+        '    self.start = start',
+        '    self.lexem = None',
+        'else:',
+        '    self.start = pieces[0]',
+        '    self.lexem = self.join_pieces(pieces, start, pos)',
+        'if tkn_cat is None:',
+        '    tkn_cat = keyword(self.lexem or source[start:pos])',
+        'return tkn_cat',
+    ]
+    return ['def scan(self):'] + indented(body, '    ')
+
+
+def append_lines(kind, start, lexem=None):
+    # TokenBuffer.append, into the arrays bound by read
+    lines = []
+    if lexem is not None:
+        lines += [f'if {kind} not in fixed:', f'    irregular[count] = {lexem}']
+    return lines + [
+        f'kinds({kind})',
+        f'starts({start})',
+        'ends(pos)',
+        'rows(row)',
+        'cols(col)',
+        'count += 1',
+    ]
+
+
+def read_function():
+    # Lexer.read_buffer: every token left, into buffer, with the scanning
+    # state kept in locals from one token to the next
+    eof = store_lines() + [
+        'self.state = state',
+        'self.start = pos',
+        "self.lexem = 'EOF'",
+    ] + append_lines(lexer.LEX_DICT.OTHER['EOF'][1], 'pos') + [
+        'buffer.end_state = state',
+        'return buffer',
+    ]
+    delegated = ['tkn_cat = token.tkn_cat'] + append_lines('tkn_cat[1]', 'origin', 'token.lexem') + [
+        'state = 1',
+        'start = pos',
+        'pieces = None',
+        'continue',
+    ]
+    token = [
+        'state = 1',
+        'start = pos',
+        'pieces = None',
+        '',
+    ] + token_loop(eof, delegated) + [
+        '',
+        'col += 1',
+        'if pieces is None:',
+        '    if tkn_cat is None:',
+        '        tkn_cat = keyword(source[start:pos])',
+    ] + indented(append_lines('tkn_cat[1]', 'start'), '    ') + [
+        'else:',
+        "    lexem = ''.join(pieces[1:]) + source[start:pos]",
+        '    if tkn_cat is None:',
+        '        tkn_cat = keyword(lexem or source[start:pos])',
+    ] + indented(append_lines('tkn_cat[1]', 'pieces[0]', 'lexem'), '    ')
+    body = prologue() + [
+        'kinds = buffer.kinds.append',
+        'starts = buffer.starts.append',
+        'ends = buffer.ends.append',
+        'rows = buffer.rows.append',
+        'cols = buffer.cols.append',
+        'irregular = buffer.irregular',
+        'count = len(buffer)',
+        'fixed = FIXED_LEXEMS',
+        '',
+        'while True:',
+    ] + indented(token, '    ')
+    return ['def read(self, buffer):'] + indented(body, '    ')
+
+
+def generate():
+    # Source of a module with Lexer.scan_mapped and Lexer.read_buffer
+    # compiled against the table: no table lookups or action dispatch per
+    # character, and in read no attribute traffic per token
+    lines = [HEADER.format(spec=spec_hash()[:16])]
+
+    used = {cell[2] for row in TRANSITIONS if row is not None for cell in row if cell[2] is not None}
+    used.add(lexer.LEX_DICT.OTHER['EOF'])
+    for tkn_cat in sorted(used, key=lambda tkn_cat: tkn_cat[1]):
+        lines.append(f'{category(tkn_cat)} = CATEGORIES[{tkn_cat[1]}]')
+    lines.append('')
+    for state, pattern in enumerate(RUN_PATTERNS):
+        if pattern is not None:
+            lines.append(f'RUN_{state} = re.compile({pattern!r}).match')
+    lines.append('')
+    for state in states():
+        lines.extend(category_table(state))
+
+    lines += ['', ''] + scan_function() + ['', ''] + read_function() + ['']
+    # Blank lines inside the functions carry no indentation
+    return '\n'.join(line.rstrip() for line in lines)
+
+
+# ------------------------------------------------------
+# ------------------------------------------------------
+# ----------------------- LOADING ----------------------
+# ------------------------------------------------------
+# ------------------------------------------------------
+compiled = None
+
+
+def load(store=None):
+    # The generated module, compiled once per spec: with a cache store its
+    # code object is kept there under the spec, the generator and the
+    # Python version, so that any change to the table rebuilds it; without
+    # one it is only compiled in memory
+    global compiled
+    if compiled is not None:
+        return compiled
+
+    code = None
+    if store is not None:
+        key = store.key('codegen', spec(), GENERATOR_VERSION, sys.implementation.cache_tag)
+        data = store.get(key)
+        if data is not None:
+            try:
+                code = marshal.loads(data)
+            except (EOFError, ValueError, TypeError):
+                code = None
+    if code is None:
+        code = compile(generate(), f'<neon lexer {spec_hash()[:16]}>', 'exec')
+        if store is not None:
+            store.put(key, marshal.dumps(code))
+
+    module = types.ModuleType('neon_lexer')
+    exec(code, module.__dict__)
+    compiled = module
+    return module
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description='Generate the compiled Neon lexer')
+    arg_parser.add_argument('--output', metavar='FILE', type=str, help='Write the module to FILE instead of stdout')
+
+    args = arg_parser.parse_args()
+    if args.output:
+        with open(args.output, 'w') as file_writer:
+            file_writer.write(generate())
+    else:
+        sys.stdout.write(generate())
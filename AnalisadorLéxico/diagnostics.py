@@ -0,0 +1,42 @@
+LEXICAL = 'Lexical'
+SYNTAX = 'Syntax'
+SEMANTIC = 'Semantic'
+
+
+# ------------------------------------------------------
+# ------------------------------------------------------
+# -------------------- DIAGNOSTICS ---------------------
+# ------------------------------------------------------
+# ------------------------------------------------------
+class Diagnostic:
+    def __init__(self, kind, position, message):
+        self.kind = kind
+        self.position = position
+        self.message = message
+
+    def __repr__(self):
+        return f'{self.kind} error at [{self.position[0]}, {self.position[1]}]: {self.message}'
+
+
+class Diagnostics:
+    # Errors of one run, collected from the lexer, the parser and the
+    # semantic checks in the order they are found, so that a single pass
+    # over a file reports all of them
+    def __init__(self):
+        self.items = []
+
+    def report(self, kind, position, message):
+        self.items.append(Diagnostic(kind, position, message))
+
+    def lexical(self, token):
+        # An error token of the lexer, which it does not pass on
+        self.report(LEXICAL, token.position, f"{token.tkn_cat[0]} '{token.lexem}'")
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def sorted(self):
+        return sorted(self.items, key=lambda diagnostic: tuple(diagnostic.position))
@@ -0,0 +1,110 @@
+from array import array
+from bisect import bisect_left, bisect_right
+
+import lexer
+
+
+# ------------------------------------------------------
+# ------------------------------------------------------
+# --------------------- RE-LEXING ----------------------
+# ------------------------------------------------------
+# ------------------------------------------------------
+def clean_line_start(buffer, offset):
+    # Start of the line containing offset, moved back until no token spans
+    # it: the automaton is in state 1 there, so lexing can restart from it
+    source = buffer.source
+    restart = source.rfind('\n', 0, offset) + 1
+
+    if buffer.end_state != 1:
+        # The string left open at EOF starts after the last token
+        last_end = buffer.ends[-2] if len(buffer) > 1 else 0
+        if restart > last_end:
+            restart = source.rfind('\n', 0, last_end) + 1
+
+    while True:
+        index = bisect_right(buffer.starts, restart) - 1
+        if index < 0 or not buffer.starts[index] < restart < buffer.ends[index]:
+            return restart
+        restart = source.rfind('\n', 0, buffer.starts[index]) + 1
+
+
+def row_before(buffer, first, restart):
+    # Row the lexer has just before reading the line at restart
+    if first == 0:
+        return buffer.source.count('\n', 0, restart) + 1
+    previous = first - 1
+    return buffer.rows[previous] + buffer.source.count('\n', buffer.ends[previous], restart) - 1
+
+
+def relex(buffer, start, end, text):
+    # TokenBuffer for buffer.source with source[start:end] replaced by text.
+    # Tokens before the edited lines are kept, lexing restarts at the first
+    # of them, and as soon as a token past the edit is the same as an old
+    # one moved by the edit, the remaining old tokens are reused with their
+    # offsets and rows shifted instead of being scanned again.
+    if buffer.end_state is None:
+        raise ValueError('relex needs the TokenBuffer of a whole file')
+
+    source = buffer.source
+    new_source = source[:start] + text + source[end:]
+    delta = len(text) - (end - start)
+    row_delta = text.count('\n') - source.count('\n', start, end)
+    edit_end = start + len(text)
+
+    restart = clean_line_start(buffer, start)
+    while 0 < restart >= len(new_source):
+        # EOF takes its column from the last line, which must be lexed again
+        restart = clean_line_start(buffer, restart - 1)
+    first = bisect_left(buffer.starts, restart)
+
+    result = lexer.TokenBuffer(new_source)
+    result.kinds = buffer.kinds[:first]
+    result.starts = buffer.starts[:first]
+    result.ends = buffer.ends[:first]
+    result.rows = buffer.rows[:first]
+    result.cols = buffer.cols[:first]
+    result.irregular = {index: lexem for index, lexem in buffer.irregular.items() if index < first}
+
+    scanner = lexer.Lexer(None, 'mapped', None, new_source)
+    scanner.seek_line(restart, row_before(buffer, first, restart))
+    eof = lexer.LEX_DICT.OTHER['EOF']
+    old_starts = buffer.starts
+
+    while True:
+        tkn_cat = scanner.scan_mapped()
+        token_start = scanner.start
+
+        if token_start >= edit_end and tkn_cat is not eof:
+            old = bisect_left(old_starts, token_start - delta)
+            if old < len(old_starts) and old_starts[old] == token_start - delta \
+                    and buffer.ends[old] == scanner.pos - delta \
+                    and buffer.kinds[old] == tkn_cat[1] \
+                    and buffer.cols[old] == scanner.col \
+                    and buffer.rows[old] + row_delta == scanner.row:
+                reuse_tail(result, buffer, old, delta, row_delta)
+                return result
+
+        result.append(tkn_cat[1], token_start, scanner.pos, scanner.row, scanner.col, scanner.lexem)
+        if tkn_cat is eof:
+            result.end_state = scanner.state
+            return result
+
+
+def reuse_tail(result, buffer, old, delta, row_delta):
+    shift = len(result) - old
+    for index, lexem in buffer.irregular.items():
+        if index >= old:
+            result.irregular[index + shift] = lexem
+
+    result.kinds += buffer.kinds[old:]
+    result.cols += buffer.cols[old:]
+    result.starts += shifted(buffer.starts[old:], delta)
+    result.ends += shifted(buffer.ends[old:], delta)
+    result.rows += shifted(buffer.rows[old:], row_delta)
+    result.end_state = buffer.end_state
+
+
+def shifted(values, delta):
+    if delta == 0:
+        return values
+    return array('I', map(delta.__add__, values))
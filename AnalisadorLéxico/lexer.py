@@ -1,5 +1,14 @@
+import mmap
+import os
+import re
+import time
 import traceback
+import types
+from collections import Counter
 from abc import ABC, abstractmethod
+from array import array
+
+import token_kinds
 
 
 # -----------------------------------------------------
@@ -8,6 +17,8 @@ from abc import ABC, abstractmethod
 # -----------------------------------------------------
 # -----------------------------------------------------
 class Token:
+    __slots__ = ('tkn_cat', 'lexem', 'position')
+
     def __init__(self, tkn_cat, lexem, position):
         self.tkn_cat = tkn_cat
         self.lexem = lexem
@@ -20,24 +31,136 @@ class Token:
         return f'              {position} {value_category:<25} {lexem}'
 
 
+class TokenBuffer:
+    # Whole token stream as parallel arrays: category ids, start/end offsets
+    # into source, row and column. Lexems are sliced from source on demand;
+    # categories with a single spelling share one string (FIXED_LEXEMS) and
+    # lexems that are not a plain slice are kept in irregular.
+    def __init__(self, source):
+        self.source = source
+        self.kinds = array('H')
+        self.starts = array('I')
+        self.ends = array('I')
+        self.rows = array('I')
+        self.cols = array('I')
+        self.irregular = {}
+        # State the automaton ended in: not 1 if a string was left open
+        self.end_state = 1
+
+    def append(self, kind, start, end, row, col, lexem=None):
+        if lexem is not None and kind not in FIXED_LEXEMS:
+            self.irregular[len(self.kinds)] = lexem
+        self.kinds.append(kind)
+        self.starts.append(start)
+        self.ends.append(end)
+        self.rows.append(row)
+        self.cols.append(col)
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def tkn_cat(self, index):
+        return CATEGORIES[self.kinds[index]]
+
+    def lexem(self, index):
+        kind = self.kinds[index]
+        if kind in FIXED_LEXEMS:
+            return FIXED_LEXEMS[kind]
+        if index in self.irregular:
+            return self.irregular[index]
+        lexem = self.source[self.starts[index]:self.ends[index]]
+        if type(lexem) is bytes:
+            return str(lexem, 'ascii')
+        return lexem
+
+    def position(self, index):
+        return (self.rows[index], self.cols[index])
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self.kinds)
+        return Token(self.tkn_cat(index), self.lexem(index), self.position(index))
+
+    def __iter__(self):
+        for index in range(len(self.kinds)):
+            yield self[index]
+
+
 # -----------------------------------------------------
 # -----------------------------------------------------
 # ----------------------- LEXER -----------------------
 # -----------------------------------------------------
 # -----------------------------------------------------
 class Lexer:
-    def __init__(self, file_path):
+    def __init__(self, file_path, engine='states', trace=None, source=None, profile=None, diagnostics=None,
+                 store=None):
+        if engine not in ENGINES:
+            raise ValueError(f'Unknown lexer engine: {engine}')
+
+        self.engine = engine
+        self.trace = trace
+        self.diagnostics = diagnostics
+        self.store = store
+        if engine == 'table':
+            self.next_token = self.next_token_table
+        if profile is not None:
+            self.instrument(profile)
+
         self.lexem = ''
         self.row = self.col = self.pos = 1
         self.state = self.pos = 0
         self.current_line = ' '
         self.content = list(self.current_line)
 
+        if engine in MAPPED_ENGINES:
+            self.map_file(file_path, source)
+            return
+
         try:
             self.file_reader = open(file_path, 'rb')
         except IOError as e:
             print(f'Error: {e}')
             traceback.print_exc()
+
+    def map_file(self, file_path, source=None):
+        # The whole file is mapped and decoded once; pos is an offset into
+        # self.source and line_end the offset just past the current line.
+        # Every line is followed by the ' ' that next_line appends, which
+        # padded records as consumed. A source already in memory can be
+        # given instead of the path. The bytes engine keeps the bytes.
+        if self.engine == 'bytes':
+            self.next_token = self.next_token_bytes
+            self.next_line = self.next_line_bytes
+            self.scan_mapped = self.scan_bytes
+        else:
+            self.next_token = self.next_token_mapped
+            self.next_line = self.next_line_mapped
+        if self.engine == 'compiled':
+            compiled = compiled_lexer(self.store)
+            self.scan_mapped = types.MethodType(compiled.scan, self)
+            self.read_compiled = types.MethodType(compiled.read, self)
+        self.is_EOF = self.is_EOF_mapped
+        self.source = b'' if self.engine == 'bytes' else ''
+        self.line_end = 0
+        self.padded = False
+
+        if source is not None:
+            self.source = source
+            return
+
+        try:
+            with open(file_path, 'rb') as file_reader:
+                # mmap refuses empty files, which keep the empty source
+                if os.fstat(file_reader.fileno()).st_size == 0:
+                    return
+                with mmap.mmap(file_reader.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    if self.engine == 'bytes':
+                        self.source = mapped.read()
+                    else:
+                        self.source = str(mapped, 'utf-8')
+        except IOError as e:
+            print(f'Error: {e}')
+            traceback.print_exc()
     
     def next_line(self):
         aux = ''
@@ -50,7 +173,8 @@ class Lexer:
         
         if aux != '':
             self.current_line = aux
-            self.print_info()
+            if self.trace is not None:
+                self.print_info()
             self.current_line += ' '
             self.row += 1
             self.pos = self.col = 0
@@ -59,6 +183,45 @@ class Lexer:
 
         return False
     
+    def next_line_mapped(self):
+        self.pos = self.line_end
+        if self.pos == len(self.source):
+            return False
+
+        self.line_end = self.source.find('\n', self.pos) + 1 or len(self.source)
+        self.padded = False
+        if self.trace is not None:
+            self.current_line = self.source[self.pos:self.line_end]
+            self.print_info()
+            self.current_line += ' '
+        self.row += 1
+        self.col = 0
+
+        return True
+
+    def next_line_bytes(self):
+        self.pos = self.line_end
+        if self.pos == len(self.source):
+            return False
+
+        self.line_end = self.source.find(b'\n', self.pos) + 1 or len(self.source)
+        self.padded = False
+        if self.trace is not None:
+            self.current_line = str(self.source[self.pos:self.line_end], 'utf-8', 'replace')
+            self.print_info()
+            self.current_line += ' '
+        self.row += 1
+        self.col = 0
+
+        return True
+
+    def seek_line(self, offset, row):
+        # Mapped engine: continue as if the line starting at offset were the
+        # next one to read and row the current row
+        self.pos = self.line_end = offset
+        self.padded = offset > 0
+        self.row = row
+
     def next_char(self):
         self.pos += 1
         return self.content[self.pos - 1]
@@ -67,10 +230,50 @@ class Lexer:
         self.pos -= 1
     
     def print_info(self):
-        print(f'{self.row} - {self.current_line}')
+        self.trace(self.row, self.current_line)
+
+    def instrument(self, profile):
+        # Counts what every state costs into profile. Only this instance gets
+        # the counting methods, so an uninstrumented lexer runs the plain ones.
+        if self.engine in MAPPED_ENGINES:
+            raise ValueError('Profiling needs the states or table engine')
+
+        self.profile = profile
+        profile.engine = self.engine
+        self.next_char = self.next_char_profiled
+        self.back = self.back_profiled
+        if self.engine == 'states':
+            self.next_token = self.next_token_profiled
+        else:
+            self.next_token = self.next_token_table_profiled
+
+    def next_char_profiled(self):
+        self.profile.chars[self.state] += 1
+        self.pos += 1
+        return self.content[self.pos - 1]
+
+    def back_profiled(self):
+        self.profile.backs[self.state] += 1
+        self.pos -= 1
+
+    def report(self, token):
+        # An error token: it is not returned, only handed to diagnostics
+        if self.diagnostics is not None:
+            self.diagnostics.lexical(token)
+
+    def close(self):
+        if hasattr(self, 'file_reader'):
+            self.file_reader.close()
+
+    def __iter__(self):
+        while not self.is_EOF():
+            yield self.next_token()
 
     def is_EOF(self):
         return self.pos == len(self.content)
+
+    def is_EOF_mapped(self):
+        return self.padded and self.pos == self.line_end == len(self.source)
     
     def next_token(self):
         self.state = 1
@@ -95,6 +298,593 @@ class Lexer:
             if process_state:
                 return process_state
 
+    def next_token_profiled(self):
+        # next_token, timing every State call
+        profile = self.profile
+        clock = time.perf_counter_ns
+        self.state = 1
+        self.lexem = ''
+        while True:
+            if self.is_EOF():
+                if self.next_line():
+                    self.content = list(self.current_line)
+                else:
+                    return Token(
+                        LEX_DICT.OTHER['EOF'],
+                        'EOF',
+                        (self.row, self.col)
+                    )
+
+            current_char = self.next_char()
+            state = self.state
+
+            start = clock()
+            process_state = STATES[state](self).process_state(current_char)
+            profile.time_ns[state] += clock() - start
+            profile.transitions[state, self.state] += 1
+
+            if process_state:
+                profile.tokens[state] += 1
+                return process_state
+
+    def next_token_table(self):
+        # Same automaton as STATES, driven by TRANSITIONS instead of one
+        # State object per character. Hot variables live in locals and are
+        # written back before anything that may look at the lexer.
+        state = 1
+        lexem = ''
+        content = self.content
+        line = self.current_line
+        pos = self.pos
+        classes = CHAR_CLASSES
+        runs = RUNS
+
+        while True:
+            if pos == len(content) and state != S9_PEEK:
+                self.pos = pos
+                if self.next_line():
+                    content = self.content = list(self.current_line)
+                    line = self.current_line
+                    pos = self.pos
+                else:
+                    self.state = state
+                    self.lexem = lexem
+                    return Token(
+                        LEX_DICT.OTHER['EOF'],
+                        'EOF',
+                        (self.row, self.col)
+                    )
+
+            current_char = content[pos]
+            char_cls = classes.get(current_char)
+            if char_cls is None:
+                char_cls = char_class(current_char)
+            action, next_state, tkn_cat = TRANSITIONS[state][char_cls]
+
+            if action == ADD:
+                lexem += current_char
+                pos += 1
+                state = next_state
+                if runs[state] is not None:
+                    end = runs[state](line, pos).end()
+                    lexem += line[pos:end]
+                    pos = end
+            elif action == SKIP:
+                pos += 1
+                state = next_state
+                if runs[state] is not None:
+                    pos = runs[state](line, pos).end()
+            elif action == COMMENT:
+                pos = len(content)
+                state = next_state
+                lexem = ''
+            elif action == EMIT_BACK:
+                self.col += 1
+                if tkn_cat is None:
+                    tkn_cat = keyword(lexem)
+                self.pos = pos
+                self.state = state
+                self.lexem = lexem
+                return Token(tkn_cat, lexem, (self.row, self.col))
+            elif action == EMIT:
+                lexem += current_char
+                self.col += 1
+                self.pos = pos + 1
+                self.state = state
+                self.lexem = lexem
+                return Token(tkn_cat, lexem, (self.row, self.col))
+            elif action == SHIFT:
+                state = next_state
+            elif action == DROP:
+                pos += 1
+                self.col += 1
+                if self.diagnostics is not None:
+                    self.report(Token(tkn_cat, lexem, (self.row, self.col)))
+            elif action == REPORT:
+                pos += 1
+                if self.diagnostics is not None:
+                    self.report(Token(tkn_cat, current_char, (self.row, self.col)))
+            elif action == ADD_COL:
+                lexem += current_char
+                pos += 1
+                self.col += 1
+                state = next_state
+            else:
+                # DELEGATE: the reference state handles this character
+                self.pos = pos + 1
+                self.state = state
+                self.lexem = lexem
+                token = STATES[state](self).process_state(current_char)
+                if token:
+                    return token
+                content = self.content
+                line = self.current_line
+                pos = self.pos
+                state = self.state
+                lexem = self.lexem
+
+    def next_token_table_profiled(self):
+        # next_token_table with counters. A cell that leaves its character
+        # for the next state (EMIT_BACK, SHIFT) counts as a back(); a state's
+        # time runs from entering it to leaving it.
+        profile = self.profile
+        chars, backs, time_ns = profile.chars, profile.backs, profile.time_ns
+        transitions = profile.transitions
+        clock = time.perf_counter_ns
+        state = 1
+        lexem = ''
+        content = self.content
+        pos = self.pos
+        classes = CHAR_CLASSES
+        entered = clock()
+
+        while True:
+            if pos == len(content) and state != S9_PEEK:
+                self.pos = pos
+                if self.next_line():
+                    content = self.content = list(self.current_line)
+                    pos = self.pos
+                else:
+                    self.state = state
+                    self.lexem = lexem
+                    time_ns[state] += clock() - entered
+                    return Token(
+                        LEX_DICT.OTHER['EOF'],
+                        'EOF',
+                        (self.row, self.col)
+                    )
+
+            current_char = content[pos]
+            char_cls = classes.get(current_char)
+            if char_cls is None:
+                char_cls = char_class(current_char)
+            action, next_state, tkn_cat = TRANSITIONS[state][char_cls]
+
+            if action == EMIT_BACK or action == SHIFT:
+                backs[state] += 1
+            elif action == COMMENT:
+                chars[state] += len(content) - pos
+            elif action != DELEGATE:
+                chars[state] += 1
+
+            if action == EMIT or action == EMIT_BACK:
+                profile.tokens[state] += 1
+                transitions[state, 1] += 1
+                time_ns[state] += clock() - entered
+            elif action != DELEGATE:
+                transitions[state, next_state] += 1
+                if next_state != state:
+                    now = clock()
+                    time_ns[state] += now - entered
+                    entered = now
+
+            if action == ADD:
+                lexem += current_char
+                pos += 1
+                state = next_state
+            elif action == SKIP:
+                pos += 1
+                state = next_state
+            elif action == COMMENT:
+                pos = len(content)
+                state = next_state
+                lexem = ''
+            elif action == EMIT_BACK:
+                self.col += 1
+                if tkn_cat is None:
+                    tkn_cat = keyword(lexem)
+                self.pos = pos
+                self.state = state
+                self.lexem = lexem
+                return Token(tkn_cat, lexem, (self.row, self.col))
+            elif action == EMIT:
+                lexem += current_char
+                self.col += 1
+                self.pos = pos + 1
+                self.state = state
+                self.lexem = lexem
+                return Token(tkn_cat, lexem, (self.row, self.col))
+            elif action == SHIFT:
+                state = next_state
+            elif action == DROP:
+                pos += 1
+                self.col += 1
+                if self.diagnostics is not None:
+                    self.report(Token(tkn_cat, lexem, (self.row, self.col)))
+            elif action == REPORT:
+                pos += 1
+                if self.diagnostics is not None:
+                    self.report(Token(tkn_cat, current_char, (self.row, self.col)))
+            elif action == ADD_COL:
+                lexem += current_char
+                pos += 1
+                self.col += 1
+                state = next_state
+            else:
+                # DELEGATE: the reference state counts through next_char
+                # and back, and the rest like next_token_profiled
+                self.pos = pos + 1
+                self.state = state
+                self.lexem = lexem
+                chars[state] += 1
+                token = STATES[state](self).process_state(current_char)
+                transitions[state, self.state] += 1
+                now = clock()
+                time_ns[state] += now - entered
+                entered = now
+                if token:
+                    profile.tokens[state] += 1
+                    return token
+                content = self.content
+                pos = self.pos
+                state = self.state
+                lexem = self.lexem
+
+    def next_token_mapped(self):
+        tkn_cat = self.scan_mapped()
+        lexem = self.lexem
+        if lexem is None:
+            lexem = self.source[self.start:self.pos]
+        return Token(tkn_cat, lexem, (self.row, self.col))
+
+    def scan_mapped(self):
+        # next_token_table over self.source. Returns the category of the
+        # next token, which spans self.source[self.start:self.pos]. Lexems
+        # are not built character by character; only characters the
+        # automaton drops (or the ' ' after a line inside a string) make
+        # one irregular, and then it is left in self.lexem (None otherwise).
+        state = 1
+        source = self.source
+        pos = start = self.pos
+        line_end = self.line_end
+        pieces = None
+        classes = CHAR_CLASSES
+        runs = RUNS
+
+        while True:
+            if pos == line_end:
+                if not self.padded:
+                    self.padded = True
+                    if state == 1:
+                        continue
+
+                    action, next_state, tkn_cat = TRANSITIONS[state][PAD_CLASS]
+                    if action == EMIT_BACK:
+                        self.padded = False
+                        break
+                    elif action == SHIFT:
+                        self.padded = False
+                        state = next_state
+                    elif action == ADD:
+                        if pieces is None:
+                            pieces = [start]
+                        pieces.append(source[start:pos])
+                        pieces.append(' ')
+                        start = pos
+                        state = next_state
+                    elif action == COMMENT:
+                        start = pos
+                        state = next_state
+                    else:
+                        self.padded = False
+                        self.pos = pos
+                        self.state = state
+                        self.lexem = self.join_pieces(pieces, start, pos)
+                        STATES[state](self).process_state(' ')
+                    continue
+
+                if state == S9_PEEK:
+                    # State_Nine reads past the end of the line here
+                    raise IndexError('list index out of range')
+
+                if not self.next_line():
+                    self.state = state
+                    self.start = pos
+                    self.lexem = 'EOF'
+                    return LEX_DICT.OTHER['EOF']
+
+                line_end = self.line_end
+                if state == 1:
+                    start = pos
+                continue
+
+            current_char = source[pos]
+            char_cls = classes.get(current_char)
+            if char_cls is None:
+                char_cls = char_class(current_char)
+            action, next_state, tkn_cat = TRANSITIONS[state][char_cls]
+
+            if action == ADD:
+                pos += 1
+                state = next_state
+                if runs[state] is not None:
+                    pos = runs[state](source, pos, line_end).end()
+            elif action == SKIP:
+                pos += 1
+                state = next_state
+                if runs[state] is not None:
+                    pos = runs[state](source, pos, line_end).end()
+                start = pos
+            elif action == COMMENT:
+                pos = start = line_end
+                state = next_state
+                pieces = None
+            elif action == EMIT_BACK:
+                break
+            elif action == EMIT:
+                pos += 1
+                break
+            elif action == SHIFT:
+                state = next_state
+            elif action == DROP:
+                if pieces is None:
+                    pieces = [start]
+                pieces.append(source[start:pos])
+                pos += 1
+                start = pos
+                self.col += 1
+                if self.diagnostics is not None:
+                    self.report(Token(tkn_cat, self.join_pieces(pieces, pos, pos), (self.row, self.col)))
+            elif action == REPORT:
+                if self.diagnostics is not None:
+                    self.report(Token(tkn_cat, source[pos], (self.row, self.col)))
+                pos += 1
+                start = pos
+            elif action == ADD_COL:
+                pos += 1
+                self.col += 1
+                state = next_state
+            else:
+                origin = start if pieces is None else pieces[0]
+                self.pos = pos + 1
+                self.state = state
+                self.lexem = self.join_pieces(pieces, start, pos + 1)
+                token = STATES[state](self).process_state(current_char)
+                if token:
+                    self.start = origin
+                    self.lexem = token.lexem
+                    return token.tkn_cat
+                pos = start = self.pos
+                pieces = [origin, self.lexem]
+                state = self.state
+
+        self.col += 1
+        self.pos = pos
+        if pieces is None:
+            self.start = start
+            self.lexem = None
+        else:
+            self.start = pieces[0]
+            self.lexem = self.join_pieces(pieces, start, pos)
+        if tkn_cat is None:
+            tkn_cat = keyword(self.lexem or source[start:pos])
+        return tkn_cat
+
+    def join_pieces(self, pieces, start, end):
+        # pieces holds the offset the lexem started at, then its pieces
+        if pieces is None:
+            return self.source[start:end]
+        return ''.join(pieces[1:]) + self.source[start:end]
+
+    def next_token_bytes(self):
+        tkn_cat = self.scan_bytes()
+        lexem = self.lexem
+        if lexem is None:
+            lexem = FIXED_LEXEMS.get(tkn_cat[1]) or str(self.source[self.start:self.pos], 'ascii')
+        return Token(tkn_cat, lexem, (self.row, self.col))
+
+    def scan_bytes(self):
+        # scan_mapped over the undecoded file. Characters are classified by
+        # byte through BYTE_CLASSES, and only lexems callers ask for are
+        # decoded (the ones scanned are ASCII). A non-ASCII character, a
+        # whole UTF-8 sequence, is an ERR_CHARACTER token of its own starting
+        # at its byte offset; inside a string it is dropped like any other
+        # character outside chr(32)..chr(126).
+        state = 1
+        source = self.source
+        pos = start = self.pos
+        line_end = self.line_end
+        pieces = None
+        classes = BYTE_CLASSES
+        transitions = BYTE_TRANSITIONS
+        runs = BYTE_RUNS
+
+        while True:
+            if pos == line_end:
+                if not self.padded:
+                    self.padded = True
+                    if state == 1:
+                        continue
+
+                    action, next_state, tkn_cat = transitions[state][PAD_CLASS]
+                    if action == EMIT_BACK:
+                        self.padded = False
+                        break
+                    elif action == SHIFT:
+                        self.padded = False
+                        state = next_state
+                    elif action == ADD:
+                        if pieces is None:
+                            pieces = [start]
+                        pieces.append(source[start:pos])
+                        pieces.append(b' ')
+                        start = pos
+                        state = next_state
+                    elif action == COMMENT:
+                        start = pos
+                        state = next_state
+                    else:
+                        self.padded = False
+                        self.pos = pos
+                        self.state = state
+                        self.lexem = self.join_bytes(pieces, start, pos)
+                        STATES[state](self).process_state(' ')
+                    continue
+
+                if state == S9_PEEK:
+                    raise IndexError('list index out of range')
+
+                if not self.next_line():
+                    self.state = state
+                    self.start = pos
+                    self.lexem = 'EOF'
+                    return LEX_DICT.OTHER['EOF']
+
+                line_end = self.line_end
+                if state == 1:
+                    start = pos
+                continue
+
+            action, next_state, tkn_cat = transitions[state][classes[source[pos]]]
+
+            if action == ADD:
+                pos += 1
+                state = next_state
+                if runs[state] is not None:
+                    pos = runs[state](source, pos, line_end).end()
+            elif action == SKIP:
+                pos += 1
+                state = next_state
+                if runs[state] is not None:
+                    pos = runs[state](source, pos, line_end).end()
+                start = pos
+            elif action == COMMENT:
+                pos = start = line_end
+                state = next_state
+                pieces = None
+            elif action == EMIT_BACK:
+                break
+            elif action == EMIT:
+                pos += 1
+                break
+            elif action == SHIFT:
+                state = next_state
+            elif action == DROP:
+                if pieces is None:
+                    pieces = [start]
+                pieces.append(source[start:pos])
+                pos = sequence_end(source, pos, line_end)
+                start = pos
+                self.col += 1
+                if self.diagnostics is not None:
+                    self.report(Token(tkn_cat, self.join_bytes(pieces, pos, pos), (self.row, self.col)))
+            elif action == REPORT:
+                if self.diagnostics is not None:
+                    self.report(Token(tkn_cat, chr(source[pos]), (self.row, self.col)))
+                pos += 1
+                start = pos
+            elif action == ADD_COL:
+                pos += 1
+                self.col += 1
+                state = next_state
+            elif action == ERROR:
+                self.col += 1
+                self.start = pos
+                self.pos = sequence_end(source, pos, line_end)
+                self.lexem = str(source[pos:self.pos], 'utf-8', 'replace')
+                return tkn_cat
+            else:
+                origin = start if pieces is None else pieces[0]
+                self.pos = pos + 1
+                self.state = state
+                self.lexem = self.join_bytes(pieces, start, pos + 1)
+                token = STATES[state](self).process_state(chr(source[pos]))
+                if token:
+                    self.start = origin
+                    self.lexem = token.lexem
+                    return token.tkn_cat
+                pos = start = self.pos
+                pieces = [origin, self.lexem.encode('ascii')]
+                state = self.state
+
+        self.col += 1
+        self.pos = pos
+        if pieces is None:
+            self.start = start
+            self.lexem = None
+        else:
+            self.start = pieces[0]
+            self.lexem = self.join_bytes(pieces, start, pos)
+        if tkn_cat is None:
+            tkn_cat = keyword_bytes(source, start, pos) if pieces is None else keyword(self.lexem)
+        return tkn_cat
+
+    def join_bytes(self, pieces, start, end):
+        # join_pieces for the bytes engine, decoded
+        if pieces is None:
+            return str(self.source[start:end], 'ascii')
+        return str(b''.join(pieces[1:]) + self.source[start:end], 'ascii')
+
+    def read_buffer(self):
+        if self.engine not in MAPPED_ENGINES:
+            raise ValueError('read_buffer needs the mapped, bytes or compiled engine')
+
+        buffer = TokenBuffer(self.source)
+        if self.engine == 'compiled':
+            return self.read_compiled(buffer)
+        append = buffer.append
+        eof = LEX_DICT.OTHER['EOF']
+        while True:
+            tkn_cat = self.scan_mapped()
+            append(tkn_cat[1], self.start, self.pos, self.row, self.col, self.lexem)
+            if tkn_cat is eof:
+                buffer.end_state = self.state
+                return buffer
+
+
+def compiled_lexer(store=None):
+    # The compiled engine's scan_mapped and read_buffer, generated from the
+    # transition table by codegen.py on first use and kept in store, if any
+    import codegen
+    return codegen.load(store)
+
+
+def tokenize(file_path, engine='mapped', trace=None, profile=None, diagnostics=None, store=None):
+    # Tokens of a file up to and including EOF, produced lazily. Nothing is
+    # written to stdout unless a trace hook is given (see print_line); the
+    # error tokens the lexer discards go to diagnostics, if given. The
+    # compiled engine keeps its generated code in store, if given.
+    lexer = Lexer(file_path, engine, trace, profile=profile, diagnostics=diagnostics, store=store)
+    try:
+        yield from lexer
+    finally:
+        lexer.close()
+
+
+def sequence_end(source, pos, limit):
+    # Offset after the UTF-8 sequence starting at source[pos]; a broken
+    # sequence ends at its first byte that does not continue it
+    end = pos + 1
+    stop = min(pos + UTF8_LENGTHS[source[pos]], limit)
+    while end < stop and 0x80 <= source[end] < 0xC0:
+        end += 1
+    return end
+
+
+def print_line(row, line):
+    # Trace hook that echoes every source line as it is read
+    print(f'{row} - {line}')
+
 
 # ------------------------------------------------------
 # ------------------------------------------------------
@@ -181,11 +971,11 @@ class State_One(State):
                 (self.lexer.row, self.lexer.col)
             )
         else:
-            Token(
+            self.lexer.report(Token(
                 LEX_DICT.ERRORS['ERR_UNKNOWN'],
-                self.lexer.lexem,
+                self.lexer.lexem + current_char,
                 (self.lexer.row, self.lexer.col)
-            )
+            ))
 
 
 class State_Two(State):
@@ -198,11 +988,11 @@ class State_Two(State):
             self.lexer.lexem += current_char
         else:
             self.lexer.col += 1
-            Token(
+            self.lexer.report(Token(
                 LEX_DICT.ERRORS['ERR_IDENTIFIER'],
                 self.lexer.lexem,
                 (self.lexer.row, self.lexer.col)
-            )
+            ))
 
 
 class State_Three(State):
@@ -230,11 +1020,11 @@ class State_Four(State):
             self.lexer.lexem += current_char
         else:
             self.lexer.col += 1
-            Token(
+            self.lexer.report(Token(
                 LEX_DICT.ERRORS['ERR_NUMERIC'],
                 self.lexer.lexem,
                 (self.lexer.row, self.lexer.col)
-            )
+            ))
 
 
 class State_Five(State):
@@ -247,11 +1037,11 @@ class State_Five(State):
             self.lexer.state = 7
         else:
             self.lexer.col += 1
-            Token(
+            self.lexer.report(Token(
                 LEX_DICT.ERRORS['ERR_NUMERIC'],
                 self.lexer.lexem,
                 (self.lexer.row, self.lexer.col)
-            )
+            ))
 
 
 class State_Six(State):
@@ -337,11 +1127,11 @@ class State_Eight(State):
                     (self.lexer.row, self.lexer.col)
                 )
         else:
-            Token(
+            self.lexer.report(Token(
                 LEX_DICT.ERRORS['ERR_UNKNOWN'],
                 self.lexer.lexem,
                 (self.lexer.row, self.lexer.col)
-            )
+            ))
 
 
 class State_Nine(State):
@@ -358,11 +1148,11 @@ class State_Nine(State):
                 self.lexer.state = 11
         else:
             self.lexer.col += 1
-            Token(
-                LEX_DICT.ERRORS['ERR_CHAR'],
+            self.lexer.report(Token(
+                LEX_DICT.ERRORS['ERR_CHARACTER'],
                 self.lexer.lexem,
                 (self.lexer.row, self.lexer.col)
-            )
+            ))
 
 
 class State_Ten(State):
@@ -390,11 +1180,11 @@ class State_Eleven(State):
                 )
         else:
             self.lexer.col += 1
-            Token(
+            self.lexer.report(Token(
                 LEX_DICT.ERRORS['ERR_CHARACTER'],
                 self.lexer.lexem,
                 (self.lexer.row, self.lexer.col)
-            )
+            ))
 
 
 class State_Twelve(State):
@@ -412,26 +1202,19 @@ class State_Thirteen(State):
         self.lexer.back()
         self.lexer.col += 1
 
-        if LEX_DICT.RESERVED_WORDS[self.lexer.lexem][1] is not None:
-            return Token(
-                LEX_DICT.RESERVED_WORDS[self.lexer.lexem],
-                self.lexer.lexem,
-                (self.lexer.row, self.lexer.col)
-            )
-        else:
-            return Token(
-                LEX_DICT.ERRORS['ERR_RW'],
-                self.lexer.lexem,
-                (self.lexer.row, self.lexer.col)
-            )
+        return Token(
+            keyword(self.lexer.lexem),
+            self.lexer.lexem,
+            (self.lexer.row, self.lexer.col)
+        )
 
 
 class State_Fourteen(State):
     def process_state(self, current_char):
-        self.lexer.next_line()
-        self.lexer.content = self.lexer.text
-        self.lexem.lexem = ''
-        self.lexer.state = 0
+        # The comment runs to the end of the line
+        self.lexer.pos = len(self.lexer.content)
+        self.lexer.lexem = ''
+        self.lexer.state = 1
 
 
 STATES = {
@@ -456,82 +1239,348 @@ STATES = {
 # ------------------ LEXEM DICTIONARY ------------------
 # ------------------------------------------------------
 # ------------------------------------------------------
-class LEX_DICT:
-    RESERVED_WORDS = {
-        'Int':      ('RW_INT',      1 ),
-        'float':    ('RW_FLOAT',    2 ),
-        'Char':     ('RW_CHAR',     3 ),
-        'String':   ('RW_STRING',   4 ),
-        'Bool':     ('RW_BOOL',     5 ),
-        'Begin':    ('RW_BEGIN',    6 ),
-        'End':      ('RW_END',      7 ),
-        'If':       ('RW_IF',       8 ),
-        'Else':     ('RW_ELSE',     9 ),
-        'While':    ('RW_WHILE',    10),
-        'From':     ('RW_FROM',     11),
-        'To':       ('RW_TO',       12),
-        'Increase': ('RW_INCREASE', 13),
-        'Get':      ('RW_GET',      14),
-        'Show':     ('RW_SHOW',     15),
-        'Return':   ('RW_RETURN',   16),
-        'Function': ('RW_FUNCTION', 17),
-        'True':     ('RW_TRUE',     18),
-        'False':    ('RW_FALSE',    19),
-        'Array':    ('RW_ARRAY',    20),
-        'Empty':    ('RW_EMPTY',    21),
-        'And':      ('OPE_CONJ',    22),
-        'Or':       ('OPE_DISJ',    23)
-    }
-
-    OPERATORS = {
-        '+':       ('OPE_ADD',  24),
-        '-':       ('OPE_SUB',  25),
-        '*':       ('OPE_MUL',  26),
-        '/':       ('OPE_DIV',  27),
-        '=':       ('OPE_ATR',  28),
-        '<':       ('OPE_LT',   29),
-        '>':       ('OPE_GT',   30),
-        'OPE_LE':  ('OPE_LE',   31),
-        'OPE_GE':  ('OPE_GE',   32),
-        'OPE_REL': ('OPE_REL',  33),
-        '!':       ('OPE_NEG',  34)
-    }
-
-    IDENTIFIERS = {
-        'ID':          ('ID',          35),
-        'IDEN_INT':    ('IDEN_INT',    36),
-        'IDEN_FLOAT':  ('IDEN_FLOAT',  37),
-        'IDEN_BOOL':   ('IDEN_BOOL',   38),
-        'IDEN_CHAR':   ('IDEN_CHAR',   39),
-        'IDEN_STRING': ('IDEN_STRING', 40),
-        'IDEN_ARRAY':  ('IDEN_ARRAY',  41)
-    }
-
-    DELIMITERS = {
-        'Begin': ('DELI_BEGIN',   42),
-        'End':   ('DELI_END',     43),
-        '(':     ('DELI_OPAREN',  44),
-        ')':     ('DELI_CPAREN',  45),
-        '[':     ('DELI_OBRAC',   46),
-        ']':     ('DELI_CBRAC',   47),
-        '{':     ('DELI_OCURLY',  48),
-        '}':     ('DELI_CCURLY',  49),
-        ',':     ('DELI_COMMA',   50),
-        ';':     ('DELI_SEMICOL', 51)
-    }
-
-    ERRORS = {
-        'ERR_UNKNOWN':    ('ERR_UNKNOWN',    52),
-        'ERR_IDENTIFIER': ('ERR_IDENTIFIER', 53),
-        'ERR_NUMERIC':    ('ERR_NUMERIC',    54),
-        'ERR_RW':         ('ERR_RW',         55),
-        'ERR_CHARACTER':  ('ERR_CHARACTER',  56),
-    }
-
-    OTHER = {
-        'EOF':     ('OTHER_EOF',     57),
-        'COMMENT': ('OTHER_COMMENT', 58)
-    }
-
-OPERATORS_LIST = ['+', '-', '*', '/', '!']
-DELIMITERS_LIST = ['(', ')', '[', ']', '{', '}', ',', ';']
+# Shared with the parsers (token_kinds.py)
+LEX_DICT = token_kinds.TOKEN_DICT
+
+OPERATORS_LIST = token_kinds.OPERATORS_LIST
+DELIMITERS_LIST = token_kinds.DELIMITERS_LIST
+
+
+# ------------------------------------------------------
+# ------------------------------------------------------
+# ---------------------- KEYWORDS ----------------------
+# ------------------------------------------------------
+# ------------------------------------------------------
+def keyword_slot(first, last, size):
+    return (first * KEYWORD_FIRST + last * KEYWORD_LAST + size) & KEYWORD_MASK
+
+
+def build_keywords():
+    # Perfect hash of the reserved words on their first character, last
+    # character and length: the smallest table, and multipliers for it,
+    # where no two words share a slot
+    words = list(LEX_DICT.RESERVED_WORDS)
+    for size in (32, 64, 128, 256):
+        for first in range(1, size):
+            for last in range(1, size):
+                slots = [(ord(word[0]) * first + ord(word[-1]) * last + len(word)) & (size - 1) for word in words]
+                if len(set(slots)) == len(words):
+                    table = [None] * size
+                    for slot, word in zip(slots, words):
+                        table[slot] = (word, word.encode('ascii'), LEX_DICT.RESERVED_WORDS[word])
+                    return first, last, size - 1, tuple(table)
+    raise ValueError('No perfect hash for the reserved words')
+
+
+KEYWORD_FIRST, KEYWORD_LAST, KEYWORD_MASK, KEYWORD_TABLE = build_keywords()
+
+
+def keyword(word):
+    # Category of a capitalized word: its reserved word, or ERR_RW
+    entry = KEYWORD_TABLE[keyword_slot(ord(word[0]), ord(word[-1]), len(word))]
+    if entry is not None and entry[0] == word:
+        return entry[2]
+    return LEX_DICT.ERRORS['ERR_RW']
+
+
+def keyword_bytes(source, start, end):
+    # keyword() of source[start:end] in bytes, without decoding or slicing it
+    entry = KEYWORD_TABLE[keyword_slot(source[start], source[end - 1], end - start)]
+    if entry is not None and len(entry[1]) == end - start and source.startswith(entry[1], start):
+        return entry[2]
+    return LEX_DICT.ERRORS['ERR_RW']
+
+
+# ------------------------------------------------------
+# ------------------------------------------------------
+# ------------------ TRANSITION TABLE ------------------
+# ------------------------------------------------------
+# ------------------------------------------------------
+ENGINES = ('states', 'table', 'mapped', 'bytes', 'compiled')
+# Engines that scan the whole file by offset instead of line by line
+MAPPED_ENGINES = ('mapped', 'bytes', 'compiled')
+
+# Actions of a TRANSITIONS cell
+ADD       = 0  # consume and append to the lexem
+SKIP      = 1  # consume without appending
+EMIT      = 2  # consume, append and return the token
+EMIT_BACK = 3  # return the token, leaving the character for the next one
+SHIFT     = 4  # change state without consuming
+DROP      = 5  # consume an invalid character, reported as an error token
+ADD_COL   = 6  # ADD that also advances the column (the float dot)
+DELEGATE  = 7  # hand the character to the reference State class
+ERROR     = 8  # bytes engine: emit a non-ASCII character as an error token
+COMMENT   = 9  # skip the rest of the line
+REPORT    = 10 # SKIP an unknown character, reported as an error token
+
+# Rows the table adds to STATES: State_Eight split by its first character
+# and the lookahead State_Nine makes for a closing quote
+S8_LT   = 15
+S8_GT   = 16
+S8_NEG  = 17
+S9_PEEK = 18
+
+# Characters the automaton compares directly get a class of their own;
+# any other character is classified by its str predicates
+SPECIAL_CHARS = '<>=!"@.' + ''.join(OPERATORS_LIST) + ''.join(DELIMITERS_LIST)
+SPECIAL_CHARS = ''.join(dict.fromkeys(SPECIAL_CHARS))
+
+
+def char_features(char):
+    return (
+        char.isspace(),
+        char.islower(),
+        char.isdigit(),
+        char.isupper(),
+        char.isalnum(),
+        chr(32) <= char <= chr(126)
+    )
+
+
+def feature_class(features):
+    cls = len(SPECIAL_CHARS)
+    for bit, feature in enumerate(features):
+        if feature:
+            cls += 1 << bit
+    return cls
+
+
+def char_class(char):
+    index = SPECIAL_CHARS.find(char) if len(char) == 1 else -1
+    if index == -1 and len(char) == 1 and char < '\x80':
+        # The shared flags are the features, in the same bit order
+        index = len(SPECIAL_CHARS) + token_kinds.CHAR_FLAGS[ord(char)]
+    elif index == -1:
+        index = feature_class(char_features(char))
+    CHAR_CLASSES[char] = index
+    return index
+
+
+def transition(state, char, features):
+    space, lower, digit, upper, alnum, printable = features
+    operator = char in ['<', '>', '=', '!']
+
+    if state == 1:
+        if space:
+            return (SKIP, 1, None)
+        elif lower:
+            return (ADD, 2, None)
+        elif digit:
+            return (ADD, 4, None)
+        elif char == '<':
+            return (ADD, S8_LT, None)
+        elif char == '>':
+            return (ADD, S8_GT, None)
+        elif operator:
+            return (ADD, S8_NEG, None)
+        elif char == '\"':
+            return (ADD, 9, None)
+        elif upper:
+            return (ADD, 12, None)
+        elif char == '@':
+            return (ADD, 14, None)
+        elif char in OPERATORS_LIST:
+            return (EMIT, 1, LEX_DICT.OPERATORS[char])
+        elif char in DELIMITERS_LIST:
+            return (EMIT, 1, LEX_DICT.DELIMITERS[char])
+        return (REPORT, 1, LEX_DICT.ERRORS['ERR_UNKNOWN'])
+
+    if state == 2:
+        if space or operator or not alnum:
+            return (EMIT_BACK, 1, LEX_DICT.IDENTIFIERS['ID'])
+        elif digit or upper or lower:
+            return (ADD, 2, None)
+        return (DROP, 2, LEX_DICT.ERRORS['ERR_IDENTIFIER'])
+
+    if state == 4:
+        if char == '.':
+            return (ADD_COL, 5, None)
+        elif not alnum:
+            return (EMIT_BACK, 1, LEX_DICT.IDENTIFIERS['IDEN_INT'])
+        elif digit:
+            return (ADD, 4, None)
+        return (DROP, 4, LEX_DICT.ERRORS['ERR_NUMERIC'])
+
+    if state == 5:
+        if digit:
+            return (ADD, 5, None)
+        elif space or operator or not alnum:
+            return (EMIT_BACK, 1, LEX_DICT.IDENTIFIERS['IDEN_FLOAT'])
+        return (DROP, 5, LEX_DICT.ERRORS['ERR_NUMERIC'])
+
+    if state in (S8_LT, S8_GT, S8_NEG):
+        single, double = {
+            S8_LT:  ('<', 'OPE_LE'),
+            S8_GT:  ('>', 'OPE_GE'),
+            S8_NEG: ('!', 'OPE_REL')
+        }[state]
+        if char == '=':
+            return (EMIT, 1, LEX_DICT.OPERATORS[double])
+        return (EMIT_BACK, 1, LEX_DICT.OPERATORS[single])
+
+    if state == 9:
+        if printable:
+            return (ADD, S9_PEEK, None)
+        return (DROP, 9, LEX_DICT.ERRORS['ERR_CHARACTER'])
+
+    if state == S9_PEEK:
+        if char == '\"':
+            return (ADD, 10, None)
+        return (SHIFT, 11, None)
+
+    if state == 10:
+        return (EMIT_BACK, 1, LEX_DICT.IDENTIFIERS['IDEN_CHAR'])
+
+    if state == 11:
+        if char == '\"':
+            return (EMIT, 1, LEX_DICT.IDENTIFIERS['IDEN_STRING'])
+        elif printable:
+            return (ADD, 11, None)
+        return (DROP, 11, LEX_DICT.ERRORS['ERR_CHARACTER'])
+
+    if state == 12:
+        if lower and not space:
+            return (ADD, 12, None)
+        # None: the category comes from keyword(lexem)
+        return (EMIT_BACK, 1, None)
+
+    if state == 14:
+        return (COMMENT, 1, None)
+
+    return (DELEGATE, state, None)
+
+
+def build_transitions():
+    columns = [(char, char_features(char)) for char in SPECIAL_CHARS]
+    for bits in range(1 << 6):
+        features = tuple(bool(bits & (1 << bit)) for bit in range(6))
+        columns.append((None, features))
+
+    rows = [None] * (S9_PEEK + 1)
+    for state in (1, 2, 4, 5, S8_LT, S8_GT, S8_NEG, 9, S9_PEEK, 10, 11, 12, 14):
+        rows[state] = tuple(transition(state, char, features) for char, features in columns)
+    return tuple(rows)
+
+
+CHAR_CLASSES = {}
+TRANSITIONS = build_transitions()
+for code in range(128):
+    char_class(chr(code))
+PAD_CLASS = CHAR_CLASSES[' ']
+
+# The bytes engine classifies ASCII like CHAR_CLASSES and every byte of a
+# non-ASCII character as NON_ASCII, which behaves like a control character
+# except in state 1, where it is an error token instead of being skipped
+NON_ASCII = len(SPECIAL_CHARS) + 64
+def build_byte_transitions():
+    control = feature_class((False,) * 6)
+    rows = [row and row + (row[control],) for row in TRANSITIONS]
+    rows[1] = rows[1][:NON_ASCII] + ((ERROR, 1, LEX_DICT.ERRORS['ERR_CHARACTER']),)
+    return tuple(rows)
+
+
+BYTE_CLASSES = [char_class(chr(byte)) for byte in range(128)] + [NON_ASCII] * 128
+BYTE_TRANSITIONS = build_byte_transitions()
+
+def build_runs():
+    # Per state, a regex matching the run of ASCII characters the state
+    # takes one by one without leaving it (its ADD or SKIP self-loops). The
+    # scanners consume such a run in one match after entering the state;
+    # anything else, including non-ASCII, still goes through the table.
+    runs = [None] * len(TRANSITIONS)
+    for state, row in enumerate(TRANSITIONS):
+        if row is None:
+            continue
+        loops = [chr(byte) for byte in range(128) if row[CHAR_CLASSES[chr(byte)]][:2] in ((ADD, state), (SKIP, state))]
+        if loops:
+            runs[state] = '[' + ''.join(re.escape(char) for char in loops) + ']*'
+    return runs
+
+
+RUN_PATTERNS = build_runs()
+RUNS = [pattern and re.compile(pattern).match for pattern in RUN_PATTERNS]
+BYTE_RUNS = [pattern and re.compile(pattern.encode('ascii')).match for pattern in RUN_PATTERNS]
+
+# Length of the UTF-8 sequence a byte starts (1 for stray bytes)
+UTF8_LENGTHS = [1] * 0xC0 + [2] * 0x20 + [3] * 0x10 + [4] * 0x08 + [1] * 0x08
+
+
+# ------------------------------------------------------
+# ------------------------------------------------------
+# ------------------- TOKEN CATEGORIES -----------------
+# ------------------------------------------------------
+# ------------------------------------------------------
+# Indexed by category id
+CATEGORIES = token_kinds.CATEGORIES
+
+# Categories the automaton only ever produces with one spelling. OPE_NEG
+# ('!' and '=') and OPE_REL ('==' and '!=') are left out.
+FIXED_LEXEMS = {category[1]: word for word, category in LEX_DICT.RESERVED_WORDS.items()}
+FIXED_LEXEMS.update({LEX_DICT.OPERATORS[char][1]: char for char in ['+', '-', '*', '/', '<', '>']})
+FIXED_LEXEMS[LEX_DICT.OPERATORS['OPE_LE'][1]] = '<='
+FIXED_LEXEMS[LEX_DICT.OPERATORS['OPE_GE'][1]] = '>='
+FIXED_LEXEMS.update({LEX_DICT.DELIMITERS[char][1]: char for char in DELIMITERS_LIST})
+FIXED_LEXEMS[LEX_DICT.OTHER['EOF'][1]] = 'EOF'
+
+
+# ------------------------------------------------------
+# ------------------------------------------------------
+# ---------------------- PROFILE -----------------------
+# ------------------------------------------------------
+# ------------------------------------------------------
+STATE_NAMES = {state: state_class.__name__ for state, state_class in STATES.items()}
+STATE_NAMES.update({S8_LT: 'S8_LT', S8_GT: 'S8_GT', S8_NEG: 'S8_NEG', S9_PEEK: 'S9_PEEK'})
+
+
+class Profile:
+    # What every state of an instrumented Lexer cost (see Lexer.instrument):
+    # characters read, characters given back, tokens emitted and time, by
+    # state, and how often each (state, next state) transition was taken.
+    # One Profile can collect several lexers.
+    def __init__(self):
+        self.engine = None
+        self.chars = Counter()
+        self.backs = Counter()
+        self.tokens = Counter()
+        self.time_ns = Counter()
+        self.transitions = Counter()
+
+    def as_dict(self):
+        states = sorted(set(self.chars) | set(self.backs) | set(self.time_ns))
+        return {
+            'engine': self.engine,
+            'states': {
+                STATE_NAMES.get(state, str(state)): {
+                    'state': state,
+                    'chars': self.chars[state],
+                    'backs': self.backs[state],
+                    'tokens': self.tokens[state],
+                    'time_ns': self.time_ns[state],
+                } for state in states
+            },
+            'transitions': [
+                {'from': source, 'to': target, 'count': count}
+                for (source, target), count in sorted(self.transitions.items())
+            ],
+        }
+
+    def report(self):
+        total = sum(self.time_ns.values()) or 1
+        lines = [
+            f'Lexer profile ({self.engine} engine)',
+            f'{"state":<16}{"chars":>12}{"backs":>10}{"tokens":>10}{"ms":>10}{"time":>8}',
+        ]
+        for state in sorted(self.time_ns, key=self.time_ns.get, reverse=True):
+            lines.append(
+                f'{STATE_NAMES.get(state, str(state)):<16}{self.chars[state]:>12}'
+                f'{self.backs[state]:>10}{self.tokens[state]:>10}'
+                f'{self.time_ns[state] / 1e6:>10.2f}{self.time_ns[state] / total:>8.1%}'
+            )
+        lines.append('')
+        lines.append('transitions')
+        for (source, target), count in self.transitions.most_common():
+            lines.append(
+                f'  {STATE_NAMES.get(source, str(source)):<16} -> '
+                f'{STATE_NAMES.get(target, str(target)):<16}{count:>12}'
+            )
+        return '\n'.join(lines) + '\n'
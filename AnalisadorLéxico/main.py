@@ -1,28 +1,129 @@
 import argparse
-from os.path import isfile, splitext
+import io
+import json
+import sys
 import lexer
+import output
+import batch
+import cache
 
 
-def process_file(path):
-    token = lexer.Lexer(path)
+def process_file(path, engine='states', writer=None, shards=None, jobs=None, store=None):
+    if writer is None:
+        for next_token in lexer.tokenize(path, engine, trace=lexer.print_line, store=store):
+            print(next_token)
+        return
 
-    while not token.is_EOF():
-        next_token = token.next_token()
-        print(next_token)
+    if store is not None:
+        key = store.tokens_key(path, writer.fmt, engine)
+        data = store.get(key)
+        if data is None:
+            data = lex_into(path, engine, writer, shards, jobs, store)
+            store.put(key, data)
+        else:
+            writer.write_raw(data)
+    elif shards and shards > 1:
+        writer.write_raw(batch.lex_sharded(path, writer.fmt, shards, jobs, engine, store))
+    else:
+        writer.write_file(path, engine, store=store)
+
+
+def lex_into(path, engine, writer, shards=None, jobs=None, store=None):
+    # Lexes into memory for the cache and writes it out; what was lexed
+    # before an error is still written
+    if shards and shards > 1:
+        data = batch.lex_sharded(path, writer.fmt, shards, jobs, engine, store)
+        writer.write_raw(data)
+        return data
+
+    buffer = io.BytesIO()
+    file_writer = output.TokenWriter(buffer, writer.fmt, header=False)
+    try:
+        file_writer.write_file(path, engine, store=store)
+    finally:
+        file_writer.flush()
+        writer.write_raw(buffer.getvalue())
+    return buffer.getvalue()
+
+
+def profile_files(paths, engine, writer, profile):
+    # Lexes every file here, instrumented, so that profile sees all of them
+    for path in paths:
+        if len(paths) > 1:
+            writer.write_file_marker(path)
+        writer.write_file(path, engine, profile)
+
+
+def write_profile(profile, fmt, path=None):
+    text = profile.report() if fmt == 'report' else json.dumps(profile.as_dict(), indent=2) + '\n'
+    if path is None:
+        sys.stderr.write(text)
+        return
+    with open(path, 'w') as file_writer:
+        file_writer.write(text)
+
+
+def process_files(paths, engine, writer, jobs=None, timeout=None, store=None):
+    # Writes every file in order and returns the (path, error) failures
+    errors = []
+    for path, data, error in batch.lex_files(paths, engine, writer.fmt, jobs, timeout, store):
+        if len(paths) > 1:
+            writer.write_file_marker(path)
+        if error is None:
+            writer.write_raw(data)
+        else:
+            errors.append((path, error))
+    return errors
 
 
 if __name__ == '__main__':
     arg_parser = argparse.ArgumentParser(description='Validation for files written in Neon language')
-    arg_parser.add_argument('Path', metavar='path', type=str, help='Path to .nbl file')
+    arg_parser.add_argument('Path', metavar='path', type=str, nargs='+', help='.nbl file, directory or glob')
+    arg_parser.add_argument('--engine', choices=lexer.ENGINES, default='states', help='Lexer implementation')
+    arg_parser.add_argument('--format', choices=output.FORMATS, default='table', help='Token output format')
+    arg_parser.add_argument('--output', metavar='FILE', type=str, help='Write tokens to FILE instead of stdout')
+    arg_parser.add_argument('--jobs', '-j', type=int, default=None, help='Worker processes (default: one per CPU)')
+    arg_parser.add_argument('--timeout', type=float, default=None, help='Seconds allowed per file')
+    arg_parser.add_argument('--shards', type=int, default=None, help='Split a single file into line-aligned shards lexed in parallel (mapped, bytes and compiled engines)')
+    arg_parser.add_argument('--no-cache', action='store_true', help=f'Always rescan, do not use the cache in {cache.CACHE_DIR}')
+    arg_parser.add_argument('--profile', choices=('report', 'json'), nargs='?', const='report', help='Count what every lexer state costs (states and table engines)')
+    arg_parser.add_argument('--profile-output', metavar='FILE', type=str, help='Write the profile to FILE instead of stderr')
 
     args = arg_parser.parse_args()
-    input_path = args.Path
+    if args.profile and args.engine in lexer.MAPPED_ENGINES:
+        arg_parser.error('--profile needs the states or table engine')
+    if args.shards and args.shards > 1 and args.engine not in lexer.MAPPED_ENGINES:
+        arg_parser.error('--shards needs the mapped, bytes or compiled engine')
+    if args.timeout is not None and (args.shards or args.profile):
+        arg_parser.error('--timeout applies to whole files, not to --shards or --profile')
+    input_paths, rejected = batch.expand_paths(args.Path)
 
-    if not isfile(input_path):
-        print('Invalid file path.')
-        exit()
-    elif splitext(input_path)[1] != '.nbl':
-        print('Invalid file extension.')
+    for path, reason in rejected:
+        print(reason if len(args.Path) == 1 else f'{path}: {reason}')
+    if not input_paths:
         exit()
 
-    process_file(input_path)
+    store = None if args.no_cache else cache.Cache()
+    writer = output.open_writer(args.output, args.format)
+    profile = lexer.Profile() if args.profile else None
+    try:
+        if profile is not None:
+            profile_files(input_paths, args.engine, writer, profile)
+            errors = []
+        elif len(input_paths) == 1 and (args.jobs is None and args.timeout is None or args.shards):
+            process_file(input_paths[0], args.engine, writer, args.shards, args.jobs, store)
+            errors = []
+        else:
+            errors = process_files(input_paths, args.engine, writer, args.jobs, args.timeout, store)
+    finally:
+        writer.close()
+        if store is not None:
+            store.evict()
+
+    if profile is not None:
+        write_profile(profile, args.profile, args.profile_output)
+
+    for path, error in errors:
+        print(f'{path}: {error}', file=sys.stderr)
+    if errors:
+        exit(1)
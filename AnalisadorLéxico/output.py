@@ -0,0 +1,181 @@
+import json
+import struct
+import sys
+
+import lexer
+
+
+FORMATS = ('table', 'jsonl', 'csv', 'binary')
+
+BATCH_SIZE = 4096
+BUFFER_SIZE = 1 << 20
+
+# binary: magic, then one record per token followed by its UTF-8 lexem
+BINARY_MAGIC = b'NBLT\x01'
+BINARY_RECORD = struct.Struct('<HIII')  # category id, row, col, lexem size
+
+# Category id of the record that starts the tokens of a file when several
+# files share one output; its lexem is the path
+FILE_MARKER = 0
+
+
+# ------------------------------------------------------
+# ------------------------------------------------------
+# ---------------------- COLUMNS -----------------------
+# ------------------------------------------------------
+# ------------------------------------------------------
+def csv_field(text):
+    if any(char in text for char in ',"\r\n'):
+        return '"' + text.replace('"', '""') + '"'
+    return text
+
+
+def build_columns():
+    # Everything a row repeats for a given category is formatted once here
+    table, jsonl, csv = {}, {}, {}
+    categories = {tkn_cat[1]: tkn_cat for tkn_cat in lexer.CATEGORIES if tkn_cat is not None}
+    categories[FILE_MARKER] = ('FILE', FILE_MARKER)
+    for tkn_id, tkn_cat in categories.items():
+        value_category = f'({tkn_cat[1]:>4}, {tkn_cat[0]:<20})'
+        table[tkn_id] = f'{value_category:<25}'
+        jsonl[tkn_id] = f'"id": {tkn_id}, "category": "{tkn_cat[0]}", "lexem": '
+        csv[tkn_id] = f'{tkn_id},{tkn_cat[0]},'
+
+    fixed_json = {tkn_id: json.dumps(lexem) for tkn_id, lexem in lexer.FIXED_LEXEMS.items()}
+    fixed_csv = {tkn_id: csv_field(lexem) for tkn_id, lexem in lexer.FIXED_LEXEMS.items()}
+    return table, jsonl, csv, fixed_json, fixed_csv
+
+
+TABLE_COLUMNS, JSONL_COLUMNS, CSV_COLUMNS, FIXED_JSON, FIXED_CSV = build_columns()
+
+
+# ------------------------------------------------------
+# ------------------------------------------------------
+# ------------------- TOKEN WRITER ---------------------
+# ------------------------------------------------------
+# ------------------------------------------------------
+class TokenWriter:
+    # Formats tokens into a batch of chunks that goes to a binary stream in
+    # one write every BATCH_SIZE tokens
+    def __init__(self, stream, fmt='table', header=True):
+        if fmt not in FORMATS:
+            raise ValueError(f'Unknown output format: {fmt}')
+
+        self.stream = stream
+        self.fmt = fmt
+        self.batch = []
+        self.format = getattr(self, f'format_{fmt}')
+
+        if header and fmt == 'csv':
+            self.batch.append('row,col,id,category,lexem\n')
+        elif header and fmt == 'binary':
+            self.batch.append(BINARY_MAGIC)
+
+    def write(self, tkn_cat, lexem, row, col):
+        self.batch.append(self.format(tkn_cat[1], lexem, row, col))
+        if len(self.batch) >= BATCH_SIZE:
+            self.flush()
+
+    def write_token(self, token):
+        self.write(token.tkn_cat, token.lexem, token.position[0], token.position[1])
+
+    def write_file_marker(self, path):
+        if self.fmt == 'table':
+            self.batch.append(f'==> {path} <==\n')
+        else:
+            self.batch.append(self.format(FILE_MARKER, path, 0, 0))
+
+    def write_raw(self, data):
+        # Output another writer (header=False, same format) already produced
+        self.flush()
+        self.stream.write(data)
+
+    def write_line(self, row, line):
+        # Trace hook: the line echo of the table format
+        self.batch.append(f'{row} - {line}\n')
+
+    def trace(self):
+        return self.write_line if self.fmt == 'table' else None
+
+    def write_file(self, path, engine='mapped', profile=None, store=None):
+        source_lexer = lexer.Lexer(path, engine, self.trace(), profile=profile, store=store)
+        self.write_lexer(source_lexer)
+        source_lexer.close()
+
+    def write_lexer(self, source_lexer, eof=True):
+        # Every token up to EOF; the EOF token itself only if eof is set
+        if source_lexer.engine not in lexer.MAPPED_ENGINES:
+            for token in source_lexer:
+                if eof or token.tkn_cat is not lexer.LEX_DICT.OTHER['EOF']:
+                    self.write_token(token)
+            return
+
+        # The mapped scanners report offsets, so no Token is built; the
+        # bytes engine's lexems are only decoded if they are not fixed
+        eof_cat = lexer.LEX_DICT.OTHER['EOF']
+        decode = source_lexer.engine == 'bytes'
+        while True:
+            tkn_cat = source_lexer.scan_mapped()
+            if tkn_cat is eof_cat and not eof:
+                return
+            lexem = source_lexer.lexem
+            if lexem is None:
+                lexem = source_lexer.source[source_lexer.start:source_lexer.pos]
+                if decode:
+                    lexem = lexer.FIXED_LEXEMS.get(tkn_cat[1]) or str(lexem, 'ascii')
+            self.write(tkn_cat, lexem, source_lexer.row, source_lexer.col)
+            if tkn_cat is eof_cat:
+                return
+
+    def flush(self):
+        if not self.batch:
+            return
+        if self.fmt == 'binary':
+            self.stream.write(b''.join(self.batch))
+        else:
+            self.stream.write(''.join(self.batch).encode('utf-8'))
+        self.batch.clear()
+
+    def close(self):
+        self.flush()
+        self.stream.flush()
+        if self.stream is not sys.stdout.buffer:
+            self.stream.close()
+
+    def format_table(self, tkn_id, lexem, row, col):
+        return f'              [{row:>4}, {col:>4}] {TABLE_COLUMNS[tkn_id]} {lexem}\n'
+
+    def format_jsonl(self, tkn_id, lexem, row, col):
+        value = FIXED_JSON.get(tkn_id) or json.dumps(lexem)
+        return f'{{"row": {row}, "col": {col}, {JSONL_COLUMNS[tkn_id]}{value}}}\n'
+
+    def format_csv(self, tkn_id, lexem, row, col):
+        value = FIXED_CSV.get(tkn_id) or csv_field(lexem)
+        return f'{row},{col},{CSV_COLUMNS[tkn_id]}{value}\n'
+
+    def format_binary(self, tkn_id, lexem, row, col):
+        data = lexem.encode('utf-8')
+        return BINARY_RECORD.pack(tkn_id, row, col, len(data)) + data
+
+
+def open_writer(path=None, fmt='table'):
+    if path is None:
+        sys.stdout.flush()
+        return TokenWriter(sys.stdout.buffer, fmt)
+    return TokenWriter(open(path, 'wb', buffering=BUFFER_SIZE), fmt)
+
+
+def read_binary(data):
+    # Tokens back from the binary format; file markers come back as Tokens
+    # with category ('FILE', FILE_MARKER) and the path as lexem
+    if not data.startswith(BINARY_MAGIC):
+        raise ValueError('Not a binary token stream')
+
+    offset = len(BINARY_MAGIC)
+    while offset < len(data):
+        tkn_id, row, col, size = BINARY_RECORD.unpack_from(data, offset)
+        offset += BINARY_RECORD.size
+        lexem = str(data[offset:offset + size], 'utf-8')
+        offset += size
+        tkn_cat = lexer.CATEGORIES[tkn_id] if tkn_id != FILE_MARKER else ('FILE', FILE_MARKER)
+        yield lexer.Token(tkn_cat, lexem, (row, col))
@@ -0,0 +1,48 @@
+import sys
+from os.path import abspath, dirname
+
+sys.path.insert(0, dirname(abspath(__file__)))
+
+import pytest
+
+import batch
+import cache
+import lexer
+
+
+def test_every_engine_has_its_own_key(tmp_path):
+    path = tmp_path / 'source.nbl'
+    path.write_text('Begin { Show("olá"); }')
+    store = cache.Cache(str(tmp_path / 'cache'))
+    keys = {store.tokens_key(str(path), 'table', engine) for engine in lexer.ENGINES}
+    assert len(keys) == len(lexer.ENGINES)
+
+
+def test_lexed_file_is_stored_and_served(tmp_path):
+    path = tmp_path / 'source.nbl'
+    path.write_text('Begin { Int x = 1; }')
+    store = cache.Cache(str(tmp_path / 'cache'))
+    _, data, error = batch.lex_file(str(path), 'mapped', 'table', store)
+    assert error is None
+    assert store.get(store.tokens_key(str(path), 'table', 'mapped')) == data
+    assert store.get(store.tokens_key(str(path), 'table', 'states')) is None
+
+
+@pytest.mark.parametrize('engine', ['states', 'table', 'mapped', 'compiled'])
+def test_failed_file_is_not_stored(tmp_path, engine):
+    path = tmp_path / 'source.nbl'
+    path.write_bytes(b'x \xff y\n')
+    store = cache.Cache(str(tmp_path / 'cache'))
+    _, data, error = batch.lex_file(str(path), engine, 'table', store)
+    assert data is None and error.startswith('UnicodeDecodeError')
+    assert store.get(store.tokens_key(str(path), 'table', engine)) is None
+
+
+def test_compiled_engine_without_store_writes_nothing(tmp_path, monkeypatch):
+    import codegen
+    monkeypatch.setattr(codegen, 'compiled', None)
+    monkeypatch.setattr(cache.Cache, 'put', lambda *args: pytest.fail('written without a store'))
+    path = tmp_path / 'source.nbl'
+    path.write_text('Begin { Float y = 2.5; }')
+    assert [token.lexem for token in lexer.tokenize(str(path), 'compiled')][-2:] == ['}', 'EOF']
+    assert codegen.compiled is not None
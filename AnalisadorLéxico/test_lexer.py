@@ -0,0 +1,142 @@
+import io
+import sys
+from os.path import abspath, dirname
+
+sys.path.insert(0, dirname(abspath(__file__)))
+
+import pytest
+
+import batch
+import diagnostics
+import incremental
+import lexer
+import output
+
+
+# Strings (one of them over two lines), comments, floats, every operator
+# and delimiter, and the error tokens the lexer passes on
+CORPUS = '''Begin {
+    @ a comment, "not a string"
+    Int i = 0, n = 10; @ trailing
+    Float f = 3.25 + 0.5 * 7.0 - 12.;
+    Char c = 'c';
+    String s = "a @ b, 'c'";
+    Bool b = True And !False Or i <= n And i >= 0 And i == n Or i != 1;
+    Array Int a[3];
+    While i < n { a[i] = i / 2; i = i + 1; }
+    If i > n { Show("big", i, f); } Else { Get(c); }
+    Foo $ x ? 1.2.3;
+    Function Empty g(Int p) { Return; }
+    s = "left
+    open";
+}
+'''
+
+# Text only the engines that decode the file read alike
+UNICODE = 'Begin {\n    Show("olá, ç", \'é\');\n    x = ñ + 1;\n}\n'
+
+
+def tokens(path, engine):
+    errors = diagnostics.Diagnostics()
+    lexed = [repr(token) for token in lexer.tokenize(str(path), engine, diagnostics=errors)]
+    return lexed, [repr(error) for error in errors]
+
+
+def formatted(path, engine, fmt='table'):
+    buffer = io.BytesIO()
+    writer = output.TokenWriter(buffer, fmt, header=False)
+    writer.write_file(str(path), engine)
+    writer.flush()
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    path = tmp_path / 'corpus.nbl'
+    path.write_text(CORPUS)
+    return path
+
+
+# ------------------------------------------------------
+# ------------------------------------------------------
+# ---------------------- ENGINES -----------------------
+# ------------------------------------------------------
+# ------------------------------------------------------
+@pytest.mark.parametrize('engine', lexer.ENGINES)
+def test_engine_lexes_as_states(corpus, engine):
+    assert tokens(corpus, engine) == tokens(corpus, 'states')
+
+
+@pytest.mark.parametrize('engine', lexer.ENGINES)
+def test_string_open_at_eof_lexes_as_states(tmp_path, engine):
+    path = tmp_path / 'open.nbl'
+    path.write_text(CORPUS + 's = "never closed\n')
+    assert tokens(path, engine) == tokens(path, 'states')
+
+
+@pytest.mark.parametrize('engine', ['table', 'mapped', 'compiled'])
+def test_decoding_engine_reads_unicode_as_states(tmp_path, engine):
+    path = tmp_path / 'unicode.nbl'
+    path.write_text(UNICODE)
+    assert tokens(path, engine) == tokens(path, 'states')
+
+
+@pytest.mark.parametrize('engine', ['states', 'table', 'mapped', 'compiled'])
+def test_invalid_utf8_raises(tmp_path, engine):
+    path = tmp_path / 'invalid.nbl'
+    path.write_bytes(b'Begin { x \xff y }\n')
+    with pytest.raises(UnicodeDecodeError):
+        tokens(path, engine)
+
+
+@pytest.mark.parametrize('engine', lexer.ENGINES)
+def test_empty_file_is_eof(tmp_path, engine):
+    path = tmp_path / 'empty.nbl'
+    path.write_bytes(b'')
+    assert tokens(path, engine) == tokens(path, 'states')
+
+
+# ------------------------------------------------------
+# ------------------------------------------------------
+# ------------------- BATCH AND SHARDS -----------------
+# ------------------------------------------------------
+# ------------------------------------------------------
+@pytest.mark.parametrize('fmt', ['table', 'jsonl', 'csv', 'binary'])
+def test_batch_lexes_as_states(corpus, fmt):
+    results = batch.lex_files([str(corpus)] * 2, 'mapped', fmt, jobs=2)
+    assert [data for _, data, _ in results] == [formatted(corpus, 'states', fmt)] * 2
+
+
+@pytest.mark.parametrize('engine', lexer.MAPPED_ENGINES)
+def test_shards_lex_as_states(tmp_path, monkeypatch, engine):
+    # Small shards, so that the corpus is cut in many places; a shard
+    # that ends inside the string over many lines makes the file fall
+    # back to sequential lexing
+    monkeypatch.setattr(batch, 'MIN_SHARD_SIZE', 64)
+    path = tmp_path / 'corpus.nbl'
+    path.write_text(CORPUS * 4)
+    assert batch.lex_sharded(str(path), 'table', 8, 2, engine) == formatted(path, 'states')
+    path.write_text(CORPUS * 2 + 's = "' + 'line\n' * 100 + '";\n' + CORPUS * 2)
+    assert batch.lex_sharded(str(path), 'table', 8, 2, engine) == formatted(path, 'states')
+
+
+# ------------------------------------------------------
+# ------------------------------------------------------
+# --------------------- RE-LEXING ----------------------
+# ------------------------------------------------------
+# ------------------------------------------------------
+@pytest.mark.parametrize('old, new', [
+    ('0.5', '0.75'),
+    ('@ trailing', ''),
+    ('Char c', '@ Char c'),
+    ('"a @ b', '"a @\n b'),
+    ('"left', 'left'),
+    ('Foo $', 'Int k = 2;\n    Bar'),
+])
+def test_relex_lexes_as_states(tmp_path, old, new):
+    buffer = lexer.Lexer(None, 'mapped', source=CORPUS).read_buffer()
+    start = CORPUS.index(old)
+    edited = incremental.relex(buffer, start, start + len(old), new)
+    path = tmp_path / 'edited.nbl'
+    path.write_text(CORPUS.replace(old, new, 1))
+    assert [repr(token) for token in edited] == tokens(path, 'states')[0]
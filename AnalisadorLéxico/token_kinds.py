@@ -0,0 +1,202 @@
+from enum import IntEnum
+
+
+# ------------------------------------------------------
+# ------------------------------------------------------
+# ---------------------- KINDS -------------------------
+# ------------------------------------------------------
+# ------------------------------------------------------
+class Kind(IntEnum):
+    RW_INT         = 1
+    RW_FLOAT       = 2
+    RW_CHAR        = 3
+    RW_STRING      = 4
+    RW_BOOL        = 5
+    RW_BEGIN       = 6
+    RW_END         = 7
+    RW_IF          = 8
+    RW_ELSE        = 9
+    RW_WHILE       = 10
+    RW_FROM        = 11
+    RW_TO          = 12
+    RW_INCREASE    = 13
+    RW_GET         = 14
+    RW_SHOW        = 15
+    RW_RETURN      = 16
+    RW_FUNCTION    = 17
+    RW_TRUE        = 18
+    RW_FALSE       = 19
+    RW_ARRAY       = 20
+    RW_EMPTY       = 21
+    OPE_CONJ       = 22
+    OPE_DISJ       = 23
+    OPE_ADD        = 24
+    OPE_SUB        = 25
+    OPE_MUL        = 26
+    OPE_DIV        = 27
+    OPE_ATR        = 28
+    OPE_LT         = 29
+    OPE_GT         = 30
+    OPE_LE         = 31
+    OPE_GE         = 32
+    OPE_REL        = 33
+    OPE_NEG        = 34
+    ID             = 35
+    IDEN_INT       = 36
+    IDEN_FLOAT     = 37
+    IDEN_BOOL      = 38
+    IDEN_CHAR      = 39
+    IDEN_STRING    = 40
+    IDEN_ARRAY     = 41
+    DELI_BEGIN     = 42
+    DELI_END       = 43
+    DELI_OPAREN    = 44
+    DELI_CPAREN    = 45
+    DELI_OBRAC     = 46
+    DELI_CBRAC     = 47
+    DELI_OCURLY    = 48
+    DELI_CCURLY    = 49
+    DELI_COMMA     = 50
+    DELI_SEMICOL   = 51
+    ERR_UNKNOWN    = 52
+    ERR_IDENTIFIER = 53
+    ERR_NUMERIC    = 54
+    ERR_RW         = 55
+    ERR_CHARACTER  = 56
+    OTHER_EOF      = 57
+    OTHER_COMMENT  = 58
+
+
+# Number of kinds plus one: tables indexed by kind have this many entries
+KIND_COUNT = max(Kind) + 1
+
+# Category tuples, (name, id), indexed by kind. These are the tkn_cat of
+# tokens: every table below hands out these same objects, so categories
+# can be compared with `is`. The id is the plain int, which is what gets
+# formatted, hashed and cached; it compares equal to its Kind.
+CATEGORIES = [None] * KIND_COUNT
+for kind in Kind:
+    CATEGORIES[kind] = (kind.name, kind.value)
+
+
+# ------------------------------------------------------
+# ------------------------------------------------------
+# ---------------------- TABLES ------------------------
+# ------------------------------------------------------
+# ------------------------------------------------------
+class TOKEN_DICT:
+    # Categories by spelling (or by name, for kinds with no single one)
+    RESERVED_WORDS = {
+        'Int':      CATEGORIES[Kind.RW_INT],
+        'Float':    CATEGORIES[Kind.RW_FLOAT],
+        'Char':     CATEGORIES[Kind.RW_CHAR],
+        'String':   CATEGORIES[Kind.RW_STRING],
+        'Bool':     CATEGORIES[Kind.RW_BOOL],
+        'Begin':    CATEGORIES[Kind.RW_BEGIN],
+        'End':      CATEGORIES[Kind.RW_END],
+        'If':       CATEGORIES[Kind.RW_IF],
+        'Else':     CATEGORIES[Kind.RW_ELSE],
+        'While':    CATEGORIES[Kind.RW_WHILE],
+        'From':     CATEGORIES[Kind.RW_FROM],
+        'To':       CATEGORIES[Kind.RW_TO],
+        'Increase': CATEGORIES[Kind.RW_INCREASE],
+        'Get':      CATEGORIES[Kind.RW_GET],
+        'Show':     CATEGORIES[Kind.RW_SHOW],
+        'Return':   CATEGORIES[Kind.RW_RETURN],
+        'Function': CATEGORIES[Kind.RW_FUNCTION],
+        'True':     CATEGORIES[Kind.RW_TRUE],
+        'False':    CATEGORIES[Kind.RW_FALSE],
+        'Array':    CATEGORIES[Kind.RW_ARRAY],
+        'Empty':    CATEGORIES[Kind.RW_EMPTY],
+        'And':      CATEGORIES[Kind.OPE_CONJ],
+        'Or':       CATEGORIES[Kind.OPE_DISJ]
+    }
+
+    OPERATORS = {
+        '+':       CATEGORIES[Kind.OPE_ADD],
+        '-':       CATEGORIES[Kind.OPE_SUB],
+        '*':       CATEGORIES[Kind.OPE_MUL],
+        '/':       CATEGORIES[Kind.OPE_DIV],
+        '=':       CATEGORIES[Kind.OPE_ATR],
+        '<':       CATEGORIES[Kind.OPE_LT],
+        '>':       CATEGORIES[Kind.OPE_GT],
+        'OPE_LE':  CATEGORIES[Kind.OPE_LE],
+        'OPE_GE':  CATEGORIES[Kind.OPE_GE],
+        'OPE_REL': CATEGORIES[Kind.OPE_REL],
+        '!':       CATEGORIES[Kind.OPE_NEG]
+    }
+
+    IDENTIFIERS = {
+        'ID':          CATEGORIES[Kind.ID],
+        'IDEN_INT':    CATEGORIES[Kind.IDEN_INT],
+        'IDEN_FLOAT':  CATEGORIES[Kind.IDEN_FLOAT],
+        'IDEN_BOOL':   CATEGORIES[Kind.IDEN_BOOL],
+        'IDEN_CHAR':   CATEGORIES[Kind.IDEN_CHAR],
+        'IDEN_STRING': CATEGORIES[Kind.IDEN_STRING],
+        'IDEN_ARRAY':  CATEGORIES[Kind.IDEN_ARRAY]
+    }
+
+    DELIMITERS = {
+        'Begin': CATEGORIES[Kind.DELI_BEGIN],
+        'End':   CATEGORIES[Kind.DELI_END],
+        '(':     CATEGORIES[Kind.DELI_OPAREN],
+        ')':     CATEGORIES[Kind.DELI_CPAREN],
+        '[':     CATEGORIES[Kind.DELI_OBRAC],
+        ']':     CATEGORIES[Kind.DELI_CBRAC],
+        '{':     CATEGORIES[Kind.DELI_OCURLY],
+        '}':     CATEGORIES[Kind.DELI_CCURLY],
+        ',':     CATEGORIES[Kind.DELI_COMMA],
+        ';':     CATEGORIES[Kind.DELI_SEMICOL]
+    }
+
+    ERRORS = {
+        'ERR_UNKNOWN':    CATEGORIES[Kind.ERR_UNKNOWN],
+        'ERR_IDENTIFIER': CATEGORIES[Kind.ERR_IDENTIFIER],
+        'ERR_NUMERIC':    CATEGORIES[Kind.ERR_NUMERIC],
+        'ERR_RW':         CATEGORIES[Kind.ERR_RW],
+        'ERR_CHARACTER':  CATEGORIES[Kind.ERR_CHARACTER],
+    }
+
+    OTHER = {
+        'EOF':     CATEGORIES[Kind.OTHER_EOF],
+        'COMMENT': CATEGORIES[Kind.OTHER_COMMENT]
+    }
+
+
+OPERATORS_LIST = ['+', '-', '*', '/', '!']
+DELIMITERS_LIST = ['(', ')', '[', ']', '{', '}', ',', ';']
+
+# Kind of the one-character token an ASCII code stands for, 0 for none
+CHAR_KINDS = [0] * 128
+for char in OPERATORS_LIST:
+    CHAR_KINDS[ord(char)] = TOKEN_DICT.OPERATORS[char][1]
+for char in DELIMITERS_LIST:
+    CHAR_KINDS[ord(char)] = TOKEN_DICT.DELIMITERS[char][1]
+
+
+# ------------------------------------------------------
+# ------------------------------------------------------
+# ------------------ CHARACTER CLASSES -----------------
+# ------------------------------------------------------
+# ------------------------------------------------------
+# Bits of CHAR_FLAGS: the str predicates the lexer tests, per ASCII code
+SPACE     = 1 << 0
+LOWER     = 1 << 1
+DIGIT     = 1 << 2
+UPPER     = 1 << 3
+ALNUM     = 1 << 4
+PRINTABLE = 1 << 5
+
+
+def char_flags(char):
+    return (
+        SPACE * char.isspace()
+        | LOWER * char.islower()
+        | DIGIT * char.isdigit()
+        | UPPER * char.isupper()
+        | ALNUM * char.isalnum()
+        | PRINTABLE * (chr(32) <= char <= chr(126))
+    )
+
+
+CHAR_FLAGS = [char_flags(chr(code)) for code in range(128)]
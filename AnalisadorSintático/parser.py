@@ -1,5 +1,11 @@
+import sys
 import traceback
 from abc import ABC, abstractmethod
+from os.path import abspath, dirname, join
+
+sys.path.insert(0, join(dirname(dirname(abspath(__file__))), 'AnalisadorLéxico'))
+
+import token_kinds
 
 class Token:
     def __init__(self, tkn_cat, lexem, position):
@@ -153,82 +159,7 @@ class State(ABC):
     14: State_Fourteen
 }
 
-class PARSER_DICT:
-        RESERVED_WORDS = {
-        'Int':      ('RW_INT',      1 ),
-        'float':    ('RW_FLOAT',    2 ),
-        'Char':     ('RW_CHAR',     3 ),
-        'String':   ('RW_STRING',   4 ),
-        'Bool':     ('RW_BOOL',     5 ),
-        'Begin':    ('RW_BEGIN',    6 ),
-        'End':      ('RW_END',      7 ),
-        'If':       ('RW_IF',       8 ),
-        'Else':     ('RW_ELSE',     9 ),
-        'While':    ('RW_WHILE',    10),
-        'From':     ('RW_FROM',     11),
-        'To':       ('RW_TO',       12),
-        'Increase': ('RW_INCREASE', 13),
-        'Get':      ('RW_GET',      14),
-        'Show':     ('RW_SHOW',     15),
-        'Return':   ('RW_RETURN',   16),
-        'Function': ('RW_FUNCTION', 17),
-        'True':     ('RW_TRUE',     18),
-        'False':    ('RW_FALSE',    19),
-        'Array':    ('RW_ARRAY',    20),
-        'Empty':    ('RW_EMPTY',    21),
-        'And':      ('OPE_CONJ',    22),
-        'Or':       ('OPE_DISJ',    23)
-    }
-
-        OPERATORS = {
-            '+':       ('OPE_ADD',  24),
-            '-':       ('OPE_SUB',  25),
-            '*':       ('OPE_MUL',  26),
-            '/':       ('OPE_DIV',  27),
-            '=':       ('OPE_ATR',  28),
-            '<':       ('OPE_LT',   29),
-            '>':       ('OPE_GT',   30),
-            'OPE_LE':  ('OPE_LE',   31),
-            'OPE_GE':  ('OPE_GE',   32),
-            'OPE_REL': ('OPE_REL',  33),
-            '!':       ('OPE_NEG',  34)
-        }
-
-        IDENTIFIERS = {
-            'ID':          ('ID',          35),
-            'IDEN_INT':    ('IDEN_INT',    36),
-            'IDEN_FLOAT':  ('IDEN_FLOAT',  37),
-            'IDEN_BOOL':   ('IDEN_BOOL',   38),
-            'IDEN_CHAR':   ('IDEN_CHAR',   39),
-            'IDEN_STRING': ('IDEN_STRING', 40),
-            'IDEN_ARRAY':  ('IDEN_ARRAY',  41)
-        }
-
-        DELIMITERS = {
-            'Begin': ('DELI_BEGIN',   42),
-            'End':   ('DELI_END',     43),
-            '(':     ('DELI_OPAREN',  44),
-            ')':     ('DELI_CPAREN',  45),
-            '[':     ('DELI_OBRAC',   46),
-            ']':     ('DELI_CBRAC',   47),
-            '{':     ('DELI_OCURLY',  48),
-            '}':     ('DELI_CCURLY',  49),
-            ',':     ('DELI_COMMA',   50),
-            ';':     ('DELI_SEMICOL', 51)
-        }
-
-        ERRORS = {
-            'ERR_UNKNOWN':    ('ERR_UNKNOWN',    52),
-            'ERR_IDENTIFIER': ('ERR_IDENTIFIER', 53),
-            'ERR_NUMERIC':    ('ERR_NUMERIC',    54),
-            'ERR_RW':         ('ERR_RW',         55),
-            'ERR_CHARACTER':  ('ERR_CHARACTER',  56),
-        }
-
-        OTHER = {
-            'EOF':     ('OTHER_EOF',     57),
-            'COMMENT': ('OTHER_COMMENT', 58)
-        }
-
-        OPERATORS_LIST = ['+', '-', '*', '/', '!']
-        DELIMITERS_LIST = ['(', ')', '[', ']', '{', '}', ',', ';']
\ No newline at end of file
+# Shared with the lexer (AnalisadorLéxico/token_kinds.py)
+PARSER_DICT = token_kinds.TOKEN_DICT
+OPERATORS_LIST = token_kinds.OPERATORS_LIST
+DELIMITERS_LIST = token_kinds.DELIMITERS_LIST
\ No newline at end of file
@@ -0,0 +1,221 @@
+import argparse
+import random
+import sys
+
+
+# ------------------------------------------------------
+# ------------------------------------------------------
+# ---------------------- SETTINGS ----------------------
+# ------------------------------------------------------
+# ------------------------------------------------------
+UNITS = {'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30}
+
+# Distinct top-level units a corpus is drawn from; past that, sizes only
+# repeat units, which keeps gigabyte corpora fast to generate
+POOL_SIZE = 512
+CHUNK_SIZE = 1 << 20
+
+TYPES = ['Int', 'Float', 'Char', 'String', 'Bool']
+NAMES = [
+    'value', 'count', 'total', 'index', 'last', 'next', 'result', 'item',
+    'size', 'left', 'right', 'sum', 'flag', 'name', 'letter', 'matrix',
+    'nextItem', 'maxValue', 'row2', 'col3', 'tmp', 'acc', 'k', 'n',
+]
+FUNCTIONS = ['fibonacci', 'factorial', 'power', 'compare', 'readAll', 'sumOf', 'max2']
+RELATIONS = ['==', '!=', '<', '>', '<=', '>=']
+# Printable ASCII a string may hold; '"' would end it
+STRING_CHARS = ''.join(chr(code) for code in range(32, 127) if chr(code) != '"')
+
+# Every category the lexer emits is used, except RW_END, which has no
+# place in the grammar, and ERR_RW, which is not valid Neon. Never emitted
+# by the lexer at all: OPE_ATR ('=' lexes as OPE_NEG), IDEN_BOOL and
+# IDEN_ARRAY (True/False are reserved words), DELI_BEGIN and DELI_END
+# (Begin/End are reserved words) and the discarded error tokens.
+
+
+# ------------------------------------------------------
+# ------------------------------------------------------
+# ---------------------- PROGRAMS ----------------------
+# ------------------------------------------------------
+# ------------------------------------------------------
+class ProgramGenerator:
+    # Random programs of the Neon grammar, built as lists of lines
+    def __init__(self, seed=0):
+        self.random = random.Random(seed)
+
+    def name(self):
+        return self.random.choice(NAMES)
+
+    def target(self):
+        name = self.name()
+        if self.random.random() < 0.15:
+            name += f'[{self.random.randint(0, 9)}]'
+        return name
+
+    def comment(self):
+        size = self.random.randint(0, 40)
+        return ' @ ' + ''.join(self.random.choices(STRING_CHARS + '"', k=size))
+
+    def string(self):
+        size = self.random.randint(2, 24)
+        return '"' + ''.join(self.random.choices(STRING_CHARS, k=size)) + '"'
+
+    def constant(self):
+        kind = self.random.randrange(6)
+        if kind == 0:
+            return str(self.random.randint(0, 9999))
+        if kind == 1:
+            return f'{self.random.randint(0, 999)}.{self.random.randint(0, 99)}'
+        if kind == 2:
+            return self.random.choice(['True', 'False'])
+        if kind == 3:
+            return '"' + self.random.choice(STRING_CHARS) + '"'
+        if kind == 4:
+            return self.string()
+        return self.target()
+
+    def call(self, depth):
+        arguments = [self.expression(depth + 1) for _ in range(self.random.randint(0, 3))]
+        return f'{self.random.choice(FUNCTIONS)}({", ".join(arguments)})'
+
+    def expression(self, depth=0):
+        if depth > 2 or self.random.random() < 0.35:
+            roll = self.random.random()
+            if roll < 0.1:
+                return self.call(depth)
+            if roll < 0.15:
+                return '-' + self.constant()
+            return self.constant()
+
+        roll = self.random.random()
+        left = self.expression(depth + 1)
+        right = self.expression(depth + 1)
+        if roll < 0.4:
+            return f'{left} {self.random.choice("+-*/")} {right}'
+        if roll < 0.6:
+            return f'{left} {self.random.choice(RELATIONS)} {right}'
+        if roll < 0.75:
+            return f'{left} {self.random.choice(["And", "Or"])} {right}'
+        if roll < 0.85:
+            return f'!({left})'
+        return f'({left})'
+
+    def declaration(self):
+        var_type = self.random.choice(TYPES + ['Array'])
+        if var_type == 'Array':
+            var_type = f'Array {self.random.choice(TYPES)}'
+            return f'{var_type} {self.name()}[{self.random.randint(1, 64)}];'
+        names = ', '.join(self.name() for _ in range(self.random.randint(1, 3)))
+        if self.random.random() < 0.6:
+            return f'{var_type} {names} = {self.expression()};'
+        return f'{var_type} {names};'
+
+    def block(self, header, indent, depth):
+        lines = [f'{indent}{header} {{']
+        for _ in range(self.random.randint(1, 4)):
+            lines.extend(self.statement(indent + '    ', depth + 1))
+        lines.append(f'{indent}}}')
+        return lines
+
+    def statement(self, indent, depth=0):
+        roll = self.random.random() if depth < 3 else self.random.random() * 0.5
+        if roll < 0.2:
+            return [indent + self.declaration()]
+        if roll < 0.35:
+            return [f'{indent}{self.target()} = {self.expression()};']
+        if roll < 0.4:
+            return [f'{indent}{self.call(0)};']
+        if roll < 0.45:
+            return [f'{indent}Get({self.target()});']
+        if roll < 0.5:
+            return [f'{indent}Show({self.string()}, {self.expression()});']
+        if roll < 0.6:
+            lines = self.block(f'If ({self.expression()})', indent, depth)
+            if self.random.random() < 0.5:
+                lines[-1] += ' Else {'
+                lines.extend(self.block('', indent, depth)[1:])
+            return lines
+        if roll < 0.7:
+            return self.block(f'While ({self.expression()})', indent, depth)
+        if roll < 0.8:
+            bounds = [self.random.choice([self.name(), str(self.random.randint(0, 99))]) for _ in range(3)]
+            return self.block('From {} To {} Increase {}'.format(*bounds), indent, depth)
+        return [f'{indent}Return {self.expression()};']
+
+    def function(self, indent):
+        return_type = self.random.choice(TYPES + ['Empty', 'Array Int'])
+        parameters = ', '.join(
+            f'{self.random.choice(TYPES)} {self.name()}' for _ in range(self.random.randint(0, 3))
+        )
+        return self.block(
+            f'Function {return_type} {self.random.choice(FUNCTIONS)}({parameters})', indent, 0
+        )
+
+    def unit(self):
+        # One top-level item of a program, as text
+        roll = self.random.random()
+        if roll < 0.3:
+            lines = self.function('    ')
+        elif roll < 0.5:
+            lines = ['    ' + self.declaration()]
+        else:
+            lines = self.statement('    ')
+        if self.random.random() < 0.2:
+            lines[0] += self.comment()
+        return '\n'.join(lines) + '\n'
+
+
+# ------------------------------------------------------
+# ------------------------------------------------------
+# ----------------------- CORPUS -----------------------
+# ------------------------------------------------------
+# ------------------------------------------------------
+def parse_size(text):
+    # '64K', '1M', '1G' or a number of bytes
+    text = text.strip().upper().rstrip('B')
+    if text and text[-1] in UNITS:
+        return int(float(text[:-1]) * UNITS[text[-1]])
+    return int(text)
+
+
+def generate(size, seed=0):
+    # Chunks of one program, 'Begin { ... }', of about size bytes (it ends
+    # with the first unit that reaches size). Same seed, same program.
+    generator = ProgramGenerator(seed)
+    pool = [generator.unit() for _ in range(POOL_SIZE)]
+    choice = generator.random.choice
+
+    head, tail = 'Begin {\n', '}\n'
+    chunk = [head]
+    written = chunk_size = len(head)
+    while written + len(tail) < size:
+        unit = choice(pool)
+        chunk.append(unit)
+        chunk_size += len(unit)
+        written += len(unit)
+        if chunk_size >= CHUNK_SIZE:
+            yield ''.join(chunk)
+            chunk = []
+            chunk_size = 0
+    chunk.append(tail)
+    yield ''.join(chunk)
+
+
+def write_corpus(path, size, seed=0):
+    with open(path, 'w', encoding='utf-8', newline='\n') as file_writer:
+        for chunk in generate(size, seed):
+            file_writer.write(chunk)
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description='Generate a random Neon program')
+    arg_parser.add_argument('size', type=str, help='Approximate size, e.g. 1K, 64K, 1M, 1G')
+    arg_parser.add_argument('--seed', type=int, default=0, help='Random seed')
+    arg_parser.add_argument('--output', metavar='FILE', type=str, help='Write to FILE instead of stdout')
+
+    args = arg_parser.parse_args()
+    if args.output:
+        write_corpus(args.output, parse_size(args.size), args.seed)
+    else:
+        for chunk in generate(parse_size(args.size), args.seed):
+            sys.stdout.write(chunk)
@@ -0,0 +1,208 @@
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from os.path import abspath, dirname, exists, join
+
+try:
+    import resource
+except ImportError:
+    # Windows: peak memory is not reported
+    resource = None
+
+BENCHMARKS_DIR = dirname(abspath(__file__))
+sys.path.insert(0, join(dirname(BENCHMARKS_DIR), 'AnalisadorLéxico'))
+sys.path.insert(0, join(dirname(BENCHMARKS_DIR), 'AB2'))
+
+import generator
+import lexer
+import parser
+
+
+BASELINE = join(BENCHMARKS_DIR, 'baseline.json')
+DEFAULT_SIZES = '1K,64K,1M'
+
+
+# ------------------------------------------------------
+# ------------------------------------------------------
+# ---------------------- TARGETS -----------------------
+# ------------------------------------------------------
+# ------------------------------------------------------
+# Each target consumes the whole file and returns the number of tokens
+def lex_tokens(path, engine):
+    count = 0
+    for _ in lexer.tokenize(path, engine):
+        count += 1
+    return count
+
+
+def lex_buffer(path, engine='mapped'):
+    source_lexer = lexer.Lexer(path, engine)
+    return len(source_lexer.read_buffer())
+
+
+def parse_tokens(path, engine, threaded=False):
+    return parser.parse(path, engine, threaded=threaded)
+
+
+TARGETS = {
+    'lexer-states':    (lex_tokens, 'states'),
+    'lexer-table':     (lex_tokens, 'table'),
+    'lexer-mapped':    (lex_tokens, 'mapped'),
+    'lexer-bytes':     (lex_tokens, 'bytes'),
+    'lexer-compiled':  (lex_tokens, 'compiled'),
+    'lexer-buffer':    (lex_buffer,),
+    'compiled-buffer': (lex_buffer, 'compiled'),
+    'parser':          (parse_tokens, 'mapped'),
+    'parser-threaded': (parse_tokens, 'mapped', True),
+}
+
+
+# ------------------------------------------------------
+# ------------------------------------------------------
+# --------------------- MEASURING ----------------------
+# ------------------------------------------------------
+# ------------------------------------------------------
+def corpus_path(size, seed):
+    # Corpora are generated once per size, seed and generator version
+    with open(generator.__file__, 'rb') as file_reader:
+        version = hashlib.sha256(file_reader.read()).hexdigest()[:12]
+    path = join(tempfile.gettempdir(), f'neon-bench-{version}-{seed}-{size}.nbl')
+    if not exists(path):
+        generator.write_corpus(path + '.part', size, seed)
+        # Renamed only when complete, so an interrupted run regenerates it
+        os.replace(path + '.part', path)
+    return path
+
+
+def measure(target, path, repeat):
+    # Runs in a fresh process, so that the peak memory is this target's
+    function, *arguments = TARGETS[target]
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        tokens = function(path, *arguments)
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+
+    # ru_maxrss is in KiB on Linux, in bytes on macOS
+    peak = None
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if sys.platform == 'darwin':
+            peak //= 1024
+    return tokens, best, peak
+
+
+def run(targets, sizes, seed=0, repeat=3):
+    context = multiprocessing.get_context('spawn')
+    results = []
+    for size in sizes:
+        path = corpus_path(size, seed)
+        with open(path, 'rb') as file_reader:
+            size_bytes = len(file_reader.read())
+
+        for target in targets:
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                tokens, seconds, peak = executor.submit(measure, target, path, repeat).result()
+            results.append({
+                'target': target,
+                'size': size,
+                'bytes': size_bytes,
+                'tokens': tokens,
+                'seconds': round(seconds, 6),
+                'tokens_per_sec': round(tokens / seconds),
+                'bytes_per_sec': round(size_bytes / seconds),
+                'peak_rss_kb': peak,
+            })
+            report(results[-1])
+    return results
+
+
+# ------------------------------------------------------
+# ------------------------------------------------------
+# ---------------------- REPORTS -----------------------
+# ------------------------------------------------------
+# ------------------------------------------------------
+def report(result, baseline=None):
+    peak = '-' if result['peak_rss_kb'] is None else f'{result["peak_rss_kb"] / 1024:.1f}'
+    line = (
+        f'{result["target"]:<16} {result["bytes"]:>12} {result["tokens"]:>11} '
+        f'{result["seconds"]:>10.4f} {result["tokens_per_sec"]:>12} '
+        f'{result["bytes_per_sec"] / (1 << 20):>8.2f} {peak:>8}'
+    )
+    if baseline is not None:
+        line += f' {result["tokens_per_sec"] / baseline["tokens_per_sec"]:>7.2f}x'
+    print(line, flush=True)
+
+
+def print_header():
+    print(f'{"target":<16} {"bytes":>12} {"tokens":>11} {"seconds":>10} '
+          f'{"tokens/s":>12} {"MiB/s":>8} {"peak MiB":>8}', flush=True)
+
+
+def compare(results, baseline, threshold):
+    # Speed of every result relative to the baseline run of the same target
+    # and size; returns the ones slower by more than threshold
+    previous = {(result['target'], result['size']): result for result in baseline['results']}
+    regressions = []
+    print('\nAgainst baseline:')
+    print_header()
+    for result in results:
+        old = previous.get((result['target'], result['size']))
+        if old is None:
+            continue
+        report(result, old)
+        if result['tokens_per_sec'] < old['tokens_per_sec'] * (1 - threshold):
+            regressions.append(result)
+    return regressions
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description='Throughput and memory of the Neon lexer and parser')
+    arg_parser.add_argument('--targets', type=str, default=','.join(TARGETS), help='Comma separated targets: ' + ', '.join(TARGETS))
+    arg_parser.add_argument('--sizes', type=str, default=DEFAULT_SIZES, help='Comma separated corpus sizes, 1K to 1G')
+    arg_parser.add_argument('--seed', type=int, default=0, help='Corpus seed')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement; the fastest counts')
+    arg_parser.add_argument('--baseline', metavar='FILE', type=str, default=BASELINE, help='Results to compare against')
+    arg_parser.add_argument('--save', metavar='FILE', type=str, help='Save the results, e.g. as the new baseline')
+    arg_parser.add_argument('--threshold', type=float, default=0.2, help='Slowdown against the baseline reported as a regression')
+
+    args = arg_parser.parse_args()
+    targets = args.targets.split(',')
+    for target in targets:
+        if target not in TARGETS:
+            arg_parser.error(f'Unknown target: {target}')
+    sizes = [generator.parse_size(size) for size in args.sizes.split(',')]
+
+    print_header()
+    results = run(targets, sizes, args.seed, args.repeat)
+
+    if args.save:
+        with open(args.save, 'w') as file_writer:
+            json.dump({
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'seed': args.seed,
+                'repeat': args.repeat,
+                'results': results,
+            }, file_writer, indent=2)
+            file_writer.write('\n')
+
+    regressions = []
+    if exists(args.baseline) and abspath(args.baseline) != abspath(args.save or ''):
+        with open(args.baseline) as file_reader:
+            baseline = json.load(file_reader)
+        if baseline['seed'] == args.seed:
+            regressions = compare(results, baseline, args.threshold)
+
+    for result in regressions:
+        print(f'Regression: {result["target"]} on {result["bytes"]} bytes', file=sys.stderr)
+    if regressions:
+        exit(1)